@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+import os
+from collections import OrderedDict
+
+
+class AnswerEntry:
+    __slots__ = ("version", "value", "cost")
+
+    def __init__(self, version, value, cost):
+        self.version = version
+        self.value = value
+        self.cost = cost
+
+
+class AnswerCache:
+    """(의도, 날짜, 지역) 기준 답변 캐시 - 예보 데이터 버전이 바뀌면 자동으로 무효화"""
+
+    def __init__(self, max_size=None):
+        self.max_size = max_size if max_size is not None else int(os.getenv("QCHAT_ANSWER_CACHE_SIZE", "1024"))
+        self._entries = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+        # 적중으로 건너뛴 답변 생성 시간 합계(초)와 실제로 생성한 시간 합계
+        self.saved = 0.0
+        self.spent = 0.0
+
+    def get(self, key, version):
+        entry = self._entries.get(key)
+        if entry is not None and entry.version != version:
+            # 예보가 갱신되었거나 다음 예보 시각으로 넘어감
+            del self._entries[key]
+            self.invalidations += 1
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.saved += entry.cost
+        self._entries.move_to_end(key)
+        return entry.value
+
+    def put(self, key, version, value, cost=0.0):
+        self.spent += cost
+        self._entries[key] = AnswerEntry(version, value, cost)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "latency_saved_ms": round(self.saved * 1000, 3),
+            "avg_miss_ms": round(self.spent / self.misses * 1000, 3) if self.misses else 0.0
+        }
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+import asyncio
+import threading
+
+
+class BackgroundLoop:
+    """별도 스레드에서 계속 도는 asyncio 이벤트 루프 (Streamlit 재실행 간 MCP 세션 유지용)"""
+
+    def __init__(self, name="background-loop"):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro):
+        # concurrent.futures.Future 반환 - 호출 스레드를 막지 않는다
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro, timeout=None):
+        return self.submit(coro).result(timeout)
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+import argparse
+import time
+
+import numpy as np
+
+from weather_analysis import analyze_arrays, analyze_many
+
+
+def legacy_analyze(weather_data):
+    # 기존 방식: dict에서 리스트를 다시 만들고 sum/min/max 호출
+    forecasts = weather_data["forecasts"]
+    temps = [f["temp"] for f in forecasts]
+    humidity = [f["humidity"] for f in forecasts]
+    return {
+        "avg": round(sum(temps) / len(temps), 1),
+        "min": min(temps),
+        "max": max(temps),
+        "trend": "상승" if temps[-1] > temps[0] else "하강",
+        "humidity_avg": round(sum(humidity) / len(humidity), 1)
+    }
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NumPy 분석 엔진 벤치마크")
+    parser.add_argument("--locations", type=int, default=10000)
+    parser.add_argument("--steps", type=int, default=56)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    temps = rng.normal(15, 8, size=(args.locations, args.steps)).round(2)
+    humidity = rng.integers(30, 95, size=(args.locations, args.steps)).astype(np.float64)
+    dates = [f"2024-01-{1 + i // 8:02d}" for i in range(args.steps)]
+    weather_list = [
+        {
+            "location": f"지역{i}",
+            "forecasts": [
+                {"datetime": f"{dates[j]} {j % 8 * 3:02d}:00:00", "temp": float(temps[i, j]), "humidity": int(humidity[i, j])}
+                for j in range(args.steps)
+            ]
+        }
+        for i in range(args.locations)
+    ]
+
+    print(f"📊 {args.locations}개 지역 × {args.steps}개 시점")
+    print(f"   기존 dict 루프 (평균/최소/최대만): {timed(lambda: [legacy_analyze(w) for w in weather_list], args.repeat):9.1f}ms")
+    print(f"   analyze_arrays (전체 통계):       {timed(lambda: analyze_arrays(temps, humidity, dates), args.repeat):9.1f}ms")
+    print(f"   analyze_many (dict 입력+보고서):   {timed(lambda: analyze_many(weather_list), args.repeat):9.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+import argparse
+import asyncio
+import statistics
+import time
+
+import aiohttp
+
+import weather_mcp_server
+from mock_services import create_openweather_app, start_mock_server
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def fetch_with_new_session(url, params):
+    # 기존 방식: 호출마다 새 ClientSession (DNS + TCP 연결 매번 수행)
+    async with aiohttp.ClientSession() as session:
+        async with session.get(url, params=params) as response:
+            return await response.json()
+
+
+async def fetch_with_pool(url, params):
+    session = weather_mcp_server.http.session()
+    async with session.get(url, params=params) as response:
+        return await response.json()
+
+
+async def measure(fetch, url, requests, concurrency):
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        params = {"q": f"지역{i % 50}", "cnt": 24}
+        async with semaphore:
+            started = time.perf_counter()
+            await fetch(url, params)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+    return latencies, elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="aiohttp 커넥션 풀 지연시간 벤치마크")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.0, help="대역 서버 응답 지연(초)")
+    args = parser.parse_args()
+
+    runner, base_url = await start_mock_server(create_openweather_app(latency=args.latency))
+    url = f"{base_url}/data/2.5/forecast"
+    try:
+        print(f"📊 요청 {args.requests}건, 동시성 {args.concurrency}")
+        for name, fetch in [("new session", fetch_with_new_session), ("shared pool", fetch_with_pool)]:
+            # 워밍업
+            await measure(fetch, url, args.concurrency, args.concurrency)
+            latencies, elapsed = await measure(fetch, url, args.requests, args.concurrency)
+            print(
+                f"{name:>12}: p50 {statistics.median(latencies):7.2f}ms  "
+                f"p99 {percentile(latencies, 99):7.2f}ms  "
+                f"{args.requests / elapsed:8.1f} req/s"
+            )
+    finally:
+        await weather_mcp_server.http.close()
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+import argparse
+import asyncio
+import time
+
+import aiohttp
+
+import notion_writer
+from mock_services import PAGES, STATS, create_notion_app, start_mock_server
+from notion_writer import NotionWriter, build_page_data
+
+
+def make_items(count):
+    return [
+        {
+            "location": f"도시{i}",
+            "weather_data": {
+                "analysis_time": "2024-01-01T09:00:00",
+                "temperature": {"avg": round(5 + i % 25 * 0.7, 1)},
+                "humidity": {"avg": 40 + i % 50},
+                "summary": f"도시{i} 지역 요약"
+            }
+        }
+        for i in range(count)
+    ]
+
+
+async def create_naive(base_url, database_id, items, concurrency):
+    # 기존 방식: 페이지마다 새 세션, 속도 제한/재시도 없음
+    async def one(item):
+        async with aiohttp.ClientSession() as session:
+            page_data = build_page_data(database_id, item["location"], item["weather_data"])
+            async with session.post(f"{base_url}/pages", json=page_data, headers={"Authorization": "Bearer secret_bench"}) as response:
+                return {"status": "created" if response.status == 200 else "error"}
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited(item):
+        async with semaphore:
+            return await one(item)
+
+    return await asyncio.gather(*(limited(item) for item in items))
+
+
+async def run_scenario(name, send, items, args, lose_responses=0):
+    app = create_notion_app(rate_limit=args.server_limit, retry_after=args.retry_after, lose_responses=lose_responses)
+    runner, base_url = await start_mock_server(app)
+    try:
+        started = time.perf_counter()
+        results = await send(base_url, items)
+        elapsed = time.perf_counter() - started
+    finally:
+        await runner.cleanup()
+
+    ok = sum(1 for r in results if r["status"] in ("created", "exists", "dry_run"))
+    stats = app[STATS]
+    duplicates = stats["created"] - len({p["properties"]["제목"]["title"][0]["text"]["content"] for p in app[PAGES].values()})
+    print(
+        f"{name:>22}: {elapsed:6.2f}s  성공 {ok:4d}/{len(items)}  {ok / elapsed:8.1f} 건/s  "
+        f"요청 {stats['calls']:4d}  429 {stats['rate_limited']:4d}  중복 페이지 {duplicates}"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Notion 일괄 페이지 생성 벤치마크 (로컬 대역 서버)")
+    parser.add_argument("--items", type=int, default=200)
+    parser.add_argument("--server-limit", type=int, default=30, help="대역 서버의 초당 허용 요청 수")
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--concurrency", type=int, default=3)
+    parser.add_argument("--lose", type=int, default=5, help="응답 유실(502)을 재현할 요청 수")
+    args = parser.parse_args()
+
+    items = make_items(args.items)
+    print(f"📊 페이지 {args.items}건, 서버 한도 {args.server_limit}건/s, 동시성 {args.concurrency}")
+
+    async def writer_send(base_url, items, dry_run=False):
+        pool = notion_writer.HttpSessionPool()
+        # 서버 한도에 딱 맞추면 1초 창 경계에서 429가 나므로 약간 여유를 둔다
+        writer = NotionWriter("secret_bench", pool, rate=args.server_limit * 0.9, concurrency=args.concurrency, base_url=base_url)
+        try:
+            return await writer.run_batch("db-bench", items, dry_run=dry_run)
+        finally:
+            await pool.close()
+
+    await run_scenario("naive", lambda url, i: create_naive(url, "db-bench", i, args.concurrency), items, args)
+    await run_scenario("writer queue", writer_send, items, args)
+    await run_scenario(f"writer + {args.lose} lost replies", writer_send, items, args, lose_responses=args.lose)
+    await run_scenario("dry run", lambda url, i: writer_send(url, i, dry_run=True), items, args)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from mcp import StdioServerParameters
+
+from background_loop import BackgroundLoop
+from bench_tools import mock_env, percentile
+from mcp_pool import MCPClientPool
+from mock_services import create_notion_app, create_openweather_app, create_slack_app, start_mock_server
+from prefork import PREFORK_SERVERS, PreforkParameters
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# 서버별 첫 호출 도구와 인자 (bench_startup과 같은 조건)
+FIRST_CALLS = {
+    "weather_mcp_server": ("get_weather_data", {"location": "서울", "days": 1}),
+    "qchat_weather_server": ("analyze_weather_query", {"query": "내일 비 와?", "location": "부산"}),
+    "simple_weather_server": ("get_sample_weather", {"location": "서울"})
+}
+
+
+def launch_paths(server, socket_path, env):
+    # 지금 main_app이 쓰는 콜드 스타트, 명령형 클라이언트용 중계, 소켓 직접 연결
+    return {
+        "cold": StdioServerParameters(command=sys.executable, args=[f"{server}.py"], cwd=HERE, env=env),
+        "relay": StdioServerParameters(command=sys.executable, args=["prefork.py", "connect", server, "--socket", socket_path],
+                                       cwd=HERE, env=env),
+        "prefork": PreforkParameters(server, socket_path)
+    }
+
+
+async def first_response(params, tool, arguments):
+    # 새 세션을 열어 첫 도구 응답을 받기까지 (프로세스 기동 + initialize + 호출)
+    pool = MCPClientPool(params, size=1)
+    started = time.perf_counter()
+    try:
+        result = await pool.call_tool(tool, arguments)
+        elapsed = time.perf_counter() - started
+    finally:
+        await pool.close()
+    text = result.content[0].text
+    if result.isError or '"error"' in text[:64]:
+        raise RuntimeError(f"{tool}: {text[:200]}")
+    return elapsed * 1000
+
+
+def start_zygote(socket_path, servers, env):
+    zygote = subprocess.Popen([sys.executable, "prefork.py", "serve", "--socket", socket_path, "--servers", *servers],
+                              cwd=HERE, env=env, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while not os.path.exists(socket_path):
+        if zygote.poll() is not None or time.monotonic() > deadline:
+            raise RuntimeError("prefork zygote가 시작되지 않았습니다")
+        time.sleep(0.05)
+    return zygote
+
+
+def main():
+    parser = argparse.ArgumentParser(description="prefork 워커 vs 콜드 스타트 - 첫 도구 응답까지 걸린 시간")
+    parser.add_argument("--servers", nargs="+", choices=list(FIRST_CALLS), default=["weather_mcp_server"])
+    parser.add_argument("--runs", type=int, default=10, help="경로별 반복 횟수")
+    parser.add_argument("--pause", type=float, default=0.2, help="반복 사이 대기(초) - zygote가 빈 워커를 채울 시간")
+    parser.add_argument("--output", help="결과 JSON 파일 경로")
+    args = parser.parse_args()
+
+    background = BackgroundLoop("bench-mocks")
+    apps = {"openweather": create_openweather_app(), "slack": create_slack_app(), "notion": create_notion_app()}
+    runners, urls = {}, {}
+    for name, app in apps.items():
+        runners[name], urls[name] = background.run(start_mock_server(app))
+
+    report = {}
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            env = mock_env(urls, tmp)
+            socket_path = os.path.join(tmp, "prefork.sock")
+            zygote = start_zygote(socket_path, [s for s in args.servers if s in PREFORK_SERVERS], env)
+            try:
+                for server in args.servers:
+                    tool, arguments = FIRST_CALLS[server]
+                    report[server] = {}
+                    for path, params in launch_paths(server, socket_path, env).items():
+                        samples = []
+                        for _ in range(args.runs):
+                            samples.append(asyncio.run(first_response(params, tool, arguments)))
+                            time.sleep(args.pause)
+                        samples.sort()
+                        report[server][path] = {
+                            "p50_ms": round(percentile(samples, 0.5), 1),
+                            "p95_ms": round(percentile(samples, 0.95), 1),
+                            "min_ms": round(min(samples), 1)
+                        }
+            finally:
+                zygote.terminate()
+                zygote.wait()
+    finally:
+        for runner in runners.values():
+            background.run(runner.cleanup())
+        background.stop()
+
+    print(f"📊 첫 도구 응답까지 ({args.runs}회)")
+    print(f"{'server':<24} {'path':<8} {'p50 ms':>8} {'p95 ms':>8} {'min ms':>8}")
+    for server, paths in report.items():
+        for path, r in paths.items():
+            print(f"{server:<24} {path:<8} {r['p50_ms']:>8} {r['p95_ms']:>8} {r['min_ms']:>8}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 결과 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
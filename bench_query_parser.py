@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+import argparse
+import random
+import time
+
+from query_parser import PARSER, REGIONS, TIME_REFS, parse_query
+
+TEMPLATES = [
+    "{loc} 날씨 어때?", "{time} {loc} 비 와?", "{loc} 온도 알려줘", "{time} 외출하기 좋아?",
+    "{loc}는 {time} 습도 어때", "빨래 말리기 좋아?", "{time} {loc} 바람 세?", "운동하기 좋은 날씨야?",
+    "{loc}에서 {time} 우산 챙겨야 돼?", "{time} 많이 추워?", "{loc} 예보 좀 보여줘", "안녕하세요 그냥 궁금해서요"
+]
+
+
+def legacy_route(query):
+    # 기존 방식: analyze_weather_query의 if 체인 + get_weather_answer의 키워드 dict 순회 (지역 추출 없음)
+    if "온도" in query or "기온" in query:
+        route = "temperature"
+    elif "습도" in query:
+        route = "humidity"
+    elif "날씨" in query:
+        route = "general"
+    elif "예보" in query or "내일" in query:
+        route = "forecast"
+    else:
+        route = "other"
+    for keyword in ("비", "추위", "더위", "외출", "운동", "세탁"):
+        if keyword in query:
+            return route, keyword
+    return route, None
+
+
+def make_corpus(size, seed=0):
+    rng = random.Random(seed)
+    aliases = [alias for names in REGIONS.values() for alias in names]
+    times = list(TIME_REFS)
+    return [rng.choice(TEMPLATES).format(loc=rng.choice(aliases), time=rng.choice(times)) for _ in range(size)]
+
+
+def measure(fn, corpus):
+    started = time.perf_counter()
+    for query in corpus:
+        fn(query)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="질문 의도/지명 파서 처리량 벤치마크")
+    parser.add_argument("--queries", type=int, default=200000)
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.queries)
+    print(f"📊 질문 {len(corpus)}건, 어휘 {len(PARSER.lexicon)}개, 정규식 {len(PARSER.pattern.pattern)}자")
+
+    for name, fn in [("legacy chain", legacy_route), ("query parser", parse_query)]:
+        elapsed = measure(fn, corpus)
+        print(f"{name:>14}: {len(corpus) / elapsed:12,.0f} 질문/s  ({elapsed / len(corpus) * 1e6:6.2f}µs/질문)")
+
+    # 질문 길이에 선형인지 확인 - 글자당 처리 시간이 길이와 무관해야 한다
+    print("\n📏 길이별 글자당 처리 시간")
+    base = "오늘 서울 날씨는 어떤가요 그리고 바람도 궁금해요 "
+    for repeat in (1, 10, 100, 1000):
+        query = base * repeat
+        loops = max(1, 20000 // repeat)
+        started = time.perf_counter()
+        for _ in range(loops):
+            parse_query(query)
+        elapsed = time.perf_counter() - started
+        print(f"{len(query):>8}자: {elapsed / loops / len(query) * 1e9:8.1f}ns/자")
+
+
+if __name__ == "__main__":
+    main()
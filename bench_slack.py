@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+import argparse
+import asyncio
+import time
+
+from slack_sdk.errors import SlackApiError
+from slack_sdk.web.async_client import AsyncWebClient
+
+import slack_bot
+from mock_services import STATS, create_slack_app, start_mock_server
+from weather_analysis import analyze_many
+
+
+def make_analyses(count):
+    return analyze_many([
+        {"location": f"도시{i}", "forecasts": [
+            {"datetime": f"2024-01-01 {h:02d}:00:00", "temp": i % 30 + h / 3, "humidity": 40 + i % 50} for h in range(0, 24, 3)
+        ]}
+        for i in range(count)
+    ])
+
+
+async def send_naive(base_url, channel, analyses):
+    # 기존 방식: 메시지마다 새 클라이언트, 속도 제한/재시도 없음
+    async def one(analysis):
+        client = AsyncWebClient(token="xoxb-bench", base_url=base_url)
+        try:
+            await client.chat_postMessage(channel=channel, blocks=slack_bot.report_blocks(analysis), text=analysis["summary"])
+            return {"success": True}
+        except SlackApiError as e:
+            return {"success": False, "error": str(e)}
+
+    return await asyncio.gather(*(one(a) for a in analyses))
+
+
+async def run_scenario(name, send, analyses, server_limit, retry_after):
+    app = create_slack_app(rate_limit=server_limit, retry_after=retry_after)
+    runner, base_url = await start_mock_server(app)
+    try:
+        started = time.perf_counter()
+        results = await send(base_url, analyses)
+        elapsed = time.perf_counter() - started
+    finally:
+        await runner.cleanup()
+
+    delivered = sum(1 for r in results if r["success"])
+    stats = app[STATS]
+    print(
+        f"{name:>18}: {elapsed:6.2f}s  보고서 {delivered:4d}/{len(analyses)}  "
+        f"{delivered / elapsed:8.1f} 보고서/s  메시지 {stats['posted']:4d}  429 {stats['rate_limited']:4d}"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Slack 전송 처리량 벤치마크 (로컬 대역 서버)")
+    parser.add_argument("--reports", type=int, default=200)
+    parser.add_argument("--server-limit", type=int, default=50, help="대역 서버의 채널당 초당 허용 메시지 수")
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--bundle-size", type=int, default=10)
+    args = parser.parse_args()
+
+    analyses = make_analyses(args.reports)
+    channel = "#weather"
+    print(f"📊 보고서 {args.reports}건, 서버 한도 채널당 {args.server_limit}건/s")
+
+    async def dispatcher_send(base_url, analyses, bundle_size):
+        pool = slack_bot.HttpSessionPool()
+        dispatcher = slack_bot.SlackDispatcher("xoxb-bench", pool, rate=args.server_limit, burst=1, base_url=base_url)
+        bot = slack_bot.WeatherSlackBot("xoxb-bench", dispatcher)
+        try:
+            if bundle_size == 1:
+                return await asyncio.gather(*(bot.send_weather_report(channel, a) for a in analyses))
+            return await bot.send_weather_reports(channel, analyses, bundle_size)
+        finally:
+            await pool.close()
+
+    scenarios = [
+        ("naive", lambda url, a: send_naive(url, channel, a)),
+        ("dispatcher", lambda url, a: dispatcher_send(url, a, 1)),
+        (f"dispatcher x{args.bundle_size}", lambda url, a: dispatcher_send(url, a, args.bundle_size))
+    ]
+    for name, send in scenarios:
+        await run_scenario(name, send, analyses, args.server_limit, args.retry_after)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
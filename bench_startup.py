@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+import argparse
+import asyncio
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+from background_loop import BackgroundLoop
+from bench_tools import ANALYSIS, mock_env
+from mock_services import create_notion_app, create_openweather_app, create_slack_app, start_mock_server
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# 진입점별 (모듈, 첫 호출 도구와 인자) - 도구가 없으면 Streamlit 앱 (import 시간만 측정)
+ENTRY_POINTS = {
+    "simple": ("simple_weather_server", "get_sample_weather", {"location": "서울"}),
+    "qchat": ("qchat_weather_server", "analyze_weather_query", {"query": "내일 비 와?", "location": "부산"}),
+    "weather": ("weather_mcp_server", "get_weather_data", {"location": "서울", "days": 1}),
+    "notion": ("notion_weather_server", "create_weather_page",
+               {"database_id": "bench-database", "location": "서울", "weather_data": ANALYSIS}),
+    "dashboard": ("web_dashboard", None, None)
+}
+
+
+def import_time(module, cwd, env):
+    # 인터프리터 시작 + 모듈 import까지 걸린 벽시계 시간 (새 프로세스)
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", f"import {module}"], cwd=cwd, env=env, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - started
+
+
+async def first_response(module, tool, arguments, cwd, env):
+    # stdio_client로 새로 띄운 서버가 initialize에 응답하기까지, 첫 도구 응답까지
+    params = StdioServerParameters(command=sys.executable, args=[f"{module}.py"], cwd=cwd, env=env)
+    started = time.perf_counter()
+    async with stdio_client(params) as (read, write):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            ready = time.perf_counter() - started
+            result = await session.call_tool(tool, arguments)
+            first = time.perf_counter() - started
+    text = result.content[0].text
+    if result.isError or '"error"' in text[:64]:
+        raise RuntimeError(f"{module}.{tool}: {text[:200]}")
+    return ready, first
+
+
+def export_ref(ref, target):
+    # git 기준 커밋의 파일을 임시 디렉터리에 풀어 같은 조건으로 비교
+    archive = subprocess.run(["git", "archive", ref], cwd=HERE, check=True, capture_output=True).stdout
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(target)
+
+
+def median_ms(values):
+    return round(statistics.median(values) * 1000, 1)
+
+
+def measure(cwd, env, names, runs):
+    results = {}
+    for name in names:
+        module, tool, arguments = ENTRY_POINTS[name]
+        result = {"import_ms": median_ms([import_time(module, cwd, env) for _ in range(runs)])}
+        if tool:
+            samples = [asyncio.run(first_response(module, tool, arguments, cwd, env)) for _ in range(runs)]
+            result["initialize_ms"] = median_ms([ready for ready, _ in samples])
+            result["first_call_ms"] = median_ms([first for _, first in samples])
+        results[name] = result
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="진입점별 콜드 스타트 시간 (import, initialize 응답, 첫 도구 응답)")
+    parser.add_argument("--entry-points", nargs="+", choices=list(ENTRY_POINTS), default=list(ENTRY_POINTS))
+    parser.add_argument("--runs", type=int, default=5, help="진입점별 반복 횟수 (중앙값)")
+    parser.add_argument("--baseline-ref", help="함께 측정할 비교 기준 git 커밋 (예: HEAD~1)")
+    parser.add_argument("--output", help="결과 JSON 파일 경로")
+    args = parser.parse_args()
+
+    background = BackgroundLoop("bench-mocks")
+    apps = {"openweather": create_openweather_app(), "slack": create_slack_app(), "notion": create_notion_app()}
+    runners, urls = {}, {}
+    for name, app in apps.items():
+        runners[name], urls[name] = background.run(start_mock_server(app))
+
+    report = {}
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            env = mock_env(urls, tmp)
+            trees = {"current": HERE}
+            if args.baseline_ref:
+                trees = {args.baseline_ref: os.path.join(tmp, "baseline"), "current": HERE}
+                export_ref(args.baseline_ref, trees[args.baseline_ref])
+            for label, cwd in trees.items():
+                report[label] = measure(cwd, env, args.entry_points, args.runs)
+    finally:
+        for runner in runners.values():
+            background.run(runner.cleanup())
+        background.stop()
+
+    print(f"📊 콜드 스타트 (중앙값, {args.runs}회)")
+    print(f"{'entry':<10} {'tree':<12} {'import ms':>10} {'init ms':>9} {'1st call ms':>12}")
+    for name in args.entry_points:
+        for label, results in report.items():
+            r = results[name]
+            print(f"{name:<10} {label:<12} {r['import_ms']:>10} {r.get('initialize_ms', '-'):>9} {r.get('first_call_ms', '-'):>12}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 결과 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from background_loop import BackgroundLoop
+from bench_transport import free_port, wait_healthy
+from forecast_provider import WEATHER_PROVIDERS
+from forecast_series import ForecastSeries
+from mcp_pool import MCPClientPool
+from mock_services import (STATS, create_notion_app, create_openweather_app, create_slack_app,
+                           sample_forecast_list, start_mock_server)
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(HERE, "bench_baseline.json")
+
+CITIES = ["서울", "부산", "대구", "인천", "광주", "대전", "울산", "제주"]
+DATABASE_ID = "bench-database"
+QUESTIONS = ["오늘 날씨 어때?", "내일 비 와?", "바람 세?", "외출하기 좋아?", "모레 기온은?"]
+
+FORECAST = json.dumps(ForecastSeries.from_owm("서울", sample_forecast_list("서울", 40)).to_columnar(),
+                      ensure_ascii=False, separators=(",", ":"))
+ANALYSIS = json.dumps({
+    "location": "서울",
+    "analysis_time": "2024-01-01T09:00:00",
+    "temperature": {"avg": 18.5, "min": 15.2, "max": 22.1},
+    "humidity": {"avg": 65, "min": 55, "max": 75},
+    "summary": "서울 지역의 현재 날씨는 온화하며, 평균 기온 18.5°C, 습도 65%입니다."
+}, ensure_ascii=False)
+
+
+def city(i):
+    return CITIES[i % len(CITIES)]
+
+
+# 서버별 (스크립트, [(도구, 인자 생성 함수)]) - i: 요청 번호
+SUITES = {
+    "weather": ("weather_mcp_server.py", [
+        ("get_weather_data", lambda i: {"location": city(i), "days": 3}),
+        ("get_weather_data_batch", lambda i: {"locations": [city(i + k) for k in range(4)], "days": 3}),
+        ("get_weather_analysis", lambda i: {"location": city(i), "days": 3}),
+        ("analyze_weather_trend", lambda i: {"weather_data": FORECAST}),
+        ("query_weather_history", lambda i: {"location": city(i), "bucket": "1d"}),
+        ("send_to_slack", lambda i: {"token": "xoxb-bench", "channel": f"#bench{i % 50}", "message": f"벤치마크 {i}"}),
+        ("get_cache_stats", lambda i: {}),
+        ("get_prefetch_stats", lambda i: {})
+    ]),
+    "notion": ("notion_weather_server.py", [
+        ("create_weather_page", lambda i: {"database_id": DATABASE_ID, "location": city(i), "weather_data": ANALYSIS}),
+        ("get_weather_and_save", lambda i: {"database_id": DATABASE_ID, "location": city(i)}),
+        ("create_weather_pages_batch", lambda i: {
+            "database_id": DATABASE_ID,
+            "items": [{"location": f"{city(i + k)}{i}", "weather_data": json.loads(ANALYSIS)} for k in range(4)]
+        })
+    ]),
+    "qchat": ("qchat_weather_server.py", [
+        ("analyze_weather_query", lambda i: {"query": QUESTIONS[i % len(QUESTIONS)], "location": city(i)}),
+        ("get_weather_answer", lambda i: {"question": QUESTIONS[i % len(QUESTIONS)], "location": city(i)}),
+        ("get_answer_cache_stats", lambda i: {})
+    ]),
+    "simple": ("simple_weather_server.py", [
+        ("get_sample_weather", lambda i: {"location": city(i)})
+    ])
+}
+
+
+def percentile(values, q):
+    # values는 정렬된 목록 - 최근접 순위 방식
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, int(round(q * len(values))) - 1))]
+
+
+def process_usage(pid):
+    # 리눅스 /proc 기준 CPU 시간(초)과 현재/최대 RSS(MB) - 읽을 수 없으면 None
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open(f"/proc/{pid}/status") as f:
+            status = dict(line.split(":", 1) for line in f if ":" in line)
+    except OSError:
+        return None
+    ticks = os.sysconf("SC_CLK_TCK")
+    return {
+        "cpu_s": (int(fields[11]) + int(fields[12])) / ticks,
+        "rss_mb": round(int(status["VmRSS"].split()[0]) / 1024, 1),
+        "peak_rss_mb": round(int(status["VmHWM"].split()[0]) / 1024, 1)
+    }
+
+
+def failed(result):
+    if result.isError:
+        return True
+    try:
+        payload = json.loads(result.content[0].text)
+    except (IndexError, ValueError):
+        return False
+    return isinstance(payload, dict) and ("error" in payload or payload.get("success") is False)
+
+
+async def drive(pool, tool, make_args, requests, concurrency, warmup):
+    for i in range(warmup):
+        await pool.call_tool(tool, make_args(i))
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async def one(i):
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                result = await pool.call_tool(tool, make_args(i))
+            except Exception:
+                errors += 1
+                return
+            latencies.append(time.perf_counter() - started)
+            if failed(result):
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(warmup + i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "concurrency": concurrency,
+        "rps": round(requests / elapsed, 1),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 2) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2)
+    }
+
+
+def upstream_calls(mocks):
+    return {name: app[STATS]["calls"] for name, app in mocks.items()}
+
+
+async def bench_server(name, env, mocks, tools, args):
+    script, suite = SUITES[name]
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, script, "--transport", "http", "--port", str(port), "--max-concurrency", str(args.concurrency)],
+        cwd=HERE, env=env, stdout=subprocess.DEVNULL
+    )
+    pool = MCPClientPool(f"http://127.0.0.1:{port}/mcp", size=1, session_concurrency=args.concurrency)
+    results = {}
+    try:
+        await wait_healthy(f"http://127.0.0.1:{port}/health")
+        for tool, make_args in suite:
+            if tools and tool not in tools:
+                continue
+            before, calls = process_usage(server.pid), upstream_calls(mocks)
+            result = await drive(pool, tool, make_args, args.requests, args.concurrency, args.warmup)
+            after = process_usage(server.pid)
+            if before and after:
+                result["server_cpu_s"] = round(after["cpu_s"] - before["cpu_s"], 3)
+                result["server_rss_mb"] = after["rss_mb"]
+                result["server_peak_rss_mb"] = after["peak_rss_mb"]
+            result["upstream_calls"] = {k: v - calls[k] for k, v in upstream_calls(mocks).items() if v != calls[k]}
+            results[f"{name}.{tool}"] = result
+            print_row(f"{name}.{tool}", result)
+    finally:
+        await pool.close()
+        server.terminate()
+        server.wait()
+    return results
+
+
+def mock_env(urls, tmp, concurrency=8, provider="owm"):
+    # 외부 API는 모두 모의 서버로, 속도 제한은 벤치마크가 막히지 않을 만큼 넉넉하게
+    # provider: 예보 백엔드 - owm이면 서버별 기본값(모의 OpenWeatherMap), replay/synthetic이면 모든 서버가 그 백엔드
+    env = dict(
+        os.environ,
+        OPENWEATHER_API_URL=f"{urls['openweather']}/data/2.5/forecast",
+        OPENWEATHER_API_KEY="bench",
+        SLACK_API_URL=urls["slack"],
+        SLACK_RATE_PER_CHANNEL="1000",
+        SLACK_BURST="1000",
+        NOTION_API_URL=urls["notion"],
+        NOTION_TOKEN="secret_bench",
+        NOTION_RATE_LIMIT="10000",
+        NOTION_CONCURRENCY=str(concurrency),
+        NOTION_INDEX_PATH=os.path.join(tmp, "notion_index.db"),
+        WEATHER_STORE_PATH=os.path.join(tmp, "weather_history.db"),
+        UPSTREAM_BUDGET="1000000",
+        PREFETCH_ENABLED="false"
+    )
+    for key in [key for key in env if key.startswith("WEATHER_PROVIDER") or key.startswith("FORECAST_")]:
+        del env[key]
+    if provider == "replay":
+        # 모의 OpenWeatherMap과 같은 값을 기록 파일로 - 네트워크 없이 같은 데이터를 재생
+        fixture = os.path.join(tmp, "forecast_replay.json")
+        with open(fixture, "w", encoding="utf-8") as f:
+            json.dump({"*": {"list": sample_forecast_list("서울", 40)},
+                       **{c: {"list": sample_forecast_list(c, 40)} for c in CITIES}}, f, ensure_ascii=False)
+        env["FORECAST_FIXTURE"] = fixture
+    if provider != "owm":
+        env["WEATHER_PROVIDER"] = provider
+    return env
+
+
+def print_header():
+    print(f"{'tool':<40} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'err':>4} {'cpu s':>6} {'rss MB':>7}")
+
+
+def print_row(name, r):
+    print(f"{name:<40} {r['rps']:>8} {r['p50_ms']:>8} {r['p95_ms']:>8} {r['p99_ms']:>8} {r['errors']:>4} "
+          f"{r.get('server_cpu_s', '-'):>6} {r.get('server_rss_mb', '-'):>7}")
+
+
+def compare(results, baseline, tolerance):
+    """기준선 대비 p95 지연이 tolerance보다 늘었거나 처리량이 그만큼 줄었거나 오류가 생긴 도구 목록"""
+    regressions = []
+    for name, r in results.items():
+        b = baseline.get(name)
+        if not b:
+            continue
+        reasons = []
+        if b["p95_ms"] and r["p95_ms"] > b["p95_ms"] * (1 + tolerance):
+            reasons.append(f"p95 {b['p95_ms']} → {r['p95_ms']} ms")
+        if b["rps"] and r["rps"] < b["rps"] * (1 - tolerance):
+            reasons.append(f"req/s {b['rps']} → {r['rps']}")
+        if r["errors"] > b.get("errors", 0):
+            reasons.append(f"오류 {b.get('errors', 0)} → {r['errors']}")
+        if reasons:
+            regressions.append((name, reasons))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="모든 MCP 도구 부하/지연 벤치마크 (모의 OpenWeatherMap·Slack·Notion 서버 사용)")
+    parser.add_argument("--servers", nargs="+", choices=list(SUITES), default=list(SUITES))
+    parser.add_argument("--only", nargs="+", default=None, help="이 도구들만 실행")
+    parser.add_argument("--concurrency", type=int, default=8, help="동시 요청 수")
+    parser.add_argument("--requests", type=int, default=200, help="도구당 요청 수")
+    parser.add_argument("--warmup", type=int, default=5, help="측정 전 워밍업 요청 수")
+    parser.add_argument("--upstream-latency", type=float, default=0.0, help="모의 외부 API 응답 지연(초)")
+    parser.add_argument("--provider", choices=WEATHER_PROVIDERS, default="owm",
+                        help="예보 백엔드 (replay/synthetic: 외부 API 없이 최대 속도)")
+    parser.add_argument("--output", help="결과 JSON 파일 경로")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="비교할 기준선 JSON")
+    parser.add_argument("--save-baseline", action="store_true", help="이번 결과를 기준선으로 저장")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="회귀로 볼 변화 비율")
+    args = parser.parse_args()
+
+    background = BackgroundLoop("bench-mocks")
+    mocks = {
+        "openweather": create_openweather_app(latency=args.upstream_latency),
+        "slack": create_slack_app(latency=args.upstream_latency),
+        "notion": create_notion_app(latency=args.upstream_latency)
+    }
+    runners, urls = {}, {}
+    for name, app in mocks.items():
+        runners[name], urls[name] = background.run(start_mock_server(app))
+
+    results = {}
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            env = mock_env(urls, tmp, args.concurrency, args.provider)
+
+            print(f"📊 동시 {args.concurrency} / 도구당 {args.requests}건 (워밍업 {args.warmup}건)")
+            print_header()
+            for name in args.servers:
+                results.update(asyncio.run(bench_server(name, env, mocks, args.only, args)))
+    finally:
+        for runner in runners.values():
+            background.run(runner.cleanup())
+        background.stop()
+
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "config": {"concurrency": args.concurrency, "requests": args.requests, "warmup": args.warmup,
+                   "upstream_latency": args.upstream_latency, "provider": args.provider},
+        "results": results
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 결과 저장: {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 기준선 저장: {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print("ℹ️ 기준선이 없습니다 (--save-baseline으로 저장)")
+        return
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline["results"], args.tolerance)
+    if not regressions:
+        print(f"✅ 기준선({baseline['created_at']}) 대비 회귀 없음 (허용 {args.tolerance:.0%})")
+        return
+    for name, reasons in regressions:
+        print(f"❌ {name}: {', '.join(reasons)}")
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import aiohttp
+from mcp import StdioServerParameters
+
+from mcp_pool import MCPClientPool
+from mock_services import sample_forecast_list
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# 서버별 부하 도구와 인자 (i: 요청 번호)
+SERVERS = {
+    "qchat": ("qchat_weather_server.py", "analyze_weather_query",
+              lambda i: {"query": ["날씨 어때?", "내일 비 와?", "바람 세?", "외출하기 좋아?"][i % 4], "location": ["서울", "부산", "대구"][i % 3]}),
+    "simple": ("simple_weather_server.py", "get_sample_weather", lambda i: {"location": f"지역{i % 10}"}),
+    "weather": ("weather_mcp_server.py", "get_cache_stats", lambda i: {})
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def server_env(fixture):
+    # 네트워크 없이 같은 예보로 비교 - 미리 갱신/이력 저장은 끈다
+    return dict(os.environ, FORECAST_FIXTURE=fixture, PREFETCH_ENABLED="false", WEATHER_STORE_PATH="")
+
+
+async def wait_healthy(url, timeout=15):
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as session:
+        while True:
+            try:
+                async with session.get(url) as response:
+                    return await response.json()
+            except aiohttp.ClientError:
+                if time.monotonic() > deadline:
+                    raise
+                await asyncio.sleep(0.1)
+
+
+async def run_clients(targets, requests, tool, make_args):
+    # 클라이언트마다 세션 하나, 각자 순서대로 요청
+    pools = [MCPClientPool(target, size=1) for target in targets]
+    try:
+        started = time.perf_counter()
+        await asyncio.gather(*(pool.call_tool(tool, make_args(0)) for pool in pools))
+        connect = time.perf_counter() - started
+
+        latencies = []
+
+        async def client(index, pool):
+            for i in range(requests):
+                t = time.perf_counter()
+                result = await pool.call_tool(tool, make_args(index * requests + i))
+                latencies.append(time.perf_counter() - t)
+                if "error" in json.loads(result.content[0].text):
+                    raise RuntimeError(result.content[0].text)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client(i, pool) for i, pool in enumerate(pools)))
+        elapsed = time.perf_counter() - started
+    finally:
+        await asyncio.gather(*(pool.close() for pool in pools))
+
+    latencies.sort()
+    return {
+        "connect_s": round(connect, 3),
+        "requests": len(latencies),
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 2)
+    }
+
+
+async def bench_stdio(script, env, clients, requests, tool, make_args):
+    params = StdioServerParameters(command=sys.executable, args=[script], cwd=HERE, env=env)
+    result = await run_clients([params] * clients, requests, tool, make_args)
+    return dict(result, server_processes=clients)
+
+
+async def bench_http(script, env, clients, requests, tool, make_args, max_concurrency):
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, script, "--transport", "http", "--port", str(port), "--max-concurrency", str(max_concurrency)],
+        cwd=HERE, env=env, stdout=subprocess.DEVNULL
+    )
+    try:
+        await wait_healthy(f"http://127.0.0.1:{port}/health")
+        result = await run_clients([f"http://127.0.0.1:{port}/mcp"] * clients, requests, tool, make_args)
+        health = await wait_healthy(f"http://127.0.0.1:{port}/health")
+        return dict(result, server_processes=1, max_in_flight=health["max_in_flight"], queued=health["queued"])
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MCP 전송 방식별 처리량 비교 (stdio: 클라이언트마다 프로세스, http: 공유 서버 하나)")
+    parser.add_argument("--server", choices=list(SERVERS), default="qchat")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--requests", type=int, default=50, help="클라이언트당 요청 수")
+    parser.add_argument("--max-concurrency", type=int, default=64)
+    args = parser.parse_args()
+
+    script, tool, make_args = SERVERS[args.server]
+    with tempfile.TemporaryDirectory() as tmp:
+        fixture = os.path.join(tmp, "forecast.json")
+        start = datetime.fromtimestamp(time.time() // 10800 * 10800)
+        with open(fixture, "w", encoding="utf-8") as f:
+            json.dump({"*": sample_forecast_list("서울", 40, start)}, f)
+        env = server_env(fixture)
+
+        print(f"📊 {args.server} 서버 / {tool} / 클라이언트당 {args.requests}건")
+        print(f"{'clients':>8} {'transport':>9} {'procs':>5} {'connect':>8} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8}")
+        for clients in args.clients:
+            for name, bench in [
+                ("stdio", bench_stdio(script, env, clients, args.requests, tool, make_args)),
+                ("http", bench_http(script, env, clients, args.requests, tool, make_args, args.max_concurrency))
+            ]:
+                r = asyncio.run(bench)
+                print(f"{clients:>8} {name:>9} {r['server_processes']:>5} {r['connect_s']:>7}s {r['rps']:>9} "
+                      f"{r['p50_ms']:>8} {r['p95_ms']:>8}")
+
+
+if __name__ == "__main__":
+    main()
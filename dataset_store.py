@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+import os
+import secrets
+import time
+from collections import OrderedDict
+
+
+class DatasetStore:
+    """서버 측에 보관한 예보 데이터셋을 불투명 핸들로 다시 찾기 위한 LRU 저장소"""
+
+    def __init__(self, max_size=None, ttl=None, clock=time.monotonic):
+        self.max_size = max_size or int(os.getenv("DATASET_STORE_SIZE", "512"))
+        self.ttl = ttl or float(os.getenv("DATASET_STORE_TTL", "1800"))
+        self.clock = clock
+        self._items = OrderedDict()
+
+    def put(self, dataset):
+        handle = f"ds_{secrets.token_hex(8)}"
+        self._items[handle] = (self.clock(), dataset)
+        while len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+        return handle
+
+    def get(self, handle):
+        item = self._items.get(handle)
+        if item is None:
+            return None
+        stored_at, dataset = item
+        if self.clock() - stored_at > self.ttl:
+            del self._items[handle]
+            return None
+        self._items.move_to_end(handle)
+        return dataset
+
+    def __len__(self):
+        return len(self._items)
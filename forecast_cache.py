@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+import asyncio
+import os
+import time
+from collections import OrderedDict
+
+# 3시간 간격 예보이므로 하루 8개
+STEPS_PER_DAY = 8
+
+
+def normalize_location(location):
+    return " ".join(location.split()).lower()
+
+
+class CacheEntry:
+    __slots__ = ("days", "value", "stored_at")
+
+    def __init__(self, days, value, stored_at):
+        self.days = days
+        self.value = value
+        self.stored_at = stored_at
+
+
+class ForecastCache:
+    """(지역, 일수, 단위, 언어) 기준 TTL + LRU 예보 캐시"""
+
+    def __init__(self, ttl=None, max_size=None, serve_stale=None, clock=time.monotonic):
+        self.ttl = ttl if ttl is not None else float(os.getenv("WEATHER_CACHE_TTL", "600"))
+        self.max_size = max_size if max_size is not None else int(os.getenv("WEATHER_CACHE_SIZE", "256"))
+        if serve_stale is None:
+            serve_stale = os.getenv("WEATHER_CACHE_SERVE_STALE", "false").lower() in ("1", "true", "yes")
+        self.serve_stale = serve_stale
+        self.clock = clock
+
+        self._entries = OrderedDict()
+        self._refreshing = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.evictions = 0
+        self.refreshes = 0
+
+    @staticmethod
+    def key(location, days, units="metric", lang="kr"):
+        return (normalize_location(location), int(days), units, lang)
+
+    @staticmethod
+    def _slice(value, days):
+        # 더 긴 기간의 예보로 짧은 기간 요청에 응답 (ForecastSeries 또는 dict)
+        if isinstance(value, dict):
+            return dict(value, forecasts=value["forecasts"][:days * STEPS_PER_DAY])
+        return value.head(days * STEPS_PER_DAY)
+
+    def lookup(self, location, days, units="metric", lang="kr"):
+        # (항목, 신선 여부) - 요청 일수를 덮는 항목이 없으면 (None, False)
+        location, days, units, lang = self.key(location, days, units, lang)
+        entry = self._entries.get((location, units, lang))
+        if entry is None or entry.days < days:
+            return None, False
+        return entry, self.clock() - entry.stored_at < self.ttl
+
+    def put(self, location, days, value, units="metric", lang="kr"):
+        location, days, units, lang = self.key(location, days, units, lang)
+        slot = (location, units, lang)
+        self._entries[slot] = CacheEntry(days, value, self.clock())
+        self._entries.move_to_end(slot)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get(self, location, days, fetch, units="metric", lang="kr"):
+        """fetch(days)는 ForecastSeries(또는 예전 형식의 예보 dict)를 돌려주는 코루틴 함수 - 실패 시 예외를 던지며 캐시하지 않는다"""
+        entry, fresh = self.lookup(location, days, units, lang)
+        slot = (normalize_location(location), units, lang)
+
+        if entry is not None and fresh:
+            self.hits += 1
+            self._entries.move_to_end(slot)
+            return self._slice(entry.value, days)
+
+        if entry is not None and self.serve_stale:
+            self.stale_hits += 1
+            self._entries.move_to_end(slot)
+            self._refresh_in_background(slot, entry.days, fetch)
+            return self._slice(entry.value, days)
+
+        self.misses += 1
+        fetch_days = max(days, entry.days) if entry is not None else days
+        value = await fetch(fetch_days)
+        self.put(location, fetch_days, value, units, lang)
+        return self._slice(value, days)
+
+    def _refresh_in_background(self, slot, days, fetch):
+        # 같은 항목에 대해 백그라운드 갱신은 하나만 실행
+        if slot in self._refreshing:
+            return
+
+        async def refresh():
+            try:
+                value = await fetch(days)
+                self.put(slot[0], days, value, slot[1], slot[2])
+                self.refreshes += 1
+            except Exception:
+                # 갱신 실패 시 기존 항목을 그대로 둔다
+                pass
+            finally:
+                self._refreshing.pop(slot, None)
+
+        self._refreshing[slot] = asyncio.get_running_loop().create_task(refresh())
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "serve_stale": self.serve_stale,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "background_refreshes": self.refreshes,
+            "hit_rate": round((self.hits + self.stale_hits) / lookups, 3) if lookups else 0.0
+        }
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+import asyncio
+import json
+import math
+import os
+import sys
+import time
+import zlib
+from datetime import datetime, timedelta, timezone
+
+from forecast_cache import STEPS_PER_DAY, ForecastCache, normalize_location
+from forecast_series import ForecastSeries
+from metrics import metrics
+from single_flight import SingleFlight
+
+OPENWEATHER_API_URL = os.getenv("OPENWEATHER_API_URL", "http://api.openweathermap.org/data/2.5/forecast")
+# 예보 백엔드 - owm: OpenWeatherMap, replay: 기록해 둔 응답 파일, synthetic: 지역별로 항상 같은 값을 내는 생성기
+WEATHER_PROVIDERS = ("owm", "replay", "synthetic")
+SYNTHETIC_DESCRIPTIONS = ["맑음", "구름조금", "흐림", "약한 비", "비", "눈"]
+
+
+class WeatherAPIError(Exception):
+    pass
+
+
+async def fetch_owm(session, url, location, days, units="metric", lang="kr"):
+    # OpenWeatherMap API 사용 (무료)
+    params = {
+        "q": location,
+        "appid": os.getenv("OPENWEATHER_API_KEY", "demo_key"),
+        "units": units,
+        "lang": lang,
+        "cnt": days * STEPS_PER_DAY  # 3시간 간격
+    }
+    with metrics.phase("upstream"):
+        async with session.get(url, params=params) as response:
+            if response.status != 200:
+                raise WeatherAPIError(f"API 오류: {response.status}")
+            body = await response.read()
+    with metrics.phase("parse"):
+        data = json.loads(body)
+        # 예보 지점마다 dict를 만들지 않고 열 배열로 보관
+        return ForecastSeries.from_owm(location, data.get("list", []))
+
+
+class OpenWeatherFetcher:
+    """공용 커넥션 풀로 OpenWeatherMap 예보를 받아오는 기본 fetcher"""
+
+    def __init__(self, pool, url=None, budget=None):
+        self.pool = pool
+        self.url = url or OPENWEATHER_API_URL
+        self.budget = budget
+
+    async def __call__(self, location, days, units="metric", lang="kr"):
+        if self.budget is not None:
+            self.budget.spend()
+        return await fetch_owm(self.pool.session(), self.url, location, days, units, lang)
+
+
+def synthetic_forecast_list(location, count, start=None):
+    # 지역명 기반으로 항상 같은 값을 내는 OpenWeatherMap 형식 예보 목록
+    seed = zlib.crc32(location.encode("utf-8"))
+    start = start or datetime(2024, 1, 1, 0, 0)
+    base_temp = 5 + seed % 20
+    items = []
+    for i in range(count):
+        when = start + timedelta(hours=3 * i)
+        phase = math.sin((when.hour - 9) / 24 * 2 * math.pi)
+        items.append({
+            "dt": int(when.timestamp()),
+            "main": {
+                "temp": round(base_temp + 6 * phase + (seed >> (i % 16) & 3) * 0.3, 2),
+                "humidity": 50 + (seed + i * 7) % 40
+            },
+            "weather": [{"description": SYNTHETIC_DESCRIPTIONS[(seed + i) % len(SYNTHETIC_DESCRIPTIONS)]}],
+            "wind": {"speed": round(1 + (seed + i) % 70 / 10, 1)},
+            "pop": round(((seed + i * 13) % 100) / 100, 2),
+            "dt_txt": when.strftime("%Y-%m-%d %H:%M:%S")
+        })
+    return items
+
+
+class SyntheticFetcher:
+    """네트워크 없이 예보를 만들어 내는 fetcher - 샘플 화면, 오프라인 개발용"""
+
+    def __init__(self, start=None):
+        # start를 주지 않으면 지금부터의 예보 (3시간 단위로 내림)
+        self.start = start
+        self.calls = 0
+
+    async def __call__(self, location, days, units="metric", lang="kr"):
+        self.calls += 1
+        start = self.start
+        if start is None:
+            now = int(time.time()) // 10800 * 10800
+            start = datetime.fromtimestamp(now, timezone.utc).replace(tzinfo=None)
+        return ForecastSeries.from_owm(location, synthetic_forecast_list(location, days * STEPS_PER_DAY, start))
+
+
+class FixtureFetcher:
+    """기록해 둔 응답 파일(OpenWeatherMap 응답 JSON)을 재생하는 fetcher - 부하 테스트/오프라인용"""
+
+    def __init__(self, source):
+        # source: JSON 파일 경로 또는 {지역: 응답 또는 list} - "*"는 모든 지역 공용
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, encoding="utf-8") as f:
+                source = json.load(f)
+        self.payloads = {key if key == "*" else normalize_location(key): value for key, value in source.items()}
+        self.calls = 0
+
+    async def __call__(self, location, days, units="metric", lang="kr"):
+        self.calls += 1
+        payload = self.payloads.get(normalize_location(location), self.payloads.get("*"))
+        if payload is None:
+            raise WeatherAPIError("API 오류: 404")
+        items = payload.get("list", []) if isinstance(payload, dict) else payload
+        return ForecastSeries.from_owm(location, items[:days * STEPS_PER_DAY])
+
+
+class RecordingFetcher:
+    """다른 fetcher의 응답을 지역별로 파일에 남기는 fetcher - 나중에 FixtureFetcher로 재생"""
+
+    def __init__(self, fetcher, path):
+        self.fetcher = fetcher
+        self.path = path
+        self.payloads = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.payloads = json.load(f)
+
+    async def __call__(self, location, days, units="metric", lang="kr"):
+        series = await self.fetcher(location, days, units, lang)
+        # 같은 지역은 더 긴 예보만 남긴다 (짧은 요청은 재생할 때 앞부분을 잘라 쓴다)
+        key = normalize_location(location)
+        if len(series) >= len(self.payloads.get(key, {}).get("list", [])):
+            self.payloads[key] = {"list": series.to_owm()}
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.payloads, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+        return series
+
+
+class ForecastProvider:
+    """fetcher 앞에 TTL 캐시와 요청 병합을 두는 공용 예보 제공자 - 캐시가 따뜻하면 네트워크 호출 없음
+
+    store를 주면 새로 받은 예보를 store.append_async(series, units)로 이력에 남긴다 (응답을 기다리게 하지 않고 뒤에서).
+    """
+
+    def __init__(self, fetcher, cache=None, flights=None, store=None):
+        self.fetcher = fetcher
+        self.cache = cache or ForecastCache()
+        self.flights = flights or SingleFlight()
+        self.store = store
+        # 진행 중인 이력 기록 - 태스크가 중간에 사라지지 않도록 참조를 쥐고 있는다
+        self._writes = set()
+
+    def _fetch(self, location, days, units, lang):
+        # 동시에 들어온 같은 요청은 하나의 fetch 결과를 공유
+        return self.flights.do(
+            ForecastCache.key(location, days, units, lang),
+            lambda: self._fetch_and_store(location, days, units, lang)
+        )
+
+    async def _fetch_and_store(self, location, days, units, lang):
+        series = await self.fetcher(location, days, units, lang)
+        if self.store is not None:
+            # 이력 저장이 응답을 늦추거나 실패시키지 않도록 백그라운드에서 기록
+            task = asyncio.get_running_loop().create_task(self.store.append_async(series, units))
+            self._writes.add(task)
+            task.add_done_callback(self._write_done)
+        return series
+
+    def _write_done(self, task):
+        self._writes.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"⚠️ 예보 이력 저장 실패: {task.exception()}", file=sys.stderr)
+
+    async def load(self, location, days=3, units="metric", lang="kr"):
+        return await self.cache.get(location, days, lambda fetch_days: self._fetch(location, fetch_days, units, lang), units, lang)
+
+    async def refresh(self, location, days=3, units="metric", lang="kr"):
+        # 캐시를 거치지 않고 새로 받아 덮어쓴다
+        series = await self._fetch(location, days, units, lang)
+        self.cache.put(location, days, series, units, lang)
+        return series
+
+    async def drain(self):
+        # 진행 중인 이력 기록이 끝날 때까지 기다린다 (실패는 _write_done이 이미 알린다)
+        while self._writes:
+            await asyncio.gather(*self._writes, return_exceptions=True)
+
+    async def close(self):
+        """남은 이력 기록을 마친 뒤 저장소를 닫는다"""
+        await self.drain()
+        if self.store is not None:
+            self.store.close()
+
+    def stats(self):
+        return dict(self.cache.stats(), single_flight=self.flights.stats(), fetcher=type(self.fetcher).__name__)
+
+
+def fetcher_from_env(pool, server, default="owm", budget=None):
+    """서버별 예보 백엔드 - WEATHER_PROVIDER_<SERVER> > WEATHER_PROVIDER > (FORECAST_FIXTURE가 있으면 replay) > default"""
+    fixture = os.getenv("FORECAST_FIXTURE")
+    kind = (os.getenv(f"WEATHER_PROVIDER_{server.upper()}") or os.getenv("WEATHER_PROVIDER")
+            or ("replay" if fixture else default))
+    if kind not in WEATHER_PROVIDERS:
+        raise ValueError(f"지원하지 않는 예보 백엔드입니다: {kind} ({', '.join(WEATHER_PROVIDERS)})")
+    if kind == "replay":
+        if not fixture:
+            raise ValueError("replay 백엔드에는 FORECAST_FIXTURE(기록 파일 경로)가 필요합니다")
+        return FixtureFetcher(fixture)
+    if kind == "synthetic":
+        return SyntheticFetcher()
+    fetcher = OpenWeatherFetcher(pool, budget=budget)
+    # FORECAST_RECORD를 주면 받은 응답을 replay용 파일로 남긴다
+    record = os.getenv("FORECAST_RECORD")
+    return RecordingFetcher(fetcher, record) if record else fetcher
+
+
+def provider_from_env(pool, server, default="owm"):
+    return ForecastProvider(fetcher_from_env(pool, server, default))
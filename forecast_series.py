@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+import json
+import sys
+from array import array
+from calendar import timegm
+from datetime import datetime, timezone
+
+COLUMNAR_FORMAT = "columnar"
+
+
+def parse_forecast_time(text):
+    # OpenWeatherMap dt_txt는 UTC 기준 "YYYY-MM-DD HH:MM:SS"
+    return timegm(datetime.fromisoformat(text).timetuple())
+
+
+def format_forecast_time(ts):
+    return datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+class ForecastSeries:
+    """한 지역의 예보를 열(column) 단위 타입 배열로 보관"""
+
+    __slots__ = ("location", "timestamp", "dt", "temp", "humidity", "wind_speed", "pop", "code", "descriptions", "_codes")
+
+    def __init__(self, location, timestamp=None):
+        self.location = location
+        self.timestamp = timestamp or datetime.now().isoformat()
+        self.dt = array("q")
+        self.temp = array("d")
+        self.humidity = array("B")
+        self.wind_speed = array("d")
+        # 강수 확률 (0~1, OpenWeatherMap pop)
+        self.pop = array("d")
+        self.code = array("H")
+        self.descriptions = []
+        self._codes = {}
+
+    def __len__(self):
+        return len(self.dt)
+
+    def _intern(self, description):
+        code = self._codes.get(description)
+        if code is None:
+            code = self._codes[description] = len(self.descriptions)
+            self.descriptions.append(sys.intern(description))
+        return code
+
+    def append(self, ts, temp, humidity, wind_speed, description, pop=0.0):
+        self.dt.append(int(ts))
+        self.temp.append(temp)
+        self.humidity.append(int(round(humidity)))
+        self.wind_speed.append(wind_speed or 0.0)
+        self.pop.append(pop or 0.0)
+        self.code.append(self._intern(description))
+
+    @classmethod
+    def from_owm(cls, location, items, timestamp=None):
+        # OpenWeatherMap forecast 응답의 list를 중간 dict 없이 바로 변환
+        series = cls(location, timestamp)
+        for item in items:
+            main = item["main"]
+            ts = item["dt"] if "dt" in item else parse_forecast_time(item["dt_txt"])
+            series.append(ts, main["temp"], main["humidity"], item["wind"]["speed"], item["weather"][0]["description"],
+                          item.get("pop", 0.0))
+        return series
+
+    @classmethod
+    def from_dict(cls, weather_data):
+        series = cls(weather_data.get("location"), weather_data.get("timestamp"))
+        for f in weather_data.get("forecasts", []):
+            series.append(
+                parse_forecast_time(f["datetime"]), f["temp"], f["humidity"],
+                f.get("wind_speed", 0.0), f.get("description", "")
+            )
+        return series
+
+    def to_dict(self):
+        # 기존 list-of-dict 형식 (호환용 - 강수 확률 pop은 열 형식에만 싣는다)
+        return {
+            "location": self.location,
+            "timestamp": self.timestamp,
+            "forecasts": [
+                {
+                    "datetime": format_forecast_time(ts),
+                    "temp": temp,
+                    "humidity": humidity,
+                    "description": self.descriptions[code],
+                    "wind_speed": wind_speed
+                }
+                for ts, temp, humidity, wind_speed, code in zip(self.dt, self.temp, self.humidity, self.wind_speed, self.code)
+            ]
+        }
+
+    def to_owm(self):
+        # OpenWeatherMap forecast 응답의 list 형식 (from_owm의 역변환 - 기록/재생용)
+        return [
+            {
+                "dt": ts,
+                "main": {"temp": temp, "humidity": humidity},
+                "weather": [{"description": self.descriptions[code]}],
+                "wind": {"speed": wind_speed},
+                "pop": pop,
+                "dt_txt": format_forecast_time(ts)
+            }
+            for ts, temp, humidity, wind_speed, pop, code in zip(self.dt, self.temp, self.humidity, self.wind_speed, self.pop, self.code)
+        ]
+
+    def head(self, count):
+        if count >= len(self):
+            return self
+        series = ForecastSeries(self.location, self.timestamp)
+        series.dt = self.dt[:count]
+        series.temp = self.temp[:count]
+        series.humidity = self.humidity[:count]
+        series.wind_speed = self.wind_speed[:count]
+        series.pop = self.pop[:count]
+        series.code = self.code[:count]
+        series.descriptions = self.descriptions
+        series._codes = self._codes
+        return series
+
+    def to_columnar(self):
+        return {
+            "format": COLUMNAR_FORMAT,
+            "location": self.location,
+            "timestamp": self.timestamp,
+            "descriptions": self.descriptions,
+            "columns": {
+                "dt": self.dt.tolist(),
+                "temp": self.temp.tolist(),
+                "humidity": self.humidity.tolist(),
+                "wind_speed": self.wind_speed.tolist(),
+                "pop": self.pop.tolist(),
+                "code": self.code.tolist()
+            }
+        }
+
+    @classmethod
+    def from_columnar(cls, payload):
+        series = cls(payload.get("location"), payload.get("timestamp"))
+        columns = payload["columns"]
+        series.dt = array("q", columns["dt"])
+        series.temp = array("d", columns["temp"])
+        series.humidity = array("B", columns["humidity"])
+        series.wind_speed = array("d", columns["wind_speed"])
+        # pop 열이 없는 이전 형식은 0으로 채운다
+        series.pop = array("d", columns.get("pop") or [0.0] * len(series.dt))
+        series.code = array("H", columns["code"])
+        series.descriptions = [sys.intern(d) for d in payload["descriptions"]]
+        series._codes = {d: i for i, d in enumerate(series.descriptions)}
+        return series
+
+    def dumps_columnar(self):
+        # 들여쓰기 없는 압축 직렬화
+        return json.dumps(self.to_columnar(), ensure_ascii=False, separators=(",", ":"))
+
+    def dates(self):
+        # 일별 집계용 UTC 날짜 문자열
+        import numpy as np
+        return np.datetime_as_string(self.arrays()["dt"].astype("datetime64[s]"), unit="D").tolist()
+
+    def arrays(self):
+        # 복사 없이 NumPy 배열로 보기 - NumPy는 분석할 때 처음 가져온다 (서버 시작 시간 단축)
+        import numpy as np
+        return {
+            "dt": np.frombuffer(self.dt, dtype=np.int64),
+            "temp": np.frombuffer(self.temp, dtype=np.float64),
+            "humidity": np.frombuffer(self.humidity, dtype=np.uint8),
+            "wind_speed": np.frombuffer(self.wind_speed, dtype=np.float64),
+            "pop": np.frombuffer(self.pop, dtype=np.float64)
+        }
+
+
+def load_series(payload):
+    """dict 형식/열 형식 어느 쪽이든 ForecastSeries로 변환"""
+    if isinstance(payload, ForecastSeries):
+        return payload
+    if payload.get("format") == COLUMNAR_FORMAT:
+        return ForecastSeries.from_columnar(payload)
+    return ForecastSeries.from_dict(payload)
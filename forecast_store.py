@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+import asyncio
+import itertools
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from forecast_cache import normalize_location
+from forecast_series import ForecastSeries, format_forecast_time, parse_forecast_time
+
+# 메모리 저장소마다 고유한 공유 캐시 DB 이름
+_memory_ids = itertools.count()
+
+# 다운샘플링 구간 이름 → 초
+BUCKETS = {"raw": 0, "3h": 3 * 3600, "6h": 6 * 3600, "12h": 12 * 3600, "1d": 86400}
+
+
+def parse_time(text):
+    # "YYYY-MM-DD" 또는 "YYYY-MM-DD HH:MM[:SS]" (UTC) → epoch 초
+    if text is None or isinstance(text, (int, float)):
+        return text
+    text = text.replace("T", " ").rstrip("Z")
+    if len(text) == 10:
+        text += " 00:00:00"
+    return parse_forecast_time(text)
+
+
+class ForecastStore:
+    """가져온 예보를 (지역, 예보 시각, 수집 시각) 기준으로 쌓아두는 SQLite(WAL) 시계열 저장소"""
+
+    def __init__(self, path=None, clock=time.time):
+        self.path = path if path is not None else os.getenv("WEATHER_STORE_PATH", "")
+        self.clock = clock
+        self._conn = None
+        # 비동기 기록은 전용 스레드 하나가 자기 연결로 처리 (이벤트 루프를 막지 않도록)
+        self._writer = None
+        self._executor = None
+        self._memory_name = f"file:forecast-store-{next(_memory_ids)}?mode=memory&cache=shared"
+        self.rows_written = 0
+        self.rows_skipped = 0
+
+    @property
+    def enabled(self):
+        # WEATHER_STORE_PATH를 지정한 경우에만 저장 (서버를 띄운 디렉터리마다 DB 파일이 생기지 않도록)
+        return bool(self.path)
+
+    def _connect(self):
+        if self.path == ":memory:":
+            # 조회 연결과 기록 연결이 같은 메모리 DB를 보도록 공유 캐시 사용 (기록 중에도 조회가 막히지 않게)
+            conn = sqlite3.connect(self._memory_name, uri=True, check_same_thread=False)
+            conn.execute("PRAGMA read_uncommitted=1")
+        else:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS forecasts ("
+            " location TEXT NOT NULL, forecast_time INTEGER NOT NULL, fetched_at INTEGER NOT NULL,"
+            " units TEXT NOT NULL, temp REAL, humidity INTEGER, wind_speed REAL, description TEXT,"
+            " PRIMARY KEY (location, forecast_time, fetched_at, units)) WITHOUT ROWID"
+        )
+        return conn
+
+    def _db(self):
+        if self._conn is None:
+            self._conn = self._connect()
+        return self._conn
+
+    def _writer_db(self):
+        # 기록 스레드에서만 호출
+        if self._writer is None:
+            self._writer = self._connect()
+        return self._writer
+
+    def append(self, series, units="metric", fetched_at=None):
+        """예보 한 벌을 기록 - 직전에 기록된 값과 같은 예보 시점은 건너뛴다"""
+        return self._append(self._db(), series, units, fetched_at)
+
+    async def append_async(self, series, units="metric", fetched_at=None):
+        """append와 같지만 기록 스레드에서 실행 - 기록은 연결 하나로 순서대로 처리된다"""
+        if not self.enabled or not len(series):
+            return 0
+        fetched_at = fetched_at if fetched_at is not None else self.clock()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="forecast-store")
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, lambda: self._append(self._writer_db(), series, units, fetched_at)
+        )
+
+    def _append(self, db, series, units, fetched_at):
+        if not self.enabled or not len(series):
+            return 0
+        location = normalize_location(series.location)
+        fetched_at = int(fetched_at if fetched_at is not None else self.clock())
+
+        sql, params = self._latest_rows(series.location, units, series.dt[0], series.dt[-1], fetched_at)
+        latest = {row[0]: row[1:] for row in db.execute(sql, params)}
+        rows = [
+            (location, ts, fetched_at, units, temp, humidity, wind_speed, series.descriptions[code])
+            for ts, temp, humidity, wind_speed, code in zip(series.dt, series.temp, series.humidity, series.wind_speed, series.code)
+            if latest.get(ts) != (temp, humidity, wind_speed, series.descriptions[code])
+        ]
+        with db:
+            db.executemany("INSERT OR REPLACE INTO forecasts VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        self.rows_written += len(rows)
+        self.rows_skipped += len(series) - len(rows)
+        return len(rows)
+
+    def _latest_rows(self, location, units, start, end, as_of):
+        # 예보 시점마다 as_of 시각까지 알려진 가장 최근 값
+        return (
+            "SELECT forecast_time, temp, humidity, wind_speed, description FROM forecasts f"
+            " WHERE location = ? AND units = ? AND forecast_time BETWEEN ? AND ?"
+            " AND fetched_at = (SELECT MAX(fetched_at) FROM forecasts"
+            "  WHERE location = f.location AND forecast_time = f.forecast_time AND units = f.units AND fetched_at <= ?)",
+            (normalize_location(location), units, start, end, as_of)
+        )
+
+    def series(self, location, start=None, end=None, units="metric", as_of=None):
+        """구간 원본을 ForecastSeries로 - 분석 엔진에 그대로 넘길 수 있다"""
+        sql, params = self._latest_rows(location, units, *self._range(start, end, as_of))
+        series = ForecastSeries(location)
+        for ts, temp, humidity, wind_speed, description in self._db().execute(sql + " ORDER BY forecast_time", params):
+            series.append(ts, temp, humidity, wind_speed, description)
+        return series
+
+    def downsample(self, location, bucket="1d", start=None, end=None, units="metric", as_of=None):
+        seconds = BUCKETS[bucket]
+        sql, params = self._latest_rows(location, units, *self._range(start, end, as_of))
+        rows = self._db().execute(
+            f"SELECT (forecast_time / {seconds}) * {seconds} AS bucket,"
+            " AVG(temp), MIN(temp), MAX(temp), AVG(humidity), MAX(wind_speed), COUNT(*)"
+            f" FROM ({sql}) GROUP BY bucket ORDER BY bucket",
+            params
+        ).fetchall()
+        return [
+            {
+                "time": format_forecast_time(ts),
+                "temp_avg": round(temp_avg, 1),
+                "temp_min": temp_min,
+                "temp_max": temp_max,
+                "humidity_avg": round(humidity_avg, 1),
+                "wind_max": wind_max,
+                "samples": samples
+            }
+            for ts, temp_avg, temp_min, temp_max, humidity_avg, wind_max, samples in rows
+        ]
+
+    def _range(self, start, end, as_of):
+        start = parse_time(start)
+        end = parse_time(end)
+        as_of = parse_time(as_of)
+        return (
+            start if start is not None else 0,
+            end if end is not None else 2 ** 62,
+            as_of if as_of is not None else 2 ** 62
+        )
+
+    def stats(self):
+        if not self.enabled:
+            return {"enabled": False}
+        db = self._db()
+        rows, locations = db.execute("SELECT COUNT(*), COUNT(DISTINCT location) FROM forecasts").fetchone()
+        return {
+            "enabled": True,
+            "path": self.path,
+            "rows": rows,
+            "locations": locations,
+            "rows_written": self.rows_written,
+            "rows_skipped": self.rows_skipped
+        }
+
+    def close(self):
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            # 남은 기록을 마친 뒤 닫는다
+            executor.shutdown(wait=True)
+        writer, self._writer = self._writer, None
+        conn, self._conn = self._conn, None
+        for db in (writer, conn):
+            if db is not None:
+                db.close()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+import asyncio
+import os
+from contextlib import asynccontextmanager
+
+
+class HttpSessionPool:
+    """MCP 서버 수명 동안 공유하는 aiohttp 커넥션 풀"""
+
+    def __init__(self, limit=None, limit_per_host=None, keepalive_timeout=None,
+                 dns_cache_ttl=None, timeout=None, trace_configs=None):
+        self.limit = limit or int(os.getenv("HTTP_POOL_LIMIT", "100"))
+        self.limit_per_host = limit_per_host or int(os.getenv("HTTP_POOL_LIMIT_PER_HOST", "20"))
+        self.keepalive_timeout = keepalive_timeout or float(os.getenv("HTTP_KEEPALIVE_TIMEOUT", "30"))
+        self.dns_cache_ttl = dns_cache_ttl or int(os.getenv("HTTP_DNS_CACHE_TTL", "300"))
+        self.timeout = timeout or float(os.getenv("HTTP_TIMEOUT", "10"))
+        # aiohttp 요청 추적 (metrics.trace_configs - DNS/연결/응답 시간, 상태 코드)
+        # 호출 가능한 값이면 첫 세션을 만들 때 생성 (aiohttp import를 미루기 위해)
+        self.trace_configs = trace_configs or []
+
+        self._session = None
+        self._loop = None
+        self._users = 0
+
+    def session(self):
+        # 이벤트 루프가 바뀌면(테스트에서 asyncio.run 반복 등) 세션을 새로 만든다
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            # aiohttp는 무거워서(~0.2초) 네트워크 도구가 처음 실행될 때 가져온다
+            import aiohttp
+            if callable(self.trace_configs):
+                self.trace_configs = self.trace_configs()
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                use_dns_cache=True,
+                ttl_dns_cache=self.dns_cache_ttl
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                trace_configs=self.trace_configs or None
+            )
+            self._loop = loop
+        return self._session
+
+    async def close(self):
+        session, self._session = self._session, None
+        if session is not None and not session.closed and self._loop is asyncio.get_running_loop():
+            await session.close()
+        self._loop = None
+
+    @asynccontextmanager
+    async def lifespan(self, server):
+        # 같은 프로세스에서 여러 세션이 서버를 돌려도 풀은 하나만 유지
+        self._users += 1
+        try:
+            yield {"http": self}
+        finally:
+            self._users -= 1
+            if self._users == 0:
+                await self.close()
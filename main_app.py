@@ -3,9 +3,13 @@ import asyncio
 import json
 import os
 from datetime import datetime
-from mcp import ClientSession, StdioServerParameters
-from mcp.client.stdio import stdio_client
-from slack_bot import send_to_slack_formatted
+from mcp import StdioServerParameters
+from mcp_pool import MCPClientPool
+from prefork import PreforkParameters
+import slack_bot
+from slack_bot import send_reports_formatted, send_to_slack_formatted
+from weather_analysis import analyze_forecasts, analyze_many
+from forecast_series import ForecastSeries
 
 class WeatherAnalysisApp:
     def __init__(self):
@@ -13,45 +17,62 @@ class WeatherAnalysisApp:
             command="python", 
             args=["simple_weather_server.py"]
         )
+        # 호출마다 서버 프로세스를 띄우지 않고 초기화된 세션을 재사용
+        self.mcp_pool = MCPClientPool(self.mcp_server_params)
+        # 다중 지역 분석은 실제 API를 쓰는 날씨 서버의 배치 도구 사용
+        # WEATHER_MCP_URL이 있으면 대시보드/챗봇과 캐시·호출 예산을 공유하는 상시 HTTP 서버 사용
+        # MCP_PREFORK_SOCKET이 있으면 prefork zygote의 대기 워커를 받아 콜드 스타트를 건너뜀
+        self.weather_server_params = os.getenv("WEATHER_MCP_URL") or (
+            PreforkParameters("weather_mcp_server") if os.getenv("MCP_PREFORK_SOCKET") else StdioServerParameters(
+                command="python",
+                args=["weather_mcp_server.py"],
+                env=dict(os.environ)
+            )
+        )
+        self.weather_pool = MCPClientPool(self.weather_server_params, size=1)
     
     async def get_weather_data(self, location, days=3):
-        async with stdio_client(self.mcp_server_params) as (read, write):
-            async with ClientSession(read, write) as session:
-                await session.initialize()
-                
-                result = await session.call_tool("get_sample_weather", {
-                    "location": location
-                })
-                
-                return json.loads(result.content[0].text)
+        result = await self.mcp_pool.call_tool("get_sample_weather", {
+            "location": location,
+            "days": days
+        })
+        
+        return json.loads(result.content[0].text)
+    
+    async def get_weather_data_batch(self, locations, days=3, concurrency=None, on_progress=None):
+        # 다지역 응답은 압축 열 형식으로 받아 ForecastSeries로 복원
+        args = {"locations": list(locations), "days": days, "format": "columnar"}
+        if concurrency:
+            args["concurrency"] = concurrency
+        
+        async def progress_callback(progress, total, message):
+            if on_progress:
+                on_progress(progress, total, message)
+        
+        result = await self.weather_pool.call_tool(
+            "get_weather_data_batch", args, progress_callback=progress_callback
+        )
+        batch = json.loads(result.content[0].text)
+        for item in batch.get("results", []):
+            item["data"] = ForecastSeries.from_columnar(item["data"])
+        return batch
+    
+    async def close(self):
+        await self.mcp_pool.close()
+        await self.weather_pool.close()
+        # Slack 전송에 쓴 모듈 공용 세션도 함께 닫는다
+        await slack_bot.http.close()
     
     async def analyze_weather(self, weather_data):
-        # 간단한 분석 로직
-        forecasts = weather_data.get("forecasts", [])
-        if forecasts:
-            temps = [f["temp"] for f in forecasts]
-            humidity = [f["humidity"] for f in forecasts]
-            
-            analysis = {
-                "location": weather_data.get("location"),
-                "temperature": {
-                    "avg": round(sum(temps) / len(temps), 1),
-                    "min": min(temps),
-                    "max": max(temps)
-                },
-                "humidity": {
-                    "avg": round(sum(humidity) / len(humidity), 1)
-                },
-                "summary": f"{weather_data.get('location')} 지역 평균 기온 {round(sum(temps)/len(temps), 1)}°C"
-            }
-            return analysis
-        else:
-            return {"error": "분석할 데이터가 없습니다"}
+        return analyze_forecasts(weather_data)
     
     async def send_to_slack(self, token, channel, analysis_data):
         return await send_to_slack_formatted(token, channel, analysis_data)
     
     async def run_full_analysis(self, location, days, slack_token=None, slack_channel=None):
+        if isinstance(location, (list, tuple)):
+            return await self.run_multi_location_analysis(location, days, slack_token, slack_channel)
+        
         print(f"🌤️ {location} 날씨 분석 시작...")
         
         # 1. 날씨 데이터 수집
@@ -83,19 +104,70 @@ class WeatherAnalysisApp:
             "slack_result": slack_result
         }
 
+    async def run_multi_location_analysis(self, locations, days, slack_token=None, slack_channel=None, concurrency=None):
+        print(f"🌤️ {len(locations)}개 지역 날씨 분석 시작...")
+        
+        # 1. 날씨 데이터 일괄 수집 (지역별 완료 시마다 진행 상황 출력)
+        batch = await self.get_weather_data_batch(
+            locations, days, concurrency,
+            on_progress=lambda done, total, message: print(f"   [{int(done)}/{int(total)}] {message}")
+        )
+        if "error" in batch:
+            return {"error": batch["error"]}
+        
+        print(f"✅ 날씨 데이터 수집 완료 ({batch['succeeded']}/{batch['requested']})")
+        
+        # 2. 전 지역을 한 번에 벡터 분석
+        analyses = analyze_many([item["data"] for item in batch["results"]])
+        
+        # 3. 여러 지역 보고서를 Block Kit 메시지 몇 개로 묶어 전송 (채널 속도 제한 준수)
+        slack_results = {}
+        if slack_token and slack_channel:
+            reportable = [a for a in analyses if "error" not in a]
+            sent = await send_reports_formatted(slack_token, slack_channel, reportable)
+            slack_results = {id(a): r for a, r in zip(reportable, sent)}
+            delivered = sum(1 for r in sent if r["success"])
+            print(f"{'✅' if delivered == len(sent) else '❌'} Slack 전송 {delivered}/{len(sent)}")
+        
+        results = {}
+        for item, analysis_data in zip(batch["results"], analyses):
+            results[item["location"]] = {
+                "weather_data": item["data"],
+                "analysis_data": analysis_data,
+                "slack_result": slack_results.get(id(analysis_data))
+            }
+        
+        print("✅ 데이터 분석 완료")
+        for failure in batch["failed"]:
+            print(f"❌ {failure['location']}: {failure['error']}")
+        
+        return {
+            "results": results,
+            "failed": batch["failed"]
+        }
+
 async def main():
     app = WeatherAnalysisApp()
     
     # 환경변수에서 설정 읽기
     location = os.getenv("WEATHER_LOCATION", "서울")
+    # 쉼표로 구분된 WEATHER_LOCATIONS가 있으면 다중 지역 모드
+    locations = [l.strip() for l in os.getenv("WEATHER_LOCATIONS", "").split(",") if l.strip()]
     days = int(os.getenv("WEATHER_DAYS", "3"))
     slack_token = os.getenv("SLACK_BOT_TOKEN")
     slack_channel = os.getenv("SLACK_CHANNEL")
     
-    result = await app.run_full_analysis(location, days, slack_token, slack_channel)
+    try:
+        result = await app.run_full_analysis(locations or location, days, slack_token, slack_channel)
+    finally:
+        await app.close()
     
     if "error" in result:
         print(f"❌ 오류: {result['error']}")
+    elif locations:
+        print(f"🎉 전체 분석 완료! ({len(result['results'])}/{len(locations)}개 지역)")
+        for name, item in result["results"].items():
+            print(f"📊 {name}: {item['analysis_data'].get('summary', item['analysis_data'].get('error'))}")
     else:
         print("🎉 전체 분석 완료!")
         print(f"📊 분석 결과: {result['analysis_data']['summary']}")
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+
+import anyio
+from mcp import ClientSession
+from mcp.client.stdio import stdio_client
+from mcp.client.streamable_http import streamable_http_client
+
+from prefork import PreforkParameters, prefork_client
+
+logger = logging.getLogger(__name__)
+
+CONNECTION_ERRORS = (anyio.ClosedResourceError, anyio.BrokenResourceError, anyio.EndOfStream)
+
+
+class _Slot:
+    __slots__ = ("session", "retired", "last_used")
+
+    def __init__(self, session):
+        self.session = session
+        self.retired = asyncio.Event()
+        self.last_used = time.monotonic()
+
+
+class MCPClientPool:
+    """초기화를 마친 MCP 세션 N개를 유지하며 빌려주는 풀
+
+    server_params가 StdioServerParameters면 서버 프로세스를 직접 띄우고,
+    "http://.../mcp" 주소면 상시 실행 중인 HTTP 서버에 세션을 열고,
+    PreforkParameters면 prefork zygote가 미리 띄워 둔 워커를 받는다.
+    """
+
+    def __init__(self, server_params, size=None, health_check_interval=None, acquire_timeout=None,
+                 session_concurrency=None):
+        self.server_params = server_params
+        self.size = size or int(os.getenv("MCP_POOL_SIZE", "2"))
+        # 세션 하나에 동시에 보낼 요청 수 - MCP 서버는 요청을 동시에 처리하므로 프로세스를 늘리지 않고 다중화
+        self.session_concurrency = session_concurrency or int(os.getenv("MCP_POOL_SESSION_CONCURRENCY", "1"))
+        self.health_check_interval = health_check_interval or float(os.getenv("MCP_POOL_HEALTH_INTERVAL", "30"))
+        self.acquire_timeout = acquire_timeout or float(os.getenv("MCP_POOL_ACQUIRE_TIMEOUT", "30"))
+
+        self._idle = None
+        self._workers = []
+        self._slots = set()
+        self._closed = False
+        self.restarts = 0
+        self.last_error = None
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def start(self):
+        if self._workers:
+            return
+        self._closed = False
+        self._idle = asyncio.Queue()
+        self._workers = [asyncio.create_task(self._run_worker()) for _ in range(self.size)]
+
+    @asynccontextmanager
+    async def _connect(self):
+        if isinstance(self.server_params, str):
+            async with streamable_http_client(self.server_params) as (read, write, _):
+                yield read, write
+        elif isinstance(self.server_params, PreforkParameters):
+            async with prefork_client(self.server_params) as (read, write):
+                yield read, write
+        else:
+            async with stdio_client(self.server_params) as (read, write):
+                yield read, write
+
+    async def _run_worker(self):
+        # 연결/ClientSession은 진입한 태스크에서 빠져나와야 하므로 세션마다 태스크 하나
+        failures = 0
+        while not self._closed:
+            try:
+                async with self._connect() as (read, write):
+                    async with ClientSession(read, write) as session:
+                        await session.initialize()
+                        failures = 0
+                        slot = _Slot(session)
+                        self._slots.add(slot)
+                        if self._closed:
+                            slot.retired.set()
+                        # 동시 요청 수만큼 대기열에 넣는다 (빌릴 때마다 하나씩 꺼냄)
+                        for _ in range(self.session_concurrency):
+                            self._idle.put_nowait(slot)
+                        try:
+                            await slot.retired.wait()
+                        finally:
+                            self._slots.discard(slot)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                failures += 1
+                self.last_error = str(e)
+                logger.warning("MCP 서버 프로세스 오류: %s", e)
+
+            if not self._closed:
+                # 죽은 프로세스 재시작 (연속 실패 시 지수 백오프)
+                self.restarts += 1
+                await asyncio.sleep(min(2 ** failures - 1, 30))
+
+    async def _healthy(self, slot):
+        try:
+            await asyncio.wait_for(slot.session.send_ping(), timeout=5)
+            return True
+        except Exception:
+            return False
+
+    async def _acquire(self):
+        while True:
+            slot = await asyncio.wait_for(self._idle.get(), timeout=self.acquire_timeout)
+            if slot.retired.is_set():
+                continue
+            # 오래 쉬던 세션은 내주기 전에 ping으로 확인
+            if time.monotonic() - slot.last_used > self.health_check_interval and not await self._healthy(slot):
+                slot.retired.set()
+                continue
+            return slot
+
+    @asynccontextmanager
+    async def session(self):
+        await self.start()
+        slot = await self._acquire()
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            yield slot.session
+        except Exception:
+            # 호출 실패가 프로세스 문제라면 교체
+            if not await self._healthy(slot):
+                slot.retired.set()
+            raise
+        finally:
+            self.in_flight -= 1
+            slot.last_used = time.monotonic()
+            if not slot.retired.is_set() and not self._closed:
+                self._idle.put_nowait(slot)
+
+    async def call_tool(self, name, arguments, retries=None, **kwargs):
+        # 프로세스가 죽어 끊긴 세션이면 다른 세션(또는 재시작된 프로세스)으로 재시도
+        retries = self.size if retries is None else retries
+        for attempt in range(retries + 1):
+            try:
+                async with self.session() as session:
+                    return await session.call_tool(name, arguments, **kwargs)
+            except CONNECTION_ERRORS:
+                if attempt == retries:
+                    raise
+
+    def stats(self):
+        return {
+            "size": self.size,
+            "session_concurrency": self.session_concurrency,
+            "alive": len(self._slots),
+            "idle": self._idle.qsize() if self._idle else 0,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "restarts": self.restarts,
+            "last_error": self.last_error
+        }
+
+    async def close(self):
+        self._closed = True
+        for slot in list(self._slots):
+            slot.retired.set()
+        if self._workers:
+            # 아직 기동 중이거나 재시작 대기 중인 워커는 취소
+            _, pending = await asyncio.wait(self._workers, timeout=5)
+            for worker in pending:
+                worker.cancel()
+            await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
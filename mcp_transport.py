@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+import argparse
+import asyncio
+import contextlib
+import os
+
+from metrics import metrics, prometheus_endpoint
+
+TRANSPORTS = ("stdio", "http", "sse")
+
+
+def add_transport_args(parser, default_port=8000):
+    parser.add_argument("--transport", choices=TRANSPORTS, default=os.getenv("MCP_TRANSPORT") or "stdio",
+                        help="stdio: 클라이언트마다 프로세스 하나, http/sse: 상시 실행 서버 하나를 여러 클라이언트가 공유")
+    parser.add_argument("--host", default=os.getenv("MCP_HTTP_HOST") or "127.0.0.1")
+    parser.add_argument("--port", type=int, default=int(os.getenv("MCP_HTTP_PORT") or default_port))
+    parser.add_argument("--max-concurrency", type=int, default=int(os.getenv("MCP_MAX_CONCURRENCY") or 64),
+                        help="동시에 처리할 요청 수 상한 (초과 요청은 거절하지 않고 대기)")
+    return parser
+
+
+class ConcurrencyLimit:
+    """동시에 처리 중인 POST 요청 수를 제한하는 ASGI 미들웨어 - 초과 요청은 거절하지 않고 기다린다"""
+
+    def __init__(self, app, limit):
+        self.app = app
+        self.limit = limit
+        self._semaphore = None
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.queued = 0
+        self.requests = 0
+
+    async def __call__(self, scope, receive, send):
+        # SSE GET 스트림은 오래 열려 있으므로 제한하지 않는다
+        if scope["type"] != "http" or scope["method"] != "POST":
+            return await self.app(scope, receive, send)
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.limit)
+        if self._semaphore.locked():
+            self.queued += 1
+        async with self._semaphore:
+            self.requests += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                self.in_flight -= 1
+
+    def stats(self):
+        return {
+            "max_concurrency": self.limit,
+            "requests": self.requests,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "queued": self.queued
+        }
+
+
+def build_http_app(server, transport="http", max_concurrency=64):
+    """MCP 서버를 HTTP(streamable HTTP: /mcp, SSE: /sse + /messages/)로 여는 ASGI 앱"""
+    from mcp.server.fastmcp.server import StreamableHTTPASGIApp
+    from mcp.server.sse import SseServerTransport
+    from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+    from starlette.applications import Starlette
+    from starlette.responses import JSONResponse, PlainTextResponse, Response
+    from starlette.routing import Mount, Route
+
+    if transport == "http":
+        manager = StreamableHTTPSessionManager(app=server)
+        routes = [Route("/mcp", endpoint=StreamableHTTPASGIApp(manager))]
+        running = manager.run
+    else:
+        sse = SseServerTransport("/messages/")
+
+        async def handle_sse(request):
+            async with sse.connect_sse(request.scope, request.receive, request._send) as (read, write):
+                await server.run(read, write, server.create_initialization_options())
+            return Response()
+
+        routes = [Route("/sse", endpoint=handle_sse, methods=["GET"]), Mount("/messages/", app=sse.handle_post_message)]
+        running = contextlib.nullcontext
+
+    @contextlib.asynccontextmanager
+    async def lifespan(_):
+        # 서버 lifespan(커넥션 풀, 스케줄러 등)을 프로세스 수명 동안 한 번 잡아 두어 모든 세션이 공유
+        async with running():
+            async with server.lifespan(server):
+                yield
+
+    async def health(request):
+        return JSONResponse(dict(limiter.stats(), server=server.name, transport=transport))
+
+    async def prometheus(request):
+        return PlainTextResponse(metrics.prometheus())
+
+    routes.append(Route("/health", endpoint=health))
+    if metrics.enabled:
+        routes.append(Route("/metrics", endpoint=prometheus))
+    limiter = ConcurrencyLimit(Starlette(routes=routes, lifespan=lifespan), max_concurrency)
+    return limiter
+
+
+async def serve_stdio(server):
+    from mcp.server.stdio import stdio_server
+    async with contextlib.AsyncExitStack() as stack:
+        # stdio 모드에서는 METRICS_PORT를 주면 별도 포트로 Prometheus 텍스트를 노출
+        port = os.getenv("METRICS_PORT")
+        if port and metrics.enabled:
+            await stack.enter_async_context(prometheus_endpoint(metrics, int(port)))
+        read_stream, write_stream = await stack.enter_async_context(stdio_server())
+        await server.run(read_stream, write_stream, server.create_initialization_options())
+
+
+def serve(server, args):
+    if args.transport == "stdio":
+        asyncio.run(serve_stdio(server))
+        return
+
+    import uvicorn
+    app = build_http_app(server, args.transport, args.max_concurrency)
+    path = "/mcp" if args.transport == "http" else "/sse"
+    print(f"🌐 {server.name} MCP 서버 ({args.transport}): http://{args.host}:{args.port}{path}")
+    uvicorn.run(app, host=args.host, port=args.port, log_level=os.getenv("MCP_HTTP_LOG_LEVEL", "warning"))
+
+
+def run_server(server, description, default_port=8000):
+    parser = add_transport_args(argparse.ArgumentParser(description=description), default_port)
+    serve(server, parser.parse_args())
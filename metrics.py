@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+import os
+import time
+from bisect import bisect_left
+from contextlib import asynccontextmanager, nullcontext
+from functools import wraps
+from urllib.parse import urlsplit
+
+# METRICS_ENABLED=false면 계측 코드가 아예 끼어들지 않는다 (도구 래핑·HTTP 추적 생략)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+# 지연 히스토그램 구간 상한(ms) - 마지막 칸은 +Inf
+LATENCY_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+NULL_TIMER = nullcontext()
+
+
+class Histogram:
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, ms):
+        self.counts[bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+
+    def quantile(self, q):
+        # 구간 상한으로 근사 - 마지막 칸은 관측 최댓값
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if n and seen >= rank:
+                return LATENCY_BUCKETS_MS[i] if i < len(LATENCY_BUCKETS_MS) else self.max
+        return 0.0
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count, 3) if self.count else 0.0,
+            "p50_ms": self.quantile(0.5),
+            "p95_ms": self.quantile(0.95),
+            "p99_ms": self.quantile(0.99),
+            "max_ms": round(self.max, 3),
+            "buckets": {str(le): n for le, n in zip(LATENCY_BUCKETS_MS + ("+Inf",), self.counts) if n}
+        }
+
+
+class Timer:
+    __slots__ = ("histogram", "started")
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe((time.perf_counter() - self.started) * 1000)
+        return False
+
+
+def label_text(labels):
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}" if labels else ""
+
+
+def tool_status(result):
+    # 도구 오류 응답은 {"error": ...} 또는 {"success": false, "error": ...}로 시작 - JSON을 다시 파싱하지 않고 앞부분만 본다
+    try:
+        return "error" if '"error"' in result[0].text[:64] else "ok"
+    except (IndexError, AttributeError, TypeError):
+        return "ok"
+
+
+class Metrics:
+    """도구/단계별 지연 히스토그램, 외부 API 상태 카운터, 처리 중 게이지 (프로세스당 하나)"""
+
+    def __init__(self, enabled=None):
+        self.enabled = METRICS_ENABLED if enabled is None else enabled
+        self.started = time.time()
+        # (이름, 정렬된 라벨 튜플) → 값
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        self._phases = {}
+        self._tools = {}
+
+    def inc(self, name, value=1, **labels):
+        if self.enabled:
+            key = (name, tuple(sorted(labels.items())))
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def add_gauge(self, name, delta, **labels):
+        if self.enabled:
+            key = (name, tuple(sorted(labels.items())))
+            self.gauges[key] = self.gauges.get(key, 0) + delta
+
+    def histogram(self, name, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram()
+        return histogram
+
+    def observe(self, name, ms, **labels):
+        if self.enabled:
+            self.histogram(name, **labels).observe(ms)
+
+    def timer(self, name, **labels):
+        # with metrics.timer("phase_latency_ms", phase="parse"): ...
+        if not self.enabled:
+            return NULL_TIMER
+        return Timer(self.histogram(name, **labels))
+
+    def phase(self, phase):
+        # 가장 자주 불리는 경로 - 라벨 정렬 없이 단계 이름으로 바로 찾는다
+        if not self.enabled:
+            return NULL_TIMER
+        histogram = self._phases.get(phase)
+        if histogram is None:
+            histogram = self._phases[phase] = self.histogram("phase_latency_ms", phase=phase)
+        return Timer(histogram)
+
+    def instrument(self, call_tool):
+        """call_tool(name, arguments) 디스패처를 감싸 도구별 지연·호출 수·처리 중 요청 수 기록"""
+        if not self.enabled:
+            return call_tool
+
+        def tool_keys(name):
+            keys = self._tools[name] = (
+                ("tool_in_flight", (("tool", name),)),
+                self.histogram("tool_latency_ms", tool=name),
+                {status: ("tool_calls", (("status", status), ("tool", name))) for status in ("ok", "error", "exception")}
+            )
+            return keys
+
+        @wraps(call_tool)
+        async def wrapper(name, arguments):
+            gauge, histogram, calls = self._tools.get(name) or tool_keys(name)
+            gauges, counters = self.gauges, self.counters
+            gauges[gauge] = gauges.get(gauge, 0) + 1
+            status = "exception"
+            started = time.perf_counter()
+            try:
+                result = await call_tool(name, arguments)
+                status = tool_status(result)
+                return result
+            finally:
+                histogram.observe((time.perf_counter() - started) * 1000)
+                gauges[gauge] -= 1
+                counters[calls[status]] = counters.get(calls[status], 0) + 1
+
+        return wrapper
+
+    def trace_configs(self):
+        """aiohttp 세션에 붙이는 추적 설정 - DNS 조회, 연결 생성, 외부 API 응답 시간과 상태 코드"""
+        if not self.enabled:
+            return []
+        import aiohttp
+
+        trace = aiohttp.TraceConfig()
+
+        async def start(session, ctx, params):
+            ctx.started = time.perf_counter()
+
+        def elapsed(ctx):
+            return (time.perf_counter() - ctx.started) * 1000
+
+        async def dns_end(session, ctx, params):
+            self.observe("phase_latency_ms", elapsed(ctx), phase="dns")
+
+        async def dns_cache_hit(session, ctx, params):
+            self.inc("dns_cache", result="hit")
+
+        async def dns_cache_miss(session, ctx, params):
+            self.inc("dns_cache", result="miss")
+
+        async def connect_end(session, ctx, params):
+            self.observe("phase_latency_ms", elapsed(ctx), phase="connect")
+
+        async def request_start(session, ctx, params):
+            ctx.started = time.perf_counter()
+            ctx.host = urlsplit(str(params.url)).hostname
+            self.add_gauge("upstream_in_flight", 1, host=ctx.host)
+
+        async def request_end(session, ctx, params):
+            self.add_gauge("upstream_in_flight", -1, host=ctx.host)
+            self.observe("upstream_latency_ms", elapsed(ctx), host=ctx.host)
+            self.inc("upstream_responses", host=ctx.host, status=params.response.status)
+
+        async def request_exception(session, ctx, params):
+            self.add_gauge("upstream_in_flight", -1, host=ctx.host)
+            self.inc("upstream_responses", host=ctx.host, status=type(params.exception).__name__)
+
+        trace.on_dns_resolvehost_start.append(start)
+        trace.on_dns_resolvehost_end.append(dns_end)
+        trace.on_dns_cache_hit.append(dns_cache_hit)
+        trace.on_dns_cache_miss.append(dns_cache_miss)
+        trace.on_connection_create_start.append(start)
+        trace.on_connection_create_end.append(connect_end)
+        trace.on_request_start.append(request_start)
+        trace.on_request_end.append(request_end)
+        trace.on_request_exception.append(request_exception)
+        return [trace]
+
+    def reset(self):
+        self.counters.clear()
+        self.gauges.clear()
+        self.histograms.clear()
+        self._phases.clear()
+        self._tools.clear()
+        self.started = time.time()
+
+    def snapshot(self):
+        return {
+            "enabled": self.enabled,
+            "uptime_s": round(time.time() - self.started, 1),
+            "counters": {name + label_text(labels): v for (name, labels), v in sorted(self.counters.items(), key=str)},
+            "gauges": {name + label_text(labels): v for (name, labels), v in sorted(self.gauges.items(), key=str)},
+            "histograms": {name + label_text(labels): h.snapshot()
+                           for (name, labels), h in sorted(self.histograms.items(), key=lambda item: str(item[0]))}
+        }
+
+    def prometheus(self, prefix="mcp_"):
+        """Prometheus 텍스트 노출 형식 - 히스토그램은 초 단위 누적 구간"""
+        lines = []
+        for kind, values in (("counter", self.counters), ("gauge", self.gauges)):
+            for name in sorted({name for name, _ in values}):
+                suffix = "_total" if kind == "counter" else ""
+                lines.append(f"# TYPE {prefix}{name}{suffix} {kind}")
+                for (n, labels), v in sorted(values.items(), key=str):
+                    if n == name:
+                        lines.append(f"{prefix}{name}{suffix}{label_text(labels)} {v}")
+        for name in sorted({name for name, _ in self.histograms}):
+            metric = prefix + name.replace("_ms", "_seconds")
+            lines.append(f"# TYPE {metric} histogram")
+            for (n, labels), h in sorted(self.histograms.items(), key=lambda item: str(item[0])):
+                if n != name:
+                    continue
+                cumulative = 0
+                for le, count in zip(LATENCY_BUCKETS_MS + ("+Inf",), h.counts):
+                    cumulative += count
+                    bound = le if le == "+Inf" else f"{le / 1000:g}"
+                    lines.append(f"{metric}_bucket{label_text(labels + (('le', bound),))} {cumulative}")
+                lines.append(f"{metric}_sum{label_text(labels)} {h.total / 1000:.6f}")
+                lines.append(f"{metric}_count{label_text(labels)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+
+@asynccontextmanager
+async def prometheus_endpoint(registry, port, host="127.0.0.1"):
+    """stdio 서버용 별도 /metrics HTTP 엔드포인트 (METRICS_PORT)"""
+    from aiohttp import web
+
+    async def handle(request):
+        return web.Response(text=registry.prometheus(), content_type="text/plain", charset="utf-8")
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    try:
+        yield
+    finally:
+        await runner.cleanup()
+
+
+# 서버 프로세스 하나에 레지스트리 하나
+metrics = Metrics()
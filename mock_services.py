@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+import asyncio
+import time
+import uuid
+from collections import defaultdict, deque
+from datetime import datetime, timezone
+
+from aiohttp import web
+
+# 예보 값은 synthetic 백엔드와 같은 생성기 (모의 API와 synthetic/replay 결과가 일치)
+from forecast_provider import synthetic_forecast_list as sample_forecast_list
+
+# 벤치마크/테스트용 로컬 외부 API 대역 서버
+
+# 요청 수 등 대역 서버 통계
+STATS = web.AppKey("stats", dict)
+# Slack 대역 서버가 받은 메시지
+MESSAGES = web.AppKey("messages", list)
+# Notion 대역 서버의 페이지 (id → page)
+PAGES = web.AppKey("pages", dict)
+
+
+def create_openweather_app(latency=0.0, errors=None, delays=None):
+    # errors: {지역: HTTP 상태}, delays: {지역: 추가 지연(초)}
+    app = web.Application()
+    app[STATS] = {"calls": 0, "in_flight": 0, "max_in_flight": 0}
+    errors = errors or {}
+    delays = delays or {}
+
+    async def forecast(request):
+        stats = app[STATS]
+        stats["calls"] += 1
+        stats["in_flight"] += 1
+        stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+        try:
+            location = request.query.get("q", "서울")
+            delay = latency + delays.get(location, 0)
+            if delay:
+                await asyncio.sleep(delay)
+        finally:
+            stats["in_flight"] -= 1
+        if location in errors:
+            return web.json_response({"cod": str(errors[location]), "message": "city not found"}, status=errors[location])
+        count = int(request.query.get("cnt", "40"))
+        items = sample_forecast_list(location, count)
+        return web.json_response({"cod": "200", "cnt": len(items), "list": items, "city": {"name": location}})
+
+    app.router.add_get("/data/2.5/forecast", forecast)
+    return app
+
+
+def over_limit(windows, key, limit):
+    # 1초 슬라이딩 창에서 limit건을 넘으면 True (넘지 않으면 이번 요청을 기록)
+    now = time.monotonic()
+    window = windows[key]
+    while window and now - window[0] >= 1.0:
+        window.popleft()
+    if len(window) >= limit:
+        return True
+    window.append(now)
+    return False
+
+
+def create_slack_app(rate_limit=None, retry_after=1.0, latency=0.0):
+    # rate_limit: 채널당 1초 창에서 허용하는 메시지 수 - 넘으면 429 + Retry-After
+    app = web.Application()
+    app[STATS] = {"calls": 0, "posted": 0, "rate_limited": 0}
+    app[MESSAGES] = []
+    windows = defaultdict(deque)
+
+    async def post_message(request):
+        stats = app[STATS]
+        stats["calls"] += 1
+        if not request.headers.get("Authorization", "").startswith("Bearer "):
+            return web.json_response({"ok": False, "error": "not_authed"})
+        payload = await request.json()
+        channel = payload.get("channel")
+        if not channel or channel.startswith("missing"):
+            return web.json_response({"ok": False, "error": "channel_not_found"})
+        if latency:
+            await asyncio.sleep(latency)
+
+        if rate_limit and over_limit(windows, channel, rate_limit):
+            stats["rate_limited"] += 1
+            return web.json_response(
+                {"ok": False, "error": "ratelimited"},
+                status=429,
+                headers={"Retry-After": str(retry_after)}
+            )
+
+        stats["posted"] += 1
+        app[MESSAGES].append(payload)
+        ts = f"{time.time():.6f}"
+        return web.json_response({"ok": True, "channel": channel, "ts": ts, "message": {"ts": ts}})
+
+    app.router.add_post("/chat.postMessage", post_message)
+    return app
+
+
+def notion_time():
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def create_notion_app(rate_limit=None, retry_after=1.0, latency=0.0, lose_responses=0):
+    # rate_limit: 통합 전체 초당 요청 수, lose_responses: 처음 N건은 페이지를 만든 뒤 502 응답 (응답 유실 재현)
+    app = web.Application()
+    app[STATS] = {"calls": 0, "created": 0, "updated": 0, "queries": 0, "rate_limited": 0, "lost": 0}
+    app[PAGES] = {}
+    windows = defaultdict(deque)
+
+    def error(status, code, message, headers=None):
+        return web.json_response({"object": "error", "status": status, "code": code, "message": message},
+                                 status=status, headers=headers)
+
+    async def guard(request):
+        app[STATS]["calls"] += 1
+        if not request.headers.get("Authorization", "").startswith("Bearer "):
+            return error(401, "unauthorized", "API token is invalid.")
+        if latency:
+            await asyncio.sleep(latency)
+        if rate_limit and over_limit(windows, "integration", rate_limit):
+            app[STATS]["rate_limited"] += 1
+            return error(429, "rate_limited", "Rate limited", {"Retry-After": str(retry_after)})
+        return None
+
+    def text_of(prop):
+        items = prop.get("title") or prop.get("rich_text") or []
+        return "".join(item["text"]["content"] for item in items)
+
+    async def create_page(request):
+        rejected = await guard(request)
+        if rejected:
+            return rejected
+        payload = await request.json()
+        page_id = str(uuid.uuid4())
+        page = {
+            "object": "page",
+            "id": page_id,
+            "url": f"https://www.notion.so/{page_id.replace('-', '')}",
+            "parent": payload["parent"],
+            "properties": payload.get("properties", {}),
+            "archived": False,
+            "last_edited_time": notion_time()
+        }
+        app[PAGES][page_id] = page
+        app[STATS]["created"] += 1
+        if app[STATS]["lost"] < lose_responses:
+            app[STATS]["lost"] += 1
+            return error(502, "bad_gateway", "Bad gateway")
+        return web.json_response(page)
+
+    async def query_database(request):
+        rejected = await guard(request)
+        if rejected:
+            return rejected
+        app[STATS]["queries"] += 1
+        database_id = request.match_info["database_id"]
+        payload = await request.json() if request.can_read_body else {}
+        pages = [p for p in app[PAGES].values() if p["parent"].get("database_id") == database_id and not p["archived"]]
+        condition = payload.get("filter")
+        if condition:
+            expected = (condition.get("rich_text") or condition.get("title") or {}).get("equals")
+            pages = [p for p in pages if text_of(p["properties"].get(condition["property"], {})) == expected]
+        start = int(payload.get("start_cursor") or 0)
+        size = min(int(payload.get("page_size", 100)), 100)
+        chunk = pages[start:start + size]
+        has_more = start + size < len(pages)
+        return web.json_response({
+            "object": "list",
+            "results": chunk,
+            "has_more": has_more,
+            "next_cursor": str(start + size) if has_more else None
+        })
+
+    async def update_page(request):
+        rejected = await guard(request)
+        if rejected:
+            return rejected
+        page = app[PAGES].get(request.match_info["page_id"])
+        if page is None:
+            return error(404, "object_not_found", "Could not find page.")
+        if page["archived"]:
+            return error(400, "validation_error", "Can't edit block that is archived.")
+        payload = await request.json()
+        page["properties"].update(payload.get("properties", {}))
+        page["last_edited_time"] = notion_time()
+        app[STATS]["updated"] += 1
+        return web.json_response(page)
+
+    app.router.add_post("/pages", create_page)
+    app.router.add_patch("/pages/{page_id}", update_page)
+    app.router.add_post("/databases/{database_id}/query", query_database)
+    return app
+
+
+async def start_mock_server(app, host="127.0.0.1", port=0):
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://{host}:{port}"
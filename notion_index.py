@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+import os
+import sqlite3
+from datetime import datetime
+
+
+class NotionPageIndex:
+    """(데이터베이스, 지역, 날짜) → Notion 페이지 ID 로컬 색인 - 쓰기 전 조회 왕복을 없앤다"""
+
+    def __init__(self, path=None):
+        self.path = path or os.getenv("NOTION_INDEX_PATH", "notion_index.db")
+        self._conn = None
+
+    def _db(self):
+        # 서버를 띄우기만 하고 Notion을 쓰지 않으면 파일을 만들지 않도록 처음 쓸 때 연결
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path)
+            if self.path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS pages ("
+                " database_id TEXT NOT NULL, location TEXT NOT NULL, date TEXT NOT NULL,"
+                " page_id TEXT NOT NULL, updated_at TEXT NOT NULL,"
+                " PRIMARY KEY (database_id, location, date))"
+            )
+        return self._conn
+
+    @property
+    def opened(self):
+        return self._conn is not None
+
+    def get(self, database_id, location, date):
+        row = self._db().execute(
+            "SELECT page_id FROM pages WHERE database_id = ? AND location = ? AND date = ?",
+            (database_id, location, date)
+        ).fetchone()
+        return row[0] if row else None
+
+    def put(self, database_id, location, date, page_id):
+        with self._db() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?)",
+                (database_id, location, date, page_id, datetime.now().isoformat())
+            )
+
+    def delete(self, database_id, location, date):
+        with self._db() as db:
+            db.execute(
+                "DELETE FROM pages WHERE database_id = ? AND location = ? AND date = ?",
+                (database_id, location, date)
+            )
+
+    def replace(self, database_id, rows):
+        # 데이터베이스 하나의 색인을 한 트랜잭션으로 통째로 교체 (reconcile용)
+        now = datetime.now().isoformat()
+        with self._db() as db:
+            db.execute("DELETE FROM pages WHERE database_id = ?", (database_id,))
+            db.executemany(
+                "INSERT INTO pages VALUES (?, ?, ?, ?, ?)",
+                [(database_id, location, date, page_id, now) for location, date, page_id in rows]
+            )
+
+    def count(self, database_id=None):
+        if database_id is None:
+            return self._db().execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+        return self._db().execute("SELECT COUNT(*) FROM pages WHERE database_id = ?", (database_id,)).fetchone()[0]
+
+    def close(self):
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            conn.close()
@@ -5,9 +5,19 @@ import os
 from datetime import datetime
 from mcp.server import Server
 from mcp.types import Tool, TextContent
-import aiohttp
+from forecast_provider import provider_from_env
+from http_pool import HttpSessionPool
+from metrics import metrics
+from profiler import profiler
+from notion_writer import build_page_data, get_writer
+from notion_index import NotionPageIndex
 
-app = Server("notion-weather-mcp")
+http = HttpSessionPool(trace_configs=metrics.trace_configs)
+# 다른 서버와 같은 예보 경로 (WEATHER_PROVIDER_NOTION / WEATHER_PROVIDER)
+forecast = provider_from_env(http, "notion")
+# (지역, 날짜) → 페이지 ID 색인 - get_weather_and_save가 같은 날 페이지를 갱신하도록
+page_index = NotionPageIndex()
+app = Server("notion-weather-mcp", lifespan=http.lifespan)
 
 @app.list_tools()
 async def list_tools():
@@ -27,24 +37,96 @@ async def list_tools():
         ),
         Tool(
             name="get_weather_and_save",
-            description="날씨 데이터 수집 후 Notion에 저장",
+            description="날씨 데이터 수집 후 Notion에 저장 (지역·날짜별 페이지 하나를 갱신)",
             inputSchema={
                 "type": "object",
                 "properties": {
                     "location": {"type": "string", "description": "지역명"},
-                    "database_id": {"type": "string", "description": "Notion 데이터베이스 ID"}
+                    "database_id": {"type": "string", "description": "Notion 데이터베이스 ID"},
+                    "days": {"type": "integer", "description": "분석할 예보 일수", "default": 1}
                 },
                 "required": ["location", "database_id"]
             }
+        ),
+        Tool(
+            name="create_weather_pages_batch",
+            description="여러 지역 분석 결과를 속도 제한 큐로 Notion에 일괄 저장 (멱등키로 중복 생성 방지)",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "database_id": {"type": "string", "description": "Notion 데이터베이스 ID"},
+                    "items": {
+                        "type": "array",
+                        "description": "저장할 분석 결과 목록",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "location": {"type": "string", "description": "지역명"},
+                                "weather_data": {"type": "object", "description": "날씨 분석 데이터"},
+                                "analysis_time": {"type": "string", "description": "분석 시각 (없으면 weather_data.analysis_time)"}
+                            },
+                            "required": ["location", "weather_data"]
+                        }
+                    },
+                    "concurrency": {"type": "integer", "description": "동시 요청 수 상한", "default": 3},
+                    "dry_run": {"type": "boolean", "description": "Notion에 쓰지 않고 처리 계획만 반환", "default": False}
+                },
+                "required": ["database_id", "items"]
+            }
+        ),
+        Tool(
+            name="reconcile_notion_index",
+            description="Notion 데이터베이스 전체를 조회해 지역·날짜별 페이지 색인을 다시 만든다",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "database_id": {"type": "string", "description": "Notion 데이터베이스 ID"}
+                },
+                "required": ["database_id"]
+            }
+        ),
+        Tool(
+            name="get_server_stats",
+            description="도구·단계별 지연 히스토그램, 외부 API 상태 코드, 처리 중 요청 수 조회",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "format": {"type": "string", "enum": ["json", "prometheus"], "description": "응답 형식", "default": "json"}
+                }
+            }
+        ),
+        Tool(
+            name="configure_profiler",
+            description="재시작 없이 도구 호출 프로파일링 켜기/끄기 (다음 N건 또는 느린 호출을 접힌 스택/pstats 파일로 저장)",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "enabled": {"type": "boolean", "description": "false면 중지하고 지금까지 잡은 결과 저장", "default": True},
+                    "calls": {"type": "integer", "description": "잡을 호출 수 (slow_ms가 없으면 기본 10)"},
+                    "slow_ms": {"type": "number", "description": "이 시간(ms)보다 느린 호출만 저장"},
+                    "tools": {"type": "array", "items": {"type": "string"}, "description": "이 도구들만 프로파일 (기본: 전체)"},
+                    "format": {"type": "string", "enum": ["collapsed", "pstats"], "description": "collapsed: 플레임그래프용 접힌 스택 (샘플링), pstats: cProfile", "default": "collapsed"}
+                }
+            }
         )
     ]
 
 @app.call_tool()
+@metrics.instrument
+@profiler.instrument
 async def call_tool(name: str, arguments: dict):
     if name == "create_weather_page":
         return await create_weather_page(arguments)
     elif name == "get_weather_and_save":
         return await get_weather_and_save(arguments)
+    elif name == "create_weather_pages_batch":
+        return await create_weather_pages_batch(arguments)
+    elif name == "reconcile_notion_index":
+        return await reconcile_notion_index(arguments)
+    elif name == "get_server_stats":
+        return await get_server_stats(arguments)
+    elif name == "configure_profiler":
+        return await configure_profiler(arguments)
 
 async def create_weather_page(args):
     database_id = args["database_id"]
@@ -59,89 +141,31 @@ async def create_weather_page(args):
         )]
     
     try:
-        url = "https://api.notion.com/v1/pages"
-        headers = {
-            "Authorization": f"Bearer {notion_token}",
-            "Content-Type": "application/json",
-            "Notion-Version": "2022-06-28"
-        }
-        
-        # Notion 페이지 데이터 구성
-        page_data = {
-            "parent": {"database_id": database_id},
-            "properties": {
-                "제목": {
-                    "title": [{"text": {"content": f"{location} 날씨 분석 - {datetime.now().strftime('%Y-%m-%d %H:%M')}"}}]
-                },
-                "지역": {
-                    "rich_text": [{"text": {"content": location}}]
-                },
-                "평균온도": {
-                    "number": weather_data.get("temperature", {}).get("avg", 0)
-                },
-                "평균습도": {
-                    "number": weather_data.get("humidity", {}).get("avg", 0)
-                },
-                "분석일시": {
-                    "date": {"start": datetime.now().isoformat()}
-                }
-            },
-            "children": [
-                {
-                    "object": "block",
-                    "type": "heading_2",
-                    "heading_2": {
-                        "rich_text": [{"text": {"content": f"🌤️ {location} 날씨 분석 보고서"}}]
-                    }
-                },
-                {
-                    "object": "block",
-                    "type": "paragraph",
-                    "paragraph": {
-                        "rich_text": [{"text": {"content": weather_data.get("summary", "분석 데이터 없음")}}]
-                    }
-                },
-                {
-                    "object": "block",
-                    "type": "bulleted_list_item",
-                    "bulleted_list_item": {
-                        "rich_text": [{"text": {"content": f"🌡️ 평균 온도: {weather_data.get('temperature', {}).get('avg', 'N/A')}°C"}}]
-                    }
-                },
-                {
-                    "object": "block",
-                    "type": "bulleted_list_item", 
-                    "bulleted_list_item": {
-                        "rich_text": [{"text": {"content": f"💧 평균 습도: {weather_data.get('humidity', {}).get('avg', 'N/A')}%"}}]
-                    }
-                }
-            ]
-        }
+        # 일괄 저장과 같은 쓰기 큐를 거쳐 초당 요청 수 제한을 공유
+        writer = get_writer(notion_token, http)
+        with metrics.phase("write"):
+            result = await writer.create_page(build_page_data(database_id, location, weather_data))
         
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, headers=headers, json=page_data) as response:
-                if response.status == 200:
-                    result = await response.json()
-                    return [TextContent(
-                        type="text",
-                        text=json.dumps({
-                            "success": True,
-                            "page_id": result["id"],
-                            "url": result["url"],
-                            "message": "Notion 페이지가 성공적으로 생성되었습니다"
-                        }, ensure_ascii=False, indent=2)
-                    )]
-                else:
-                    error_text = await response.text()
-                    return [TextContent(
-                        type="text",
-                        text=json.dumps({
-                            "success": False,
-                            "error": f"Notion API 오류: {response.status}",
-                            "details": error_text
-                        }, ensure_ascii=False, indent=2)
-                    )]
-                    
+        if result["status"] == "created":
+            return [TextContent(
+                type="text",
+                text=json.dumps({
+                    "success": True,
+                    "page_id": result["page_id"],
+                    "url": result["url"],
+                    "message": "Notion 페이지가 성공적으로 생성되었습니다"
+                }, ensure_ascii=False, indent=2)
+            )]
+        else:
+            return [TextContent(
+                type="text",
+                text=json.dumps({
+                    "success": False,
+                    "error": result["error"],
+                    "details": result.get("details")
+                }, ensure_ascii=False, indent=2)
+            )]
+                
     except Exception as e:
         return [TextContent(
             type="text",
@@ -153,22 +177,46 @@ async def get_weather_and_save(args):
     database_id = args["database_id"]
     
     try:
-        # 날씨 데이터 수집 (간단한 더미 데이터)
-        weather_analysis = {
-            "location": location,
-            "temperature": {"avg": 18.5, "min": 15.2, "max": 22.1},
-            "humidity": {"avg": 65, "min": 55, "max": 75},
-            "summary": f"{location} 지역의 현재 날씨는 온화하며, 평균 기온 18.5°C, 습도 65%입니다."
-        }
+        notion_token = os.getenv("NOTION_TOKEN")
+        if not notion_token:
+            return [TextContent(
+                type="text",
+                text=json.dumps({"error": "NOTION_TOKEN 환경변수가 설정되지 않았습니다"}, ensure_ascii=False)
+            )]
         
-        # Notion에 저장
-        result = await create_weather_page({
-            "database_id": database_id,
-            "location": location,
-            "weather_data": json.dumps(weather_analysis)
-        })
+        # 날씨 데이터 수집 후 분석 - NumPy 분석 엔진은 처음 저장할 때 가져온다 (서버 시작 시간 단축)
+        from weather_analysis import analyze_forecasts
+        with metrics.phase("load"):
+            series = await forecast.load(location, args.get("days", 1))
+        weather_analysis = analyze_forecasts(series)
+        if "error" in weather_analysis:
+            return [TextContent(type="text", text=json.dumps(weather_analysis, ensure_ascii=False))]
         
-        return result
+        # Notion에 저장 - 오늘 이미 만든 페이지가 있으면 새로 만들지 않고 갱신
+        writer = get_writer(notion_token, http)
+        with metrics.phase("write"):
+            result = await writer.upsert_page(database_id, location, weather_analysis, page_index)
+        
+        if result["status"] == "error":
+            return [TextContent(
+                type="text",
+                text=json.dumps({
+                    "success": False,
+                    "error": result["error"],
+                    "details": result.get("details")
+                }, ensure_ascii=False, indent=2)
+            )]
+        
+        return [TextContent(
+            type="text",
+            text=json.dumps({
+                "success": True,
+                "status": result["status"],
+                "page_id": result["page_id"],
+                "url": result["url"],
+                "message": "Notion 페이지를 갱신했습니다" if result["status"] == "updated" else "Notion 페이지가 성공적으로 생성되었습니다"
+            }, ensure_ascii=False, indent=2)
+        )]
         
     except Exception as e:
         return [TextContent(
@@ -176,10 +224,110 @@ async def get_weather_and_save(args):
             text=json.dumps({"error": str(e)}, ensure_ascii=False, indent=2)
         )]
 
-async def main():
-    from mcp.server.stdio import stdio_server
-    async with stdio_server(app) as (read_stream, write_stream):
-        await app.run(read_stream, write_stream)
+async def create_weather_pages_batch(args):
+    database_id = args["database_id"]
+    # weather_data는 객체 또는 JSON 문자열 모두 허용
+    items = [
+        dict(item, weather_data=json.loads(item["weather_data"])) if isinstance(item.get("weather_data"), str) else item
+        for item in args["items"]
+    ]
+    dry_run = args.get("dry_run", False)
+    
+    notion_token = os.getenv("NOTION_TOKEN")
+    if not notion_token and not dry_run:
+        return [TextContent(
+            type="text",
+            text=json.dumps({"error": "NOTION_TOKEN 환경변수가 설정되지 않았습니다"}, ensure_ascii=False)
+        )]
+    
+    try:
+        writer = get_writer(notion_token or "dry-run", http)
+        started = datetime.now()
+        results = await writer.run_batch(database_id, items, dry_run=dry_run, concurrency=args.get("concurrency"))
+        
+        counts = {}
+        for item in results:
+            counts[item["status"]] = counts.get(item["status"], 0) + 1
+        
+        return [TextContent(
+            type="text",
+            text=json.dumps({
+                "requested": len(items),
+                "dry_run": dry_run,
+                "counts": counts,
+                "elapsed": round((datetime.now() - started).total_seconds(), 3),
+                "writer": writer.stats(),
+                "items": results
+            }, ensure_ascii=False, indent=2)
+        )]
+        
+    except Exception as e:
+        return [TextContent(
+            type="text",
+            text=json.dumps({"error": str(e)}, ensure_ascii=False, indent=2)
+        )]
+
+async def reconcile_notion_index(args):
+    database_id = args["database_id"]
+    
+    notion_token = os.getenv("NOTION_TOKEN")
+    if not notion_token:
+        return [TextContent(
+            type="text",
+            text=json.dumps({"error": "NOTION_TOKEN 환경변수가 설정되지 않았습니다"}, ensure_ascii=False)
+        )]
+    
+    try:
+        writer = get_writer(notion_token, http)
+        result = await writer.reconcile(database_id, page_index)
+        
+        return [TextContent(
+            type="text",
+            text=json.dumps(dict(result, database_id=database_id, index_path=page_index.path), ensure_ascii=False, indent=2)
+        )]
+        
+    except Exception as e:
+        return [TextContent(
+            type="text",
+            text=json.dumps({"error": str(e)}, ensure_ascii=False, indent=2)
+        )]
+
+async def get_server_stats(args):
+    if args.get("format") == "prometheus":
+        return [TextContent(type="text", text=metrics.prometheus())]
+    return [TextContent(
+        type="text",
+        # 통계를 읽는 것만으로 색인 파일을 만들지 않도록 - 아직 열지 않았으면 None
+        text=json.dumps(dict(
+            metrics.snapshot(), profiler=profiler.status(),
+            indexed_pages=page_index.count() if page_index.opened else None
+        ), ensure_ascii=False, indent=2)
+    )]
+
+async def configure_profiler(args):
+    try:
+        status = profiler.configure(**args) if args else profiler.status()
+        return [TextContent(type="text", text=json.dumps(status, ensure_ascii=False, indent=2))]
+    except (TypeError, ValueError) as e:
+        return [TextContent(type="text", text=json.dumps({"error": str(e)}, ensure_ascii=False))]
+
+async def reconcile_command(database_id):
+    # python notion_weather_server.py --reconcile <database_id>
+    try:
+        result = await reconcile_notion_index({"database_id": database_id})
+        print(result[0].text)
+    finally:
+        await http.close()
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    import argparse
+    from mcp_transport import add_transport_args, serve
+    parser = argparse.ArgumentParser(description="Notion 날씨 MCP 서버")
+    parser.add_argument("--reconcile", metavar="DATABASE_ID", help="서버를 띄우지 않고 페이지 색인만 다시 만든다")
+    add_transport_args(parser, 8002)
+    cli_args = parser.parse_args()
+    
+    if cli_args.reconcile:
+        asyncio.run(reconcile_command(cli_args.reconcile))
+    else:
+        serve(app, cli_args)
\ No newline at end of file
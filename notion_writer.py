@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+import asyncio
+import hashlib
+import os
+from datetime import datetime
+
+from http_pool import HttpSessionPool
+from rate_limit import TokenBucket, backoff_delay, retry_after_seconds
+
+NOTION_API_URL = os.getenv("NOTION_API_URL", "https://api.notion.com/v1")
+NOTION_VERSION = "2022-06-28"
+# Notion은 통합(integration)당 평균 초당 3건 정도만 허용
+NOTION_RATE_LIMIT = float(os.getenv("NOTION_RATE_LIMIT", "3"))
+NOTION_CONCURRENCY = int(os.getenv("NOTION_CONCURRENCY", "3"))
+NOTION_MAX_RETRIES = int(os.getenv("NOTION_MAX_RETRIES", "5"))
+# 모든 페이지 생성(단건 저장, 일괄 저장)에 멱등키를 기록할 rich_text 속성
+# 데이터베이스에 해당 열을 만든 경우에만 지정 - 없는 열을 쓰면 Notion이 400을 돌려준다 (비우면 서버 측 중복 확인 생략)
+NOTION_IDEMPOTENCY_PROPERTY = os.getenv("NOTION_IDEMPOTENCY_PROPERTY", "")
+
+http = HttpSessionPool()
+
+
+class NotionAPIError(Exception):
+    def __init__(self, status, body):
+        self.status = status
+        self.body = body
+        self.retry_after = None
+        super().__init__(f"Notion API 오류: {status}")
+
+
+def idempotency_key(location, analysis_time):
+    # 같은 지역 + 같은 분석 시각은 항상 같은 키
+    return hashlib.sha256(f"{location}|{analysis_time}".encode("utf-8")).hexdigest()[:32]
+
+
+def build_page_data(database_id, location, weather_data, analysis_time=None, key=None):
+    analysis_time = analysis_time or weather_data.get("analysis_time") or datetime.now().isoformat()
+    properties = {
+        "제목": {
+            "title": [{"text": {"content": f"{location} 날씨 분석 - {analysis_time[:16].replace('T', ' ')}"}}]
+        },
+        "지역": {
+            "rich_text": [{"text": {"content": location}}]
+        },
+        "평균온도": {
+            "number": weather_data.get("temperature", {}).get("avg", 0)
+        },
+        "평균습도": {
+            "number": weather_data.get("humidity", {}).get("avg", 0)
+        },
+        "분석일시": {
+            "date": {"start": analysis_time}
+        }
+    }
+    if key and NOTION_IDEMPOTENCY_PROPERTY:
+        properties[NOTION_IDEMPOTENCY_PROPERTY] = {"rich_text": [{"text": {"content": key}}]}
+
+    return {
+        "parent": {"database_id": database_id},
+        "properties": properties,
+        "children": [
+            {
+                "object": "block",
+                "type": "heading_2",
+                "heading_2": {
+                    "rich_text": [{"text": {"content": f"🌤️ {location} 날씨 분석 보고서"}}]
+                }
+            },
+            {
+                "object": "block",
+                "type": "paragraph",
+                "paragraph": {
+                    "rich_text": [{"text": {"content": weather_data.get("summary", "분석 데이터 없음")}}]
+                }
+            },
+            {
+                "object": "block",
+                "type": "bulleted_list_item",
+                "bulleted_list_item": {
+                    "rich_text": [{"text": {"content": f"🌡️ 평균 온도: {weather_data.get('temperature', {}).get('avg', 'N/A')}°C"}}]
+                }
+            },
+            {
+                "object": "block",
+                "type": "bulleted_list_item",
+                "bulleted_list_item": {
+                    "rich_text": [{"text": {"content": f"💧 평균 습도: {weather_data.get('humidity', {}).get('avg', 'N/A')}%"}}]
+                }
+            }
+        ]
+    }
+
+
+class NotionWriter:
+    """통합 토큰 하나를 공유하는 Notion 쓰기 큐 - 초당 요청 수 제한, Retry-After 준수, 동시성 상한"""
+
+    def __init__(self, token, pool=None, rate=None, concurrency=None, max_retries=None, base_url=None):
+        self.token = token
+        self.pool = pool or http
+        self.concurrency = max(1, concurrency or NOTION_CONCURRENCY)
+        self.max_retries = NOTION_MAX_RETRIES if max_retries is None else max_retries
+        self.base_url = base_url
+        self.bucket = TokenBucket(rate or NOTION_RATE_LIMIT, 1)
+
+        # 이 프로세스에서 이미 만든 페이지 (멱등키 → 결과)
+        self.completed = {}
+        # 같은 (지역, 날짜) upsert가 동시에 들어와도 페이지를 두 번 만들지 않도록 - (잠금, 사용 중인 호출 수)
+        self._upsert_locks = {}
+        self.requests = 0
+        self.rate_limited = 0
+        self.retries = 0
+
+    async def send(self, method, path, payload=None):
+        # 한 번 전송 - 실패 시 NotionAPIError
+        await self.bucket.acquire()
+        self.requests += 1
+        headers = {
+            "Authorization": f"Bearer {self.token}",
+            "Content-Type": "application/json",
+            "Notion-Version": NOTION_VERSION
+        }
+        session = self.pool.session()
+        async with session.request(method, f"{self.base_url or NOTION_API_URL}/{path}", headers=headers, json=payload) as response:
+            if response.status == 200:
+                return await response.json()
+            error = NotionAPIError(response.status, await response.text())
+            if response.status == 429:
+                error.retry_after = retry_after_seconds(response.headers)
+            raise error
+
+    async def call(self, method, path, payload=None):
+        # 조회처럼 다시 보내도 안전한 요청 - 429/5xx/연결 오류 재시도
+        import aiohttp
+        for attempt in range(self.max_retries + 1):
+            try:
+                return await self.send(method, path, payload)
+            except NotionAPIError as e:
+                if attempt == self.max_retries or not self._retryable(e):
+                    raise
+                if e.status != 429:
+                    await asyncio.sleep(backoff_delay(attempt))
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                if attempt == self.max_retries:
+                    raise
+                await asyncio.sleep(backoff_delay(attempt))
+            self.retries += 1
+
+    def _retryable(self, error):
+        if error.status == 429:
+            # 처리되지 않은 요청 - Retry-After 동안 버킷 전체를 멈춘다
+            self.rate_limited += 1
+            self.bucket.pause(error.retry_after or 1.0)
+            return True
+        return error.status >= 500 or error.status == 409
+
+    async def find_page(self, database_id, key):
+        if not NOTION_IDEMPOTENCY_PROPERTY:
+            return None
+        result = await self.call("POST", f"databases/{database_id}/query", {
+            "filter": {"property": NOTION_IDEMPOTENCY_PROPERTY, "rich_text": {"equals": key}},
+            "page_size": 1
+        })
+        pages = result.get("results", [])
+        return pages[0] if pages else None
+
+    async def create_page(self, page_data, key=None):
+        """페이지 생성 - 응답을 못 받은 채 실패하면 멱등키로 이미 생성됐는지 확인한 뒤에만 재시도"""
+        # aiohttp는 실제로 보낼 때 가져온다 (서버 시작 시간 단축)
+        import aiohttp
+        database_id = page_data["parent"]["database_id"]
+        uncertain = False
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self.retries += 1
+            if uncertain:
+                existing = await self.find_page(database_id, key)
+                if existing:
+                    return {"status": "exists", "page_id": existing["id"], "url": existing.get("url")}
+            try:
+                page = await self.send("POST", "pages", page_data)
+                return {"status": "created", "page_id": page["id"], "url": page.get("url")}
+            except NotionAPIError as e:
+                error = e
+                if attempt == self.max_retries or not self._retryable(e):
+                    break
+                if e.status == 429:
+                    continue
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = e
+                if attempt == self.max_retries:
+                    break
+            # 5xx/연결 오류는 페이지가 이미 만들어졌을 수 있다 - 멱등키가 없으면 중복 방지를 위해 재시도하지 않는다
+            if not key or not NOTION_IDEMPOTENCY_PROPERTY:
+                break
+            uncertain = True
+            await asyncio.sleep(backoff_delay(attempt))
+
+        if isinstance(error, NotionAPIError):
+            return {"status": "error", "error": str(error), "details": error.body}
+        return {"status": "error", "error": str(error) or type(error).__name__}
+
+    async def run_batch(self, database_id, items, dry_run=False, concurrency=None):
+        """items: [{location, weather_data, analysis_time?}] - 입력 순서대로 항목별 상태 반환"""
+        results = [None] * len(items)
+        queue = asyncio.Queue()
+        seen = set()
+        for index, item in enumerate(items):
+            location = item["location"]
+            weather_data = item.get("weather_data") or {}
+            analysis_time = item.get("analysis_time") or weather_data.get("analysis_time")
+            if not analysis_time:
+                results[index] = {"location": location, "status": "error", "error": "analysis_time이 필요합니다"}
+                continue
+            key = idempotency_key(location, analysis_time)
+            if key in seen:
+                results[index] = {"location": location, "key": key, "status": "duplicate"}
+            elif key in self.completed:
+                results[index] = dict(self.completed[key], location=location, key=key, status="skipped")
+            elif dry_run:
+                build_page_data(database_id, location, weather_data, analysis_time, key)
+                results[index] = {"location": location, "key": key, "status": "dry_run"}
+            else:
+                queue.put_nowait((index, location, key, build_page_data(database_id, location, weather_data, analysis_time, key)))
+            seen.add(key)
+
+        async def worker():
+            while True:
+                try:
+                    index, location, key, page_data = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    result = await self.create_page(page_data, key)
+                except Exception as e:
+                    # 중복 확인 조회 실패 등 - 한 항목의 실패가 큐 전체를 멈추지 않도록
+                    result = {"status": "error", "error": str(e) or type(e).__name__}
+                if result["status"] in ("created", "exists"):
+                    self.completed[key] = {"page_id": result["page_id"], "url": result.get("url")}
+                results[index] = dict(result, location=location, key=key)
+
+        workers = min(max(1, concurrency or self.concurrency), queue.qsize())
+        await asyncio.gather(*(worker() for _ in range(workers)))
+        return results
+
+    async def query_database(self, database_id, filter=None, page_size=100):
+        # 페이지네이션을 따라가며 페이지를 하나씩 돌려준다
+        payload = {"page_size": page_size}
+        if filter:
+            payload["filter"] = filter
+        while True:
+            result = await self.call("POST", f"databases/{database_id}/query", payload)
+            for page in result.get("results", []):
+                yield page
+            if not result.get("has_more"):
+                return
+            payload["start_cursor"] = result["next_cursor"]
+
+    async def upsert_page(self, database_id, location, weather_data, index, analysis_time=None):
+        """(지역, 날짜)당 페이지 하나 - 색인에 있으면 속성만 갱신, 없으면 생성 후 색인에 기록"""
+        analysis_time = analysis_time or weather_data.get("analysis_time") or datetime.now().isoformat()
+        date = analysis_time[:10]
+        key = idempotency_key(location, date)
+        page_data = build_page_data(database_id, location, weather_data, analysis_time, key)
+
+        slot = (database_id, key)
+        entry = self._upsert_locks.get(slot)
+        if entry is None:
+            entry = self._upsert_locks[slot] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                return await self._upsert_locked(database_id, location, date, key, page_data, index)
+        finally:
+            # 기다리는 호출이 없으면 잠금을 버린다 (키마다 잠금이 계속 쌓이지 않도록)
+            entry[1] -= 1
+            if not entry[1]:
+                del self._upsert_locks[slot]
+
+    async def _upsert_locked(self, database_id, location, date, key, page_data, index):
+        page_id = index.get(database_id, location, date)
+        if page_id:
+            try:
+                page = await self.call("PATCH", f"pages/{page_id}", {"properties": page_data["properties"]})
+                return {"status": "updated", "page_id": page_id, "url": page.get("url")}
+            except NotionAPIError as e:
+                # 삭제(404)되었거나 보관된(400) 페이지 - 색인을 지우고 새로 만든다
+                if e.status not in (400, 404):
+                    return {"status": "error", "error": str(e), "details": e.body}
+                index.delete(database_id, location, date)
+
+        result = await self.create_page(page_data, key)
+        if result["status"] in ("created", "exists"):
+            index.put(database_id, location, date, result["page_id"])
+        return result
+
+    async def reconcile(self, database_id, index):
+        """데이터베이스 전체를 조회해 색인을 다시 만든다 - (지역, 날짜)가 겹치면 가장 최근 수정된 페이지 사용"""
+        latest = {}
+        scanned = skipped = 0
+        async for page in self.query_database(database_id):
+            scanned += 1
+            properties = page.get("properties", {})
+            location = "".join(t.get("plain_text") or t["text"]["content"] for t in properties.get("지역", {}).get("rich_text", []))
+            date = ((properties.get("분석일시") or {}).get("date") or {}).get("start")
+            if not location or not date:
+                skipped += 1
+                continue
+            key = (location, date[:10])
+            edited = page.get("last_edited_time", "")
+            if key not in latest or edited >= latest[key][0]:
+                latest[key] = (edited, page["id"])
+
+        index.replace(database_id, [(location, date, page_id) for (location, date), (_, page_id) in latest.items()])
+        return {
+            "scanned": scanned,
+            "indexed": len(latest),
+            "duplicates": scanned - skipped - len(latest),
+            "skipped": skipped
+        }
+
+    def stats(self):
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "rate_limited": self.rate_limited,
+            "completed": len(self.completed),
+            "concurrency": self.concurrency,
+            "rate": self.bucket.rate
+        }
+
+
+_writers = {}
+
+
+def get_writer(token, pool=None):
+    # 같은 통합 토큰·풀은 같은 속도 제한 버킷을 공유해야 한다 - 다른 풀을 넘기면 그 풀의 쓰기 큐
+    key = (token, pool or http)
+    writer = _writers.get(key)
+    if writer is None:
+        writer = _writers[key] = NotionWriter(token, key[1])
+    return writer
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+import asyncio
+import os
+import random
+import sys
+import time
+
+from forecast_cache import normalize_location
+
+
+def env_locations():
+    # PREFETCH_LOCATIONS가 없으면 main_app이 쓰는 WEATHER_LOCATIONS / WEATHER_LOCATION
+    raw = os.getenv("PREFETCH_LOCATIONS") or os.getenv("WEATHER_LOCATIONS") or os.getenv("WEATHER_LOCATION", "")
+    return [l.strip() for l in raw.split(",") if l.strip()]
+
+
+class PrefetchSlot:
+    __slots__ = ("location", "days", "units", "lang", "score", "scored_at", "lead", "retry_at", "refreshed_at")
+
+    def __init__(self, location, days, units, lang, now):
+        self.location = location
+        self.days = days
+        self.units = units
+        self.lang = lang
+        self.score = 0.0
+        self.scored_at = now
+        self.lead = 1.0
+        self.retry_at = 0.0
+        self.refreshed_at = None
+
+
+class PrefetchScheduler:
+    """요청 빈도 상위 K개 지역을 TTL 만료 전에 (지터를 섞어) 미리 갱신 - 외부 API 호출 예산 안에서만"""
+
+    def __init__(self, cache, refresh, budget, top_k=None, interval=None, refresh_at=None, jitter=None,
+                 half_life=None, reserve=None, max_tracked=None, seeds=None, clock=time.monotonic):
+        # 캐시 객체 또는 지금 쓸 캐시를 돌려주는 함수 (서버가 캐시를 바꿔 끼워도 따라가도록)
+        self._cache = cache
+        self.refresh = refresh
+        self.budget = budget
+        self.top_k = top_k or int(os.getenv("PREFETCH_TOP_K", "10"))
+        self.interval = interval or float(os.getenv("PREFETCH_INTERVAL", "15"))
+        # TTL의 refresh_at 비율 지점에서, 최대 jitter 비율만큼 앞당겨 갱신
+        self.refresh_at = refresh_at or float(os.getenv("PREFETCH_REFRESH_AT", "0.8"))
+        self.jitter = float(os.getenv("PREFETCH_JITTER", "0.1")) if jitter is None else jitter
+        self.half_life = half_life or float(os.getenv("PREFETCH_HALF_LIFE", "3600"))
+        # 예산 중 사용자 요청 몫으로 남겨둘 비율
+        self.reserve = float(os.getenv("PREFETCH_BUDGET_RESERVE", "0.3")) if reserve is None else reserve
+        self.max_tracked = max_tracked or int(os.getenv("PREFETCH_MAX_TRACKED", "1000"))
+        self.clock = clock
+
+        self._slots = {}
+        self._task = None
+        self._users = 0
+        self.prefetches = 0
+        self.failures = 0
+        self.skipped_budget = 0
+
+        for location in (env_locations() if seeds is None else seeds):
+            self.record(location)
+
+    @property
+    def cache(self):
+        return self._cache() if callable(self._cache) else self._cache
+
+    def record(self, location, days=3, units="metric", lang="kr"):
+        # 요청 빈도를 반감기로 감쇠시키며 누적 (최근 요청일수록 높은 점수)
+        key = (normalize_location(location), units, lang)
+        now = self.clock()
+        slot = self._slots.get(key)
+        if slot is None:
+            if len(self._slots) >= self.max_tracked:
+                coldest = min(self._slots, key=lambda k: self._score(self._slots[k], now))
+                del self._slots[coldest]
+            slot = self._slots[key] = PrefetchSlot(location, days, units, lang, now)
+            slot.lead = self._lead()
+        slot.score = self._score(slot, now) + 1.0
+        slot.scored_at = now
+        slot.days = max(slot.days, days)
+
+    def _score(self, slot, now):
+        return slot.score * 0.5 ** ((now - slot.scored_at) / self.half_life)
+
+    def _lead(self):
+        return self.refresh_at - random.uniform(0, self.jitter)
+
+    def top(self):
+        now = self.clock()
+        return sorted(self._slots.values(), key=lambda s: self._score(s, now), reverse=True)[:self.top_k]
+
+    def _refresh_in(self, slot):
+        # 다음 갱신까지 남은 시간(초) - 캐시에 없으면 0
+        cache = self.cache
+        entry, _ = cache.lookup(slot.location, slot.days, slot.units, slot.lang)
+        if entry is None:
+            return 0.0
+        return entry.stored_at + cache.ttl * slot.lead - cache.clock()
+
+    def due(self):
+        now = self.clock()
+        return [s for s in self.top() if s.retry_at <= now and self._refresh_in(s) <= 0]
+
+    async def tick(self):
+        due = self.due()
+        # 사용자 요청 몫(reserve)을 남기고 쓸 수 있는 만큼만
+        allowance = self.budget.remaining() - int(self.budget.limit * self.reserve)
+        if len(due) > allowance:
+            self.skipped_budget += len(due) - max(0, allowance)
+            due = due[:max(0, allowance)]
+        if due:
+            await asyncio.gather(*(self._refresh_slot(slot) for slot in due))
+        return len(due)
+
+    async def _refresh_slot(self, slot):
+        try:
+            await self.refresh(slot.location, slot.days, slot.units, slot.lang)
+            self.prefetches += 1
+            slot.refreshed_at = self.clock()
+            slot.lead = self._lead()
+        except Exception as e:
+            # 실패한 지역은 TTL 한 번만큼 쉬었다가 다시 시도
+            self.failures += 1
+            slot.retry_at = self.clock() + self.cache.ttl * self.refresh_at
+            print(f"⚠️ 예보 미리 갱신 실패 ({slot.location}): {e}", file=sys.stderr)
+
+    async def run(self):
+        while True:
+            try:
+                await self.tick()
+            except Exception as e:
+                print(f"⚠️ 예보 미리 갱신 스케줄러 오류: {e}", file=sys.stderr)
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        # 서버 세션마다 lifespan이 돌므로 참조 횟수로 하나만 실행
+        self._users += 1
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self):
+        self._users -= 1
+        if self._users > 0 or self._task is None:
+            return
+        task, self._task = self._task, None
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    def stats(self):
+        now = self.clock()
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "top_k": self.top_k,
+            "interval": self.interval,
+            "tracked": len(self._slots),
+            "prefetches": self.prefetches,
+            "failures": self.failures,
+            "skipped_budget": self.skipped_budget,
+            "budget": dict(self.budget.stats(), reserve=int(self.budget.limit * self.reserve)),
+            "schedule": [
+                {
+                    "location": slot.location,
+                    "days": slot.days,
+                    "units": slot.units,
+                    "lang": slot.lang,
+                    "score": round(self._score(slot, now), 3),
+                    "refresh_in": round(max(self._refresh_in(slot), slot.retry_at - now, 0.0), 1),
+                    "last_refresh_ago": round(now - slot.refreshed_at, 1) if slot.refreshed_at is not None else None
+                }
+                for slot in self.top()
+            ]
+        }
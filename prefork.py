@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""MCP 서버 prefork 런처
+
+zygote 프로세스가 서버 모듈과 무거운 의존성을 한 번만 import한 뒤, 미리 fork한 워커들이
+Unix 소켓에서 클라이언트를 기다린다. 워커 하나가 클라이언트 하나(MCP 세션 하나)를 맡고,
+연결을 가져가는 즉시 zygote가 빈자리를 다시 fork한다.
+
+    python prefork.py serve                              # zygote 실행
+    python prefork.py connect weather_mcp_server         # stdio 클라이언트용 중계 (Claude Desktop 등)
+    MCPClientPool(PreforkParameters("weather_mcp_server"))   # 파이썬 클라이언트는 소켓에 바로 연결
+"""
+import argparse
+import importlib
+import json
+import os
+import select
+import signal
+import socket
+import struct
+import sys
+from contextlib import asynccontextmanager
+
+PREFORK_SOCKET = os.getenv("MCP_PREFORK_SOCKET") or "/tmp/mcp-prefork.sock"
+PREFORK_SERVERS = ("weather_mcp_server", "qchat_weather_server", "notion_weather_server", "simple_weather_server")
+# 도구가 처음 실행될 때 가져오도록 미뤄둔 모듈 - zygote에서는 미리 가져와 워커가 물려받는다
+PRELOAD_MODULES = ("aiohttp", "numpy", "weather_analysis", "slack_sdk.web.async_client", "slack_sdk.errors")
+PID = struct.Struct("!i")
+
+
+class PreforkError(Exception):
+    pass
+
+
+class PreforkParameters:
+    """MCPClientPool에 넘기는 prefork 서버 주소 (StdioServerParameters 대신)"""
+
+    def __init__(self, server, socket_path=None):
+        self.server = server
+        self.socket_path = socket_path or PREFORK_SOCKET
+
+
+def read_line(sock, limit=65536):
+    # 핸드셰이크 한 줄만 읽는다 - 뒤따르는 MCP 메시지는 건드리지 않도록 한 바이트씩
+    line = bytearray()
+    while len(line) < limit:
+        byte = sock.recv(1)
+        if not byte or byte == b"\n":
+            break
+        line += byte
+    return bytes(line)
+
+
+def parse_reply(line):
+    if not line:
+        raise PreforkError("워커가 응답 없이 연결을 닫았습니다")
+    reply = json.loads(line)
+    if "error" in reply:
+        raise PreforkError(reply["error"])
+    return reply
+
+
+class Zygote:
+    def __init__(self, socket_path=None, servers=PREFORK_SERVERS, spares=None):
+        self.socket_path = socket_path or PREFORK_SOCKET
+        self.servers = tuple(servers)
+        self.spares = spares or int(os.getenv("MCP_PREFORK_SPARES") or 2)
+        self.modules = {}
+        self.idle = set()
+        self.busy = set()
+        self.listener = None
+        self._taken_r = self._taken_w = None
+        self._running = False
+
+    def preload(self):
+        for name in PRELOAD_MODULES:
+            try:
+                importlib.import_module(name)
+            except ImportError as e:
+                print(f"⚠️ 미리 가져오기 실패: {name} ({e})", file=sys.stderr)
+        for name in self.servers:
+            self.modules[name] = importlib.import_module(name)
+
+    def serve_forever(self):
+        self.preload()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self.listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.listener.bind(self.socket_path)
+        os.chmod(self.socket_path, 0o600)
+        self.listener.listen(128)
+        # 워커가 연결을 가져가면 자기 pid를 써서 알린다 - zygote는 곧바로 빈자리를 채운다
+        self._taken_r, self._taken_w = os.pipe()
+
+        self._running = True
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        for _ in range(self.spares):
+            self._fork_worker()
+        print(f"🧬 prefork zygote: {self.socket_path} (서버 {', '.join(self.servers)}, 대기 워커 {self.spares})", file=sys.stderr)
+
+        try:
+            while self._running:
+                try:
+                    ready, _, _ = select.select([self._taken_r], [], [], 1.0)
+                except InterruptedError:
+                    continue
+                if ready:
+                    data = os.read(self._taken_r, PID.size * 64)
+                    for (pid,) in PID.iter_unpack(data[:len(data) // PID.size * PID.size]):
+                        self.idle.discard(pid)
+                        self.busy.add(pid)
+                        if self._running:
+                            self._fork_worker()
+                self._reap()
+        finally:
+            self._shutdown()
+
+    def _fork_worker(self):
+        pid = os.fork()
+        if pid:
+            self.idle.add(pid)
+            return
+        # 자식: 연결 하나를 받아 처리하고 끝낸다
+        code = 0
+        try:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            os.close(self._taken_r)
+            conn, _ = self.listener.accept()
+            self.listener.close()
+            os.write(self._taken_w, PID.pack(os.getpid()))
+            os.close(self._taken_w)
+            self._serve_client(conn)
+        except Exception as e:
+            print(f"❌ prefork 워커 오류: {e}", file=sys.stderr)
+            code = 1
+        finally:
+            # 어떤 경우에도 zygote 코드로 돌아가지 않는다 (stdio 서버가 stdout을 이미 닫았을 수 있음)
+            try:
+                sys.stdout.flush()
+            except (OSError, ValueError):
+                pass
+            os._exit(code)
+
+    def _serve_client(self, conn):
+        request = json.loads(read_line(conn) or b"{}")
+        module = self.modules.get(request.get("server"))
+        if module is None:
+            conn.sendall(json.dumps({"error": f"지원하지 않는 서버입니다: {request.get('server')}"}, ensure_ascii=False).encode() + b"\n")
+            return
+        conn.sendall(json.dumps({"ok": True, "pid": os.getpid()}).encode() + b"\n")
+        # 소켓을 표준 입출력으로 바꿔 끼우고 평소처럼 stdio 서버 실행
+        os.dup2(conn.fileno(), 0)
+        os.dup2(conn.fileno(), 1)
+        conn.close()
+        # zygote가 시작할 때 만든 sys.stdin/stdout은 이전 fd의 상태(seek 가능 여부 등)를 기억하므로 새로 연다
+        sys.stdin = open(0, "r", encoding="utf-8", closefd=False)
+        sys.stdout = open(1, "w", encoding="utf-8", closefd=False)
+
+        import asyncio
+        from mcp_transport import serve_stdio
+        asyncio.run(serve_stdio(module.app))
+
+    def _reap(self):
+        while True:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if not pid:
+                return
+            self.busy.discard(pid)
+            if pid in self.idle:
+                # 연결을 받기 전에 죽은 대기 워커는 다시 채운다
+                self.idle.discard(pid)
+                if self._running:
+                    self._fork_worker()
+
+    def _stop(self, signum, frame):
+        self._running = False
+
+    def _shutdown(self):
+        # 대기 워커만 정리 - 처리 중인 세션은 클라이언트가 끊을 때까지 둔다
+        for pid in list(self.idle):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        self.listener.close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+def open_connection(server, socket_path=None):
+    """zygote에 연결해 워커 하나를 배정받는다 - (소켓, 워커 pid)"""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path or PREFORK_SOCKET)
+        sock.sendall(json.dumps({"server": server}).encode() + b"\n")
+        reply = parse_reply(read_line(sock))
+    except BaseException:
+        sock.close()
+        raise
+    return sock, reply["pid"]
+
+
+@asynccontextmanager
+async def prefork_client(params):
+    """stdio_client처럼 (read_stream, write_stream)을 돌려주는 prefork 소켓 전송"""
+    import anyio
+    from mcp import types
+    from mcp.shared.message import SessionMessage
+
+    stream = await anyio.connect_unix(params.socket_path)
+    try:
+        await stream.send(json.dumps({"server": params.server}).encode() + b"\n")
+        buffer = b""
+        while b"\n" not in buffer:
+            try:
+                buffer += await stream.receive()
+            except anyio.EndOfStream:
+                break
+        line, _, buffer = buffer.partition(b"\n")
+        parse_reply(line)
+    except BaseException:
+        await stream.aclose()
+        raise
+
+    read_stream_writer, read_stream = anyio.create_memory_object_stream(0)
+    write_stream, write_stream_reader = anyio.create_memory_object_stream(0)
+
+    async def socket_reader(buffer):
+        try:
+            async with read_stream_writer:
+                while True:
+                    *lines, buffer = buffer.split(b"\n")
+                    for line in lines:
+                        try:
+                            message = types.JSONRPCMessage.model_validate_json(line)
+                        except Exception as exc:
+                            await read_stream_writer.send(exc)
+                            continue
+                        await read_stream_writer.send(SessionMessage(message))
+                    try:
+                        buffer += await stream.receive()
+                    except (anyio.EndOfStream, anyio.BrokenResourceError):
+                        return
+        except anyio.ClosedResourceError:
+            await anyio.lowlevel.checkpoint()
+
+    async def socket_writer():
+        try:
+            async with write_stream_reader:
+                async for session_message in write_stream_reader:
+                    data = session_message.message.model_dump_json(by_alias=True, exclude_none=True)
+                    await stream.send(data.encode() + b"\n")
+        except (anyio.ClosedResourceError, anyio.BrokenResourceError):
+            await anyio.lowlevel.checkpoint()
+
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(socket_reader, buffer)
+        tg.start_soon(socket_writer)
+        try:
+            yield read_stream, write_stream
+        finally:
+            # 워커는 입력이 끝나면 stdio 서버를 마치고 종료한다
+            await stream.aclose()
+            await read_stream.aclose()
+            await write_stream.aclose()
+            await read_stream_writer.aclose()
+            await write_stream_reader.aclose()
+
+
+def relay(server, socket_path=None):
+    """stdin/stdout ↔ zygote 소켓 중계 - 명령으로만 서버를 띄우는 클라이언트용"""
+    try:
+        sock, _ = open_connection(server, socket_path)
+    except (FileNotFoundError, ConnectionRefusedError):
+        # zygote가 없으면 평소처럼 서버를 직접 실행
+        script = os.path.join(os.path.dirname(os.path.abspath(__file__)), f"{server}.py")
+        os.execv(sys.executable, [sys.executable, script])
+
+    stdin, stdout = sys.stdin.fileno(), sys.stdout.fileno()
+    sources = [stdin, sock]
+    while sources:
+        for source in select.select(sources, [], [])[0]:
+            if source is sock:
+                data = sock.recv(65536)
+                if not data:
+                    return
+                os.write(stdout, data)
+            else:
+                data = os.read(stdin, 65536)
+                if data:
+                    sock.sendall(data)
+                else:
+                    # 클라이언트가 입력을 닫으면 워커에도 EOF를 전달하고 응답을 마저 받는다
+                    sock.shutdown(socket.SHUT_WR)
+                    sources.remove(stdin)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MCP 서버 prefork 런처 (미리 import한 zygote에서 워커를 fork)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve = sub.add_parser("serve", help="zygote 실행")
+    serve.add_argument("--socket", default=PREFORK_SOCKET)
+    serve.add_argument("--servers", nargs="+", choices=PREFORK_SERVERS, default=list(PREFORK_SERVERS))
+    serve.add_argument("--spares", type=int, default=None, help="미리 fork해 둘 대기 워커 수")
+    connect = sub.add_parser("connect", help="stdin/stdout을 zygote 워커에 중계")
+    connect.add_argument("server", choices=PREFORK_SERVERS)
+    connect.add_argument("--socket", default=PREFORK_SOCKET)
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        Zygote(args.socket, args.servers, args.spares).serve_forever()
+    else:
+        relay(args.server, args.socket)
+
+
+if __name__ == "__main__":
+    main()
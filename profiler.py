@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter, deque
+from functools import wraps
+
+PROFILE_FORMATS = ("collapsed", "pstats")
+# 외부 API 응답 등을 기다리느라 스택에 없던 샘플
+AWAIT_FRAME = "(await)"
+
+
+def frame_label(code):
+    # 접힌 스택 형식은 ';'로 프레임을 나누므로 이름에 넣지 않는다
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ",")
+
+
+class ProfiledCall:
+    __slots__ = ("tool", "thread_id", "samples", "profile")
+
+    def __init__(self, tool, profile=None):
+        self.tool = tool
+        self.thread_id = threading.get_ident()
+        self.samples = Counter()
+        self.profile = profile
+
+
+class ToolProfiler:
+    """call_tool 디스패치에 끼우는 통계적 프로파일러 - 다음 N건 또는 느린 호출만 잡아 접힌 스택/pstats 파일로 저장"""
+
+    def __init__(self, output_dir=None, interval_ms=None):
+        self.output_dir = output_dir or os.getenv("PROFILE_DIR") or "profiles"
+        self.interval = (interval_ms or float(os.getenv("PROFILE_INTERVAL_MS") or 5)) / 1000
+        self.enabled = False
+        self.format = "collapsed"
+        self.remaining = None
+        self.slow_ms = None
+        self.tools = None
+        self.path = None
+
+        self.stacks = Counter()
+        self.stats = None
+        self.captured = 0
+        self.skipped = 0
+        self.recent = deque(maxlen=10)
+        # 실행 중인 프로파일 대상 호출: _run 프레임 → ProfiledCall
+        self._frames = {}
+        self._pstats_busy = False
+        self._stop = None
+        self._thread = None
+
+    @classmethod
+    def from_env(cls):
+        # PROFILE_CALLS / PROFILE_SLOW_MS를 주면 서버 시작부터 켠 상태
+        profiler = cls()
+        calls = os.getenv("PROFILE_CALLS")
+        slow_ms = os.getenv("PROFILE_SLOW_MS")
+        if calls or slow_ms:
+            tools = os.getenv("PROFILE_TOOLS")
+            profiler.configure(
+                calls=int(calls) if calls else None,
+                slow_ms=float(slow_ms) if slow_ms else None,
+                tools=[t.strip() for t in tools.split(",") if t.strip()] if tools else None,
+                format=os.getenv("PROFILE_FORMAT") or "collapsed"
+            )
+        return profiler
+
+    def configure(self, enabled=True, calls=None, slow_ms=None, tools=None, format="collapsed"):
+        """프로파일링을 켜거나 끈다 - calls: 잡을 호출 수, slow_ms: 이보다 느린 호출만 (둘 다 없으면 다음 10건)"""
+        if not enabled:
+            self._finish()
+            return self.status()
+        if format not in PROFILE_FORMATS:
+            raise ValueError(f"지원하지 않는 형식입니다: {format}")
+        if calls is not None and calls < 1:
+            raise ValueError("calls는 1 이상이어야 합니다")
+
+        self._finish()
+        self.enabled = True
+        self.format = format
+        self.slow_ms = slow_ms
+        self.remaining = calls if calls is not None or slow_ms is not None else 10
+        self.tools = set(tools) if tools else None
+        self.stacks = Counter()
+        self.stats = None
+        self.captured = 0
+        self.skipped = 0
+        self.recent.clear()
+        self._start()
+        return self.status()
+
+    def _start(self):
+        ext = "collapsed" if self.format == "collapsed" else "prof"
+        self.path = os.path.join(self.output_dir, f"profile-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.{ext}")
+        if self.format == "collapsed":
+            self._stop = threading.Event()
+            self._thread = threading.Thread(target=self._sample, args=(self._stop,), name="tool-profiler", daemon=True)
+            self._thread.start()
+
+    def after_fork(self):
+        # fork된 자식(prefork 워커)에는 샘플러 스레드가 없으므로 새로 띄우고 파일도 자식 pid로
+        if self.enabled:
+            self._start()
+
+    def instrument(self, call_tool):
+        """꺼져 있으면 플래그 하나만 확인하고 그대로 호출"""
+
+        @wraps(call_tool)
+        async def wrapper(name, arguments):
+            if not self.enabled or (self.tools is not None and name not in self.tools):
+                return await call_tool(name, arguments)
+            return await self._profile(call_tool, name, arguments)
+
+        return wrapper
+
+    async def _profile(self, call_tool, name, arguments):
+        if self.slow_ms is None:
+            # 다음 N건: 시작할 때 자리를 잡아 동시 호출이 N을 넘지 않게
+            if self.remaining <= 0:
+                return await call_tool(name, arguments)
+            self.remaining -= 1
+
+        profile = None
+        if self.format == "pstats":
+            # cProfile은 스레드당 하나만 - 이미 잡는 중이면 이 호출은 건너뜀
+            # (await 사이에 같은 루프에서 돈 다른 작업도 함께 잡힌다)
+            if self._pstats_busy:
+                self.skipped += 1
+                return await call_tool(name, arguments)
+            self._pstats_busy = True
+            profile = cProfile.Profile()
+
+        call = ProfiledCall(name, profile)
+        started = time.perf_counter()
+        try:
+            return await self._run(call, call_tool, name, arguments)
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if profile is not None:
+                self._pstats_busy = False
+            self._record(call, elapsed_ms)
+
+    async def _run(self, call, call_tool, name, arguments):
+        # 샘플러는 스택에서 이 프레임을 찾아 샘플을 호출별로 나눈다
+        frame = sys._getframe()
+        self._frames[frame] = call
+        if call.profile is not None:
+            call.profile.enable()
+        try:
+            return await call_tool(name, arguments)
+        finally:
+            if call.profile is not None:
+                call.profile.disable()
+            del self._frames[frame]
+
+    def _record(self, call, elapsed_ms):
+        if not self.enabled or (self.slow_ms is not None and elapsed_ms < self.slow_ms):
+            return
+        self.captured += 1
+        self.recent.append({"tool": call.tool, "elapsed_ms": round(elapsed_ms, 2), "samples": sum(call.samples.values())})
+        if call.profile is not None:
+            if self.stats is None:
+                self.stats = pstats.Stats(call.profile)
+            else:
+                self.stats.add(call.profile)
+        for stack, count in call.samples.items():
+            self.stacks[f"{call.tool};{stack}" if stack else call.tool] += count
+        self.flush()
+
+        if self.slow_ms is not None and self.remaining is not None:
+            self.remaining -= 1
+        if self.remaining is not None and self.remaining <= 0 and not self._frames:
+            self._finish()
+
+    def _sample(self, stop):
+        while not stop.wait(self.interval):
+            calls = dict(self._frames)
+            if not calls:
+                continue
+            frames = sys._current_frames()
+            seen = set()
+            for thread_id in {call.thread_id for call in calls.values()}:
+                stack = []
+                frame = frames.get(thread_id)
+                while frame is not None:
+                    call = calls.get(frame)
+                    if call is not None:
+                        call.samples[";".join(reversed(stack))] += 1
+                        seen.add(call)
+                        break
+                    stack.append(frame_label(frame.f_code))
+                    frame = frame.f_back
+            for call in calls.values():
+                if call not in seen:
+                    call.samples[AWAIT_FRAME] += 1
+
+    def flush(self):
+        if self.path is None or not self.captured:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        if self.format == "pstats":
+            self.stats.dump_stats(self.path)
+            return
+        # flamegraph.pl / speedscope에서 바로 읽는 "스택 샘플수" 형식
+        with open(self.path, "w", encoding="utf-8") as f:
+            for stack, count in sorted(self.stacks.items()):
+                f.write(f"{stack} {count}\n")
+
+    def _finish(self):
+        self.enabled = False
+        if self._stop is not None:
+            self._stop.set()
+            self._stop = self._thread = None
+        self.flush()
+
+    def status(self):
+        return {
+            "enabled": self.enabled,
+            "format": self.format,
+            "remaining": self.remaining,
+            "slow_ms": self.slow_ms,
+            "tools": sorted(self.tools) if self.tools else None,
+            "interval_ms": self.interval * 1000,
+            "in_flight": len(self._frames),
+            "captured": self.captured,
+            "skipped": self.skipped,
+            "samples": sum(self.stacks.values()),
+            "output": self.path if self.captured else None,
+            "recent": list(self.recent)
+        }
+
+
+profiler = ToolProfiler.from_env()
+os.register_at_fork(after_in_child=profiler.after_fork)
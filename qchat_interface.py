@@ -1,10 +1,11 @@
 #!/usr/bin/env python3
 import streamlit as st
-import asyncio
 import json
+import os
 from datetime import datetime
-from mcp import ClientSession, StdioServerParameters
-from mcp.client.stdio import stdio_client
+from mcp import StdioServerParameters
+from background_loop import BackgroundLoop
+from mcp_pool import MCPClientPool
 
 st.set_page_config(
     page_title="🤖 Q Chat 날씨 봇",
@@ -40,32 +41,78 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# 답변 도착 여부를 확인하는 주기(초)
+POLL_INTERVAL = float(os.getenv("QCHAT_POLL_INTERVAL", "0.5"))
+
 st.markdown('<div class="chat-container"><h1>🤖 Q Chat 날씨 봇</h1><p>자연어로 날씨를 물어보세요!</p></div>', unsafe_allow_html=True)
 
 # 세션 상태 초기화
 if 'chat_history' not in st.session_state:
     st.session_state.chat_history = []
 
-async def get_qchat_response(query, location="서울"):
-    server_params = StdioServerParameters(
+@st.cache_resource
+def get_mcp_runtime():
+    # Streamlit 서버 전체에서 하나의 이벤트 루프와 MCP 세션 풀을 공유
+    # 브라우저 세션이 늘어도 서버 프로세스는 늘리지 않고 세션 하나로 여러 질문을 동시에 보낸다
+    # QCHAT_MCP_URL이 있으면 다른 클라이언트와 캐시를 공유하는 상시 HTTP 서버에 연결
+    loop = BackgroundLoop("qchat-mcp")
+    pool = MCPClientPool(os.getenv("QCHAT_MCP_URL") or StdioServerParameters(
         command="python",
-        args=["qchat_weather_server.py"]
-    )
+        args=["qchat_weather_server.py"],
+        # 서버가 OPENWEATHER_API_KEY 등 환경변수로 예보를 받으므로 그대로 넘긴다
+        env=dict(os.environ)
+    ), session_concurrency=int(os.getenv("QCHAT_SESSION_CONCURRENCY", "8")))
+    return loop, pool
+
+async def get_qchat_response(query, location="서울"):
+    _, pool = get_mcp_runtime()
     
     try:
-        async with stdio_client(server_params) as (read, write):
-            async with ClientSession(read, write) as session:
-                await session.initialize()
-                
-                result = await session.call_tool("analyze_weather_query", {
-                    "query": query,
-                    "location": location
-                })
-                
-                return json.loads(result.content[0].text)
+        result = await pool.call_tool("analyze_weather_query", {
+            "query": query,
+            "location": location
+        })
+        
+        return json.loads(result.content[0].text)
     except Exception as e:
         return {"error": str(e), "answer": "죄송합니다. 현재 날씨 정보를 가져올 수 없습니다."}
 
+async def get_answer_cache_stats():
+    _, pool = get_mcp_runtime()
+    result = await pool.call_tool("get_answer_cache_stats", {})
+    return json.loads(result.content[0].text)
+
+def submit_question(question, location):
+    # 답변을 기다리지 않고 백그라운드 루프에 넘긴다 - 도착하면 대화 내역이 채운다
+    mcp_loop, _ = get_mcp_runtime()
+    st.session_state.chat_history.append({
+        "user": question,
+        "bot": None,
+        "cached": False,
+        "future": mcp_loop.submit(get_qchat_response(question, location)),
+        "timestamp": datetime.now().strftime("%H:%M:%S"),
+        "location": location
+    })
+
+def collect_answers():
+    # 도착한 답변을 대화 내역에 반영하고 아직 기다리는 질문 수를 돌려준다
+    waiting = 0
+    for chat in st.session_state.chat_history:
+        future = chat.get("future")
+        if future is None:
+            continue
+        if not future.done():
+            waiting += 1
+            continue
+        try:
+            response = future.result()
+        except Exception as e:
+            response = {"error": str(e), "answer": "죄송합니다. 현재 날씨 정보를 가져올 수 없습니다."}
+        chat["bot"] = response.get("answer", "답변을 생성할 수 없습니다.")
+        chat["cached"] = response.get("cached", False)
+        chat["future"] = None
+    return waiting
+
 # 채팅 인터페이스
 col1, col2 = st.columns([3, 1])
 
@@ -76,25 +123,34 @@ with col2:
     location = st.selectbox("📍 지역", ["서울", "부산", "대구", "인천", "광주", "대전", "울산"])
 
 if st.button("🚀 질문하기", use_container_width=True) and user_input:
-    with st.spinner("🤖 답변 생성 중..."):
-        response = asyncio.run(get_qchat_response(user_input, location))
-        
-        # 채팅 히스토리에 추가
-        st.session_state.chat_history.append({
-            "user": user_input,
-            "bot": response.get("answer", "답변을 생성할 수 없습니다."),
-            "timestamp": datetime.now().strftime("%H:%M:%S"),
-            "location": location
-        })
+    submit_question(user_input, location)
+
+# 사이드바에서 고른 빠른 질문
+quick_question = st.session_state.pop("quick_question", None)
+if quick_question:
+    submit_question(quick_question, location)
 
-# 채팅 히스토리 표시
-if st.session_state.chat_history:
+# 채팅 히스토리 표시 - 답변을 기다리는 질문이 있으면 이 부분만 주기적으로 다시 그린다
+waiting_at_run = collect_answers()
+
+@st.fragment(run_every=POLL_INTERVAL if waiting_at_run else None)
+def chat_history_view():
+    if waiting_at_run and not collect_answers():
+        # 모두 도착하면 전체를 다시 실행해 주기적 갱신을 멈춘다
+        st.rerun()
+    if not st.session_state.chat_history:
+        return
+    
     st.subheader("💬 대화 내역")
     
     for i, chat in enumerate(reversed(st.session_state.chat_history[-10:])):  # 최근 10개만 표시
         with st.container():
             st.markdown(f'<div class="user-message"><strong>👤 사용자 ({chat["timestamp"]}):</strong><br/>{chat["user"]}</div>', unsafe_allow_html=True)
-            st.markdown(f'<div class="bot-message"><strong>🤖 Q Chat:</strong><br/>{chat["bot"]}</div>', unsafe_allow_html=True)
+            if chat["bot"] is None:
+                st.markdown('<div class="bot-message"><strong>🤖 Q Chat:</strong><br/>⏳ 답변 생성 중...</div>', unsafe_allow_html=True)
+                continue
+            cached = " ⚡" if chat.get("cached") else ""
+            st.markdown(f'<div class="bot-message"><strong>🤖 Q Chat{cached}:</strong><br/>{chat["bot"]}</div>', unsafe_allow_html=True)
             
             # 추가 액션 버튼
             col1, col2, col3 = st.columns(3)
@@ -108,11 +164,13 @@ if st.session_state.chat_history:
                 if st.button(f"📊 상세 분석", key=f"detail_{i}"):
                     st.info("📈 상세 분석 결과를 확인하세요!")
 
+chat_history_view()
+
 # 사이드바
 with st.sidebar:
     st.header("🔧 설정")
     
-    # 자주 묻는 질문
+    # 자주 묻는 질문 - 같은 지역·같은 예보면 서버 답변 캐시에서 바로 응답
     st.subheader("💡 자주 묻는 질문")
     quick_questions = [
         "오늘 날씨 어때?",
@@ -135,21 +193,29 @@ with st.sidebar:
         st.success("대화 내역이 삭제되었습니다!")
     
     st.write(f"💬 총 대화 수: {len(st.session_state.chat_history)}")
-
-# 빠른 질문 처리
-if hasattr(st.session_state, 'quick_question'):
-    with st.spinner("🤖 답변 생성 중..."):
-        response = asyncio.run(get_qchat_response(st.session_state.quick_question, location))
-        
-        st.session_state.chat_history.append({
-            "user": st.session_state.quick_question,
-            "bot": response.get("answer", "답변을 생성할 수 없습니다."),
-            "timestamp": datetime.now().strftime("%H:%M:%S"),
-            "location": location
-        })
     
-    del st.session_state.quick_question
-    st.rerun()
+    # 답변 캐시 통계
+    st.subheader("⚡ 답변 캐시")
+    # 통계도 기다리지 않는다 - 지난 실행 때 요청한 결과를 보여주고 새로 요청
+    stats_future = st.session_state.get("cache_stats_future")
+    if stats_future is not None and stats_future.done():
+        try:
+            st.session_state.cache_stats = stats_future.result()
+        except Exception as e:
+            st.session_state.cache_stats = {"error": str(e)}
+        stats_future = None
+    if stats_future is None:
+        mcp_loop, _ = get_mcp_runtime()
+        st.session_state.cache_stats_future = mcp_loop.submit(get_answer_cache_stats())
+    
+    cache_stats = st.session_state.get("cache_stats")
+    if cache_stats is None:
+        st.caption("통계를 불러오는 중...")
+    elif "error" in cache_stats:
+        st.caption(f"캐시 통계를 가져올 수 없습니다: {cache_stats['error']}")
+    else:
+        st.metric("적중률", f"{cache_stats['hit_rate']:.0%}", f"{cache_stats['hits']}/{cache_stats['hits'] + cache_stats['misses']}")
+        st.caption(f"절약한 답변 생성 시간 {cache_stats['latency_saved_ms']:.1f}ms · 예보 갱신으로 무효화 {cache_stats['invalidations']}회")
 
 # 푸터
 st.markdown("---")
@@ -1,12 +1,33 @@
 #!/usr/bin/env python3
-import asyncio
+import bisect
 import json
 import os
-from datetime import datetime
+import time
+from datetime import datetime, timezone
 from mcp.server import Server
 from mcp.types import Tool, TextContent
+from answer_cache import AnswerCache
+from forecast_cache import normalize_location
+from forecast_provider import provider_from_env
+from forecast_series import format_forecast_time
+from http_pool import HttpSessionPool
+from metrics import metrics
+from profiler import profiler
+from query_parser import parse_query
 
-app = Server("qchat-weather")
+# OpenWeatherMap 무료 예보 최대 기간 - 한 지역은 하나의 캐시 항목으로 모든 질문에 답한다
+FORECAST_DAYS = int(os.getenv("QCHAT_FORECAST_DAYS", "5"))
+# 날짜 경계는 한국 시간 기준
+KST_OFFSET = 9 * 3600
+DAY_LABELS = {0: "오늘", 1: "내일", 2: "모레", 3: "글피"}
+
+http = HttpSessionPool(trace_configs=metrics.trace_configs)
+# 캐시 + 요청 병합을 거치는 공용 예보 제공자 (WEATHER_PROVIDER_QCHAT / WEATHER_PROVIDER로 백엔드 선택)
+forecast = provider_from_env(http, "qchat")
+# (의도, 날짜, 지역)별 답변 - 예보 데이터 버전이 바뀌면 다시 만든다
+answers = AnswerCache()
+
+app = Server("qchat-weather", lifespan=http.lifespan)
 
 @app.list_tools()
 async def list_tools():
@@ -18,7 +39,7 @@ async def list_tools():
                 "type": "object",
                 "properties": {
                     "query": {"type": "string", "description": "사용자 질문"},
-                    "location": {"type": "string", "description": "지역명", "default": "서울"}
+                    "location": {"type": "string", "description": "지역명 (질문에 지역이 있으면 질문의 지역 우선)", "default": "서울"}
                 },
                 "required": ["query"]
             }
@@ -30,68 +51,241 @@ async def list_tools():
                 "type": "object",
                 "properties": {
                     "question": {"type": "string", "description": "날씨 질문"},
-                    "context": {"type": "string", "description": "추가 컨텍스트"}
+                    "context": {"type": "string", "description": "추가 컨텍스트"},
+                    "location": {"type": "string", "description": "지역명 (질문에 지역이 있으면 질문의 지역 우선)", "default": "서울"}
                 },
                 "required": ["question"]
             }
+        ),
+        Tool(
+            name="get_answer_cache_stats",
+            description="답변 캐시 적중률과 절약한 답변 생성 시간, 예보 캐시 통계 조회",
+            inputSchema={
+                "type": "object",
+                "properties": {}
+            }
+        ),
+        Tool(
+            name="get_server_stats",
+            description="도구·단계별 지연 히스토그램, 외부 API 상태 코드, 처리 중 요청 수 조회",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "format": {"type": "string", "enum": ["json", "prometheus"], "description": "응답 형식", "default": "json"}
+                }
+            }
+        ),
+        Tool(
+            name="configure_profiler",
+            description="재시작 없이 도구 호출 프로파일링 켜기/끄기 (다음 N건 또는 느린 호출을 접힌 스택/pstats 파일로 저장)",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "enabled": {"type": "boolean", "description": "false면 중지하고 지금까지 잡은 결과 저장", "default": True},
+                    "calls": {"type": "integer", "description": "잡을 호출 수 (slow_ms가 없으면 기본 10)"},
+                    "slow_ms": {"type": "number", "description": "이 시간(ms)보다 느린 호출만 저장"},
+                    "tools": {"type": "array", "items": {"type": "string"}, "description": "이 도구들만 프로파일 (기본: 전체)"},
+                    "format": {"type": "string", "enum": ["collapsed", "pstats"], "description": "collapsed: 플레임그래프용 접힌 스택 (샘플링), pstats: cProfile", "default": "collapsed"}
+                }
+            }
         )
     ]
 
 @app.call_tool()
+@metrics.instrument
+@profiler.instrument
 async def call_tool(name: str, arguments: dict):
     if name == "analyze_weather_query":
         return await analyze_weather_query(arguments)
     elif name == "get_weather_answer":
         return await get_weather_answer(arguments)
+    elif name == "get_answer_cache_stats":
+        return await get_answer_cache_stats(arguments)
+    elif name == "get_server_stats":
+        return await get_server_stats(arguments)
+    elif name == "configure_profiler":
+        return await configure_profiler(arguments)
+
+def summarize_forecast(series, now=None):
+    """캐시된 예보 열 배열에서 현재 상태와 일별 요약 계산 (네트워크 호출 없음)"""
+    # NumPy는 첫 답변을 만들 때 가져온다 (서버 시작 시간 단축)
+    import numpy as np
+    if not len(series):
+        raise ValueError("예보 데이터가 없습니다")
+    cols = series.arrays()
+    dt = cols["dt"]
+    now = time.time() if now is None else now
+    # 지금 직전의 예보 지점 (모두 미래면 첫 지점)
+    i = max(0, int(np.searchsorted(dt, now, side="right")) - 1)
+    current = {
+        "time": format_forecast_time(int(dt[i])),
+        "temp": round(float(cols["temp"][i]), 1),
+        "humidity": int(cols["humidity"][i]),
+        "description": series.descriptions[series.code[i]],
+        "wind_speed": round(float(cols["wind_speed"][i]), 1),
+        "pop": round(float(cols["pop"][i]) * 100)
+    }
+
+    day_index = (dt + KST_OFFSET) // 86400
+    codes = np.frombuffer(series.code, dtype=np.uint16)
+    days = []
+    for offset in range(int(day_index[-1] - day_index[i]) + 1):
+        # 오늘은 지금 이후 지점만
+        mask = (day_index == day_index[i] + offset) & (dt >= dt[i])
+        if not mask.any():
+            continue
+        temps = cols["temp"][mask]
+        days.append({
+            "offset": offset,
+            "time": DAY_LABELS.get(offset, f"{offset}일 후"),
+            "date": datetime.fromtimestamp(int(day_index[i] + offset) * 86400, timezone.utc).strftime("%Y-%m-%d"),
+            "temp": round(float(temps.mean()), 1),
+            "temp_min": round(float(temps.min()), 1),
+            "temp_max": round(float(temps.max()), 1),
+            "humidity": round(float(cols["humidity"][mask].mean())),
+            "wind_speed": round(float(cols["wind_speed"][mask].max()), 1),
+            "pop": round(float(cols["pop"][mask].max()) * 100),
+            "desc": series.descriptions[int(np.bincount(codes[mask]).argmax())]
+        })
+    return {"current": current, "forecast": days}
+
+def rain_advice(pop):
+    if pop >= 60:
+        return "우산을 꼭 챙기세요."
+    if pop >= 30:
+        return "우산을 챙기시는 게 좋겠습니다."
+    return "우산 없이 외출하셔도 됩니다."
+
+def wind_advice(speed):
+    if speed >= 14:
+        return "강풍에 주의하세요."
+    if speed >= 9:
+        return "바람이 강하게 붑니다."
+    if speed >= 4:
+        return "바람이 약간 있습니다."
+    return "바람이 거의 없습니다."
+
+def compose_answer(location, intent, day_offset, summary):
+    # 질문 의도와 날짜에 맞춰 요약 값으로 답변 문장 생성
+    if day_offset is None:
+        # 주말·이번 주처럼 여러 날에 걸친 표현 - 오늘 값으로 대신 답하지 않는다
+        return (f"{location}의 주말·이번 주처럼 여러 날에 걸친 기간의 날씨는 아직 답할 수 없습니다. "
+                f"오늘, 내일, 모레, 글피 중 하루를 골라 물어봐 주세요.")
+    current = summary["current"]
+    days = {d["offset"]: d for d in summary["forecast"]}
+    day = days.get(day_offset) if day_offset else None
+    if day_offset and day is None:
+        return f"{location}의 {DAY_LABELS.get(day_offset, f'{day_offset}일 후')} 예보는 아직 없습니다."
+    today = days.get(0, {"pop": current["pop"], "wind_speed": current["wind_speed"], "temp_min": current["temp"], "temp_max": current["temp"]})
+    when = day["time"] if day else "오늘"
+
+    if intent == "rain":
+        pop = (day or today)["pop"]
+        return f"{location} {when} 강수 확률은 최대 {pop}%입니다. {rain_advice(pop)}"
+    if intent == "wind":
+        if day:
+            return f"{location} {when} 최대 풍속은 {day['wind_speed']}m/s입니다. {wind_advice(day['wind_speed'])}"
+        return f"{location}의 현재 풍속은 {current['wind_speed']}m/s입니다. {wind_advice(current['wind_speed'])}"
+    if intent == "temperature":
+        if day:
+            return f"{location}의 {when} 기온은 최저 {day['temp_min']}°C, 최고 {day['temp_max']}°C로 예상됩니다."
+        return f"{location}의 현재 기온은 {current['temp']}°C입니다."
+    if intent == "humidity":
+        if day:
+            return f"{location}의 {when} 평균 습도는 {day['humidity']}%로 예상됩니다."
+        return f"{location}의 현재 습도는 {current['humidity']}%입니다."
+    if intent == "forecast":
+        forecast_text = "\n".join(
+            f"• {d['time']}: {d['temp_min']}~{d['temp_max']}°C, {d['desc']}, 강수 확률 {d['pop']}%" for d in summary["forecast"]
+        )
+        return f"{location} 날씨 예보:\n{forecast_text}"
+
+    target = day or today
+    temp = day["temp"] if day else current["temp"]
+    if intent == "cold":
+        if temp < 5:
+            advice = "두꺼운 외투가 필요합니다."
+        elif temp < 12:
+            advice = "가벼운 외투를 챙기세요."
+        else:
+            advice = "춥지 않은 날씨입니다."
+        return f"{location} {when} 기온은 {temp}°C입니다. {advice}"
+    if intent == "hot":
+        if temp >= 30:
+            advice = "무더우니 수분을 충분히 섭취하세요."
+        elif temp >= 25:
+            advice = "더운 편이니 시원한 복장을 권합니다."
+        else:
+            advice = "덥지 않은 날씨입니다."
+        return f"{location} {when} 기온은 {temp}°C입니다. {advice}"
+    if intent in ("outing", "exercise", "laundry"):
+        humidity = day["humidity"] if day else current["humidity"]
+        activity = {"outing": "외출하기", "exercise": "야외 운동하기", "laundry": "빨래 말리기"}[intent]
+        reasons = []
+        if target["pop"] >= 30:
+            reasons.append(f"강수 확률 {target['pop']}%")
+        if target["wind_speed"] >= 9:
+            reasons.append(f"풍속 {target['wind_speed']}m/s")
+        if intent == "laundry" and humidity >= 70:
+            reasons.append(f"습도 {humidity}%")
+        if intent != "laundry" and not -5 <= temp <= 30:
+            reasons.append(f"기온 {temp}°C")
+        if reasons:
+            return f"{location} {when} 날씨는 {', '.join(reasons)} 때문에 {activity} 좋지 않습니다."
+        return f"{location} {when} 날씨는 {activity} 좋습니다. (기온 {temp}°C, 강수 확률 {target['pop']}%)"
+
+    if day:
+        return (f"{location}의 {when} 날씨는 {day['desc']}이며, 기온은 {day['temp_min']}~{day['temp_max']}°C, "
+                f"강수 확률은 {day['pop']}%로 예상됩니다.")
+    return (f"{location}의 현재 날씨는 {current['description']}이며, 기온은 {current['temp']}°C, "
+            f"습도 {current['humidity']}%, 풍속 {current['wind_speed']}m/s입니다.")
+
+async def answer_query(query, default_location):
+    # 질문 속 지역/시간/의도를 한 번에 추출 - 지역이 없으면 인자의 지역 사용
+    with metrics.phase("parse_query"):
+        parsed = parse_query(query, default_location)
+    location = parsed["location"]
+    # 캐시가 따뜻하면 네트워크 없이 캐시된 열 배열로 답한다
+    with metrics.phase("load"):
+        series = await forecast.load(location, FORECAST_DAYS)
+    now = time.time()
+    # 예보 데이터 버전 - 예보를 새로 받거나 다음 예보 시각으로 넘어가면 바뀐다
+    version = (series.timestamp, bisect.bisect_right(series.dt, now))
+    key = (parsed["intent"], parsed["day_offset"], normalize_location(location))
+    cached = answers.get(key, version)
+    if cached is not None:
+        summary, answer = cached
+        return parsed, series, summary, answer, True
+
+    started = time.perf_counter()
+    with metrics.phase("answer"):
+        summary = summarize_forecast(series, now)
+        answer = compose_answer(location, parsed["intent"], parsed["day_offset"], summary)
+    answers.put(key, version, (summary, answer), time.perf_counter() - started)
+    return parsed, series, summary, answer, False
 
 async def analyze_weather_query(args):
     query = args["query"]
-    location = args.get("location", "서울")
-    
+
     try:
-        # 샘플 날씨 데이터 생성
-        weather_data = {
-            "location": location,
-            "timestamp": datetime.now().isoformat(),
-            "current": {
-                "temp": 18.5,
-                "humidity": 65,
-                "description": "맑음",
-                "wind_speed": 2.3
-            },
-            "forecast": [
-                {"time": "오늘", "temp": 20, "desc": "맑음"},
-                {"time": "내일", "temp": 22, "desc": "구름조금"},
-                {"time": "모레", "temp": 19, "desc": "흐림"}
-            ]
-        }
-        
-        # 질문 분석 및 답변 생성
-        if "온도" in query or "기온" in query:
-            answer = f"{location}의 현재 기온은 {weather_data['current']['temp']}°C입니다."
-        elif "습도" in query:
-            answer = f"{location}의 현재 습도는 {weather_data['current']['humidity']}%입니다."
-        elif "날씨" in query:
-            answer = f"{location}의 현재 날씨는 {weather_data['current']['description']}이며, 기온은 {weather_data['current']['temp']}°C입니다."
-        elif "예보" in query or "내일" in query:
-            forecast_text = "\n".join([f"• {f['time']}: {f['temp']}°C, {f['desc']}" for f in weather_data['forecast']])
-            answer = f"{location} 날씨 예보:\n{forecast_text}"
-        else:
-            answer = f"{location}의 종합 날씨 정보: 현재 {weather_data['current']['temp']}°C, {weather_data['current']['description']}, 습도 {weather_data['current']['humidity']}%"
-        
+        parsed, series, summary, answer, cached = await answer_query(query, args.get("location", "서울"))
+
         result = {
             "query": query,
-            "location": location,
+            "location": parsed["location"],
+            "intent": parsed["intent"],
+            "time_ref": parsed["time_ref"],
             "answer": answer,
-            "weather_data": weather_data,
+            "cached": cached,
+            "weather_data": dict(summary, location=series.location, timestamp=series.timestamp),
             "timestamp": datetime.now().isoformat()
         }
-        
+
         return [TextContent(
             type="text",
             text=json.dumps(result, ensure_ascii=False, indent=2)
         )]
-        
+
     except Exception as e:
         return [TextContent(
             type="text",
@@ -101,43 +295,56 @@ async def analyze_weather_query(args):
 async def get_weather_answer(args):
     question = args["question"]
     context = args.get("context", "")
-    
+
     try:
-        # 질문 유형별 답변 템플릿
-        answer_templates = {
-            "비": "현재 강수 확률은 낮습니다. 우산 없이도 외출하셔도 됩니다.",
-            "추위": "현재 기온이 적당하니 가벼운 외투 정도면 충분합니다.",
-            "더위": "현재 기온이 쾌적한 수준입니다. 시원한 복장을 권합니다.",
-            "외출": "현재 날씨가 좋아 외출하기 적합합니다.",
-            "운동": "야외 운동하기 좋은 날씨입니다.",
-            "세탁": "빨래 말리기 좋은 날씨입니다."
-        }
-        
-        # 키워드 매칭으로 답변 선택
-        answer = "날씨 관련 정보를 확인해드리겠습니다."
-        for keyword, template in answer_templates.items():
-            if keyword in question:
-                answer = template
-                break
-        
+        parsed, _, _, answer, cached = await answer_query(question, args.get("location", "서울"))
+
         result = {
             "question": question,
+            "location": parsed["location"],
+            "intent": parsed["intent"],
             "answer": answer,
+            "cached": cached,
             "context": context,
             "timestamp": datetime.now().isoformat()
         }
-        
+
         return [TextContent(
             type="text",
             text=json.dumps(result, ensure_ascii=False, indent=2)
         )]
-        
+
     except Exception as e:
         return [TextContent(
             type="text",
             text=json.dumps({"error": str(e), "question": question}, ensure_ascii=False)
         )]
 
+async def get_answer_cache_stats(args):
+    return [TextContent(
+        type="text",
+        text=json.dumps(dict(answers.stats(), forecast=forecast.stats()), ensure_ascii=False, indent=2)
+    )]
+
+async def get_server_stats(args):
+    if args.get("format") == "prometheus":
+        return [TextContent(type="text", text=metrics.prometheus())]
+    return [TextContent(
+        type="text",
+        text=json.dumps(
+            dict(metrics.snapshot(), profiler=profiler.status(), answers=answers.stats(), forecast=forecast.stats()),
+            ensure_ascii=False, indent=2
+        )
+    )]
+
+async def configure_profiler(args):
+    try:
+        status = profiler.configure(**args) if args else profiler.status()
+        return [TextContent(type="text", text=json.dumps(status, ensure_ascii=False, indent=2))]
+    except (TypeError, ValueError) as e:
+        return [TextContent(type="text", text=json.dumps({"error": str(e)}, ensure_ascii=False))]
+
 if __name__ == "__main__":
-    from mcp.server.stdio import stdio_server
-    asyncio.run(stdio_server(app))
\ No newline at end of file
+    # --transport http|sse로 여러 클라이언트가 공유하는 상시 서버로 실행
+    from mcp_transport import run_server
+    run_server(app, "Q Chat 날씨 MCP 서버", 8003)
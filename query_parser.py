@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+import re
+
+# 질문 의도별 키워드 - 여러 의도가 잡히면 INTENT_PRIORITY 순서로 하나를 고른다
+INTENT_KEYWORDS = {
+    "rain": ["비", "비와", "비가", "비 와", "비올", "비 올", "비오", "강수", "우산", "소나기", "장마", "눈 와", "눈이", "눈올", "눈 올"],
+    "wind": ["바람", "풍속", "강풍", "태풍"],
+    "humidity": ["습도", "습해", "습한", "눅눅", "건조"],
+    "temperature": ["온도", "기온", "몇 도", "몇도", "최고기온", "최저기온"],
+    "laundry": ["빨래", "세탁"],
+    "exercise": ["운동", "러닝", "조깅", "등산", "자전거"],
+    "outing": ["외출", "나들이", "산책", "놀러", "나가도"],
+    "cold": ["추위", "춥", "추운", "추워", "쌀쌀"],
+    "hot": ["더위", "덥", "더운", "더워", "무더"],
+    "forecast": ["예보", "주간", "앞으로"],
+    "general": ["날씨", "기상", "하늘"]
+}
+INTENT_PRIORITY = ["rain", "wind", "humidity", "temperature", "laundry", "exercise", "outing", "cold", "hot", "forecast", "general"]
+
+# 이 글자로 시작하는 키워드는 앞 글자가 한글이면 다른 단어의 일부로 본다 ("준비"의 "비", "준비와"의 "비와")
+STANDALONE_PREFIXES = ("비",)
+
+# 시간 표현 → (라벨, 오늘 기준 일수) - 여러 날에 걸친 표현은 일수 None (답변에서 지원하지 않음을 알린다)
+TIME_REFS = {
+    "지금": ("지금", 0), "현재": ("지금", 0), "오늘": ("오늘", 0), "오늘밤": ("오늘", 0),
+    "내일": ("내일", 1), "낼": ("내일", 1), "명일": ("내일", 1),
+    "모레": ("모레", 2), "내일모레": ("모레", 2), "글피": ("글피", 3),
+    "주말": ("주말", None), "이번 주말": ("주말", None), "이번주": ("이번주", None), "이번 주": ("이번주", None)
+}
+
+# 행정구역 지명 사전 - 대표 이름(날씨 API 조회용) → 별칭
+REGIONS = {
+    "서울": ["서울", "서울시", "서울특별시"],
+    "부산": ["부산", "부산시", "부산광역시"],
+    "대구": ["대구", "대구시", "대구광역시"],
+    "인천": ["인천", "인천시", "인천광역시"],
+    "광주": ["광주", "광주시", "광주광역시"],
+    "대전": ["대전", "대전시", "대전광역시"],
+    "울산": ["울산", "울산시", "울산광역시"],
+    "세종": ["세종", "세종시", "세종특별자치시"],
+    "경기": ["경기", "경기도"],
+    "강원": ["강원", "강원도", "강원특별자치도"],
+    "충북": ["충북", "충청북도"],
+    "충남": ["충남", "충청남도"],
+    "전북": ["전북", "전라북도", "전북특별자치도"],
+    "전남": ["전남", "전라남도"],
+    "경북": ["경북", "경상북도"],
+    "경남": ["경남", "경상남도"],
+    "제주": ["제주", "제주도", "제주시", "제주특별자치도"],
+    "서귀포": ["서귀포", "서귀포시"],
+    "수원": ["수원", "수원시"],
+    "성남": ["성남", "성남시", "분당"],
+    "고양": ["고양", "고양시", "일산"],
+    "용인": ["용인", "용인시"],
+    "부천": ["부천", "부천시"],
+    "안산": ["안산", "안산시"],
+    "안양": ["안양", "안양시"],
+    "화성": ["화성", "화성시", "동탄"],
+    "평택": ["평택", "평택시"],
+    "파주": ["파주", "파주시"],
+    "김포": ["김포", "김포시"],
+    "의정부": ["의정부", "의정부시"],
+    "남양주": ["남양주", "남양주시"],
+    "춘천": ["춘천", "춘천시"],
+    "원주": ["원주", "원주시"],
+    "강릉": ["강릉", "강릉시"],
+    "속초": ["속초", "속초시"],
+    "청주": ["청주", "청주시"],
+    "충주": ["충주", "충주시"],
+    "천안": ["천안", "천안시"],
+    "아산": ["아산", "아산시"],
+    "전주": ["전주", "전주시"],
+    "군산": ["군산", "군산시"],
+    "익산": ["익산", "익산시"],
+    "목포": ["목포", "목포시"],
+    "여수": ["여수", "여수시"],
+    "순천": ["순천", "순천시"],
+    "포항": ["포항", "포항시"],
+    "경주": ["경주", "경주시"],
+    "구미": ["구미", "구미시"],
+    "안동": ["안동", "안동시"],
+    "창원": ["창원", "창원시", "마산", "진해"],
+    "김해": ["김해", "김해시"],
+    "진주": ["진주", "진주시"],
+    "통영": ["통영", "통영시"],
+    "거제": ["거제", "거제시"],
+    "양산": ["양산", "양산시"],
+    "울릉": ["울릉", "울릉도"]
+}
+
+
+def trie_pattern(words):
+    """단어 목록을 접두사 트리 모양의 정규식으로 - 위치마다 한 갈래만 따라가므로 질문 길이에 선형"""
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def build(node):
+        end = node.get("", False)
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # 더 긴 단어를 먼저 시도 (greedy) - "서울특별시"가 "서울"보다 우선
+        if end:
+            return "(?:" + body + ")?"
+        return body
+
+    return build(trie)
+
+
+class QueryParser:
+    """의도 키워드 + 지명 + 시간 표현을 하나의 정규식으로 한 번에 찾는 질문 파서"""
+
+    def __init__(self, intents=INTENT_KEYWORDS, regions=REGIONS, time_refs=TIME_REFS):
+        # 표면형 → (종류, 값) - 같은 표면형이 여러 종류에 있으면 먼저 등록한 쪽
+        self.lexicon = {}
+        for intent, words in intents.items():
+            for word in words:
+                self.lexicon.setdefault(word, ("intent", intent))
+        for canonical, aliases in regions.items():
+            for alias in aliases:
+                self.lexicon.setdefault(alias, ("location", canonical))
+        for word, ref in time_refs.items():
+            self.lexicon.setdefault(word, ("time", ref))
+        self.pattern = re.compile(trie_pattern(self.lexicon))
+        self.priority = {intent: i for i, intent in enumerate(INTENT_PRIORITY)}
+
+    def parse(self, query, default_location=None):
+        intents = []
+        location = None
+        time_ref = None
+        for match in self.pattern.finditer(query):
+            word = match.group()
+            if word.startswith(STANDALONE_PREFIXES) and match.start() and "가" <= query[match.start() - 1] <= "힣":
+                continue
+            kind, value = self.lexicon[word]
+            if kind == "intent":
+                if value not in intents:
+                    intents.append(value)
+            elif kind == "location":
+                # 처음 나온 지명을 사용
+                location = location or value
+            else:
+                time_ref = time_ref or value
+
+        intent = min(intents, key=self.priority.__getitem__) if intents else "general"
+        label, day_offset = time_ref or ("지금", 0)
+        return {
+            "intent": intent,
+            "intents": intents,
+            "location": location or default_location,
+            "location_found": location is not None,
+            "time_ref": label,
+            "day_offset": day_offset
+        }
+
+
+# 서버 시작 시 한 번만 정규식을 만든다
+PARSER = QueryParser()
+
+
+def parse_query(query, default_location=None):
+    return PARSER.parse(query, default_location)
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+import asyncio
+import random
+import time
+from collections import deque
+
+
+class TokenBucket:
+    """초당 rate개, 최대 capacity개까지 몰아 쓸 수 있는 토큰 버킷 (단일 이벤트 루프용)"""
+
+    def __init__(self, rate, capacity=1, clock=time.monotonic):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.clock = clock
+        self.tokens = self.capacity
+        self.updated = clock()
+        self.paused_until = 0.0
+
+    def reserve(self):
+        # 토큰 하나를 예약하고 기다려야 할 시간(초)을 돌려준다 - await 없이 계산하므로 락이 필요 없다
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        return max(wait, self.paused_until - now)
+
+    async def acquire(self):
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds):
+        # 429 Retry-After 동안은 이 버킷을 쓰는 모든 요청을 멈춘다
+        self.paused_until = max(self.paused_until, self.clock() + seconds)
+
+
+class CallBudget:
+    """window초 동안 limit회까지 쓸 수 있는 외부 API 호출 예산 (슬라이딩 윈도우)"""
+
+    def __init__(self, limit, window, clock=time.monotonic):
+        self.limit = int(limit)
+        self.window = float(window)
+        self.clock = clock
+        self._calls = deque()
+        self.total = 0
+
+    def _prune(self):
+        cutoff = self.clock() - self.window
+        while self._calls and self._calls[0] <= cutoff:
+            self._calls.popleft()
+
+    def spend(self, count=1):
+        now = self.clock()
+        self._calls.extend([now] * count)
+        self.total += count
+        self._prune()
+
+    def used(self):
+        self._prune()
+        return len(self._calls)
+
+    def remaining(self):
+        return max(0, self.limit - self.used())
+
+    def stats(self):
+        used = self.used()
+        return {"limit": self.limit, "window": self.window, "used": used,
+                "remaining": max(0, self.limit - used), "total": self.total}
+
+
+def retry_after_seconds(headers, default=1.0):
+    # Retry-After 헤더(초 단위)를 읽는다 - 대소문자 구분 없이
+    for key, value in (headers or {}).items():
+        if key.lower() == "retry-after":
+            try:
+                return max(0.0, float(value))
+            except (TypeError, ValueError):
+                return default
+    return default
+
+
+def backoff_delay(attempt, base=0.5, cap=30.0):
+    # 지수 백오프 + full jitter
+    return random.uniform(0, min(cap, base * 2 ** attempt))
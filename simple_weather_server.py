@@ -1,11 +1,15 @@
 #!/usr/bin/env python3
-import asyncio
 import json
-from datetime import datetime
 from mcp.server import Server
 from mcp.types import Tool, TextContent
+from forecast_provider import provider_from_env
+from http_pool import HttpSessionPool
 
-app = Server("simple-weather")
+http = HttpSessionPool()
+# 기본은 synthetic 백엔드 (WEATHER_PROVIDER_SIMPLE=owm|replay로 실제/기록 데이터)
+forecast = provider_from_env(http, "simple", default="synthetic")
+
+app = Server("simple-weather", lifespan=http.lifespan)
 
 @app.list_tools()
 async def list_tools():
@@ -16,7 +20,8 @@ async def list_tools():
             inputSchema={
                 "type": "object",
                 "properties": {
-                    "location": {"type": "string", "description": "지역명"}
+                    "location": {"type": "string", "description": "지역명"},
+                    "days": {"type": "integer", "description": "예보 일수", "default": 1}
                 },
                 "required": ["location"]
             }
@@ -26,24 +31,17 @@ async def list_tools():
 @app.call_tool()
 async def call_tool(name: str, arguments: dict):
     if name == "get_sample_weather":
-        location = arguments["location"]
-        
-        # 샘플 데이터 생성
-        sample_data = {
-            "location": location,
-            "timestamp": datetime.now().isoformat(),
-            "forecasts": [
-                {"datetime": "2024-01-01 12:00", "temp": 18.5, "humidity": 65, "description": "맑음"},
-                {"datetime": "2024-01-01 15:00", "temp": 20.2, "humidity": 60, "description": "구름조금"},
-                {"datetime": "2024-01-01 18:00", "temp": 16.8, "humidity": 70, "description": "흐림"}
-            ]
-        }
-        
-        return [TextContent(
-            type="text",
-            text=json.dumps(sample_data, ensure_ascii=False, indent=2)
-        )]
+        try:
+            # 다른 앱과 같은 예보 경로 (캐시 + 요청 병합)
+            series = await forecast.load(arguments["location"], arguments.get("days", 1))
+            return [TextContent(
+                type="text",
+                text=json.dumps(series.to_dict(), ensure_ascii=False, indent=2)
+            )]
+        except Exception as e:
+            return [TextContent(type="text", text=json.dumps({"error": str(e)}, ensure_ascii=False))]
 
 if __name__ == "__main__":
-    import mcp.server.stdio
-    asyncio.run(mcp.server.stdio.stdio_server(app))
\ No newline at end of file
+    # --transport http|sse로 여러 클라이언트가 공유하는 상시 서버로 실행
+    from mcp_transport import run_server
+    run_server(app, "샘플 날씨 MCP 서버", 8004)
\ No newline at end of file
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+import asyncio
+
+
+class SingleFlight:
+    """같은 키로 동시에 들어온 요청을 하나의 실행으로 합친다"""
+
+    def __init__(self):
+        self._inflight = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key, fn):
+        task = self._inflight.get(key)
+        if task is None:
+            self.calls += 1
+            task = asyncio.get_running_loop().create_task(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        else:
+            self.coalesced += 1
+        # 대기자 하나가 취소되어도 공유 작업은 계속 진행
+        return await asyncio.shield(task)
+
+    def _done(self, key, task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # 모든 대기자가 취소된 경우에도 예외가 경고로 새지 않도록 회수
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self):
+        return {
+            "upstream_calls": self.calls,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._inflight)
+        }
@@ -1,66 +1,200 @@
 #!/usr/bin/env python3
 import asyncio
 import json
-from slack_sdk.web.async_client import AsyncWebClient
-from slack_sdk.errors import SlackApiError
+import os
 
-class WeatherSlackBot:
-    def __init__(self, token):
-        self.client = AsyncWebClient(token=token)
-    
-    async def send_weather_report(self, channel, weather_analysis):
-        try:
-            blocks = [
+from http_pool import HttpSessionPool
+from rate_limit import TokenBucket, backoff_delay, retry_after_seconds
+
+SLACK_API_URL = os.getenv("SLACK_API_URL", "https://slack.com/api")
+# chat.postMessage는 채널당 초당 1건 정도가 한도 (짧은 버스트 허용)
+SLACK_RATE_PER_CHANNEL = float(os.getenv("SLACK_RATE_PER_CHANNEL", "1"))
+SLACK_BURST = int(os.getenv("SLACK_BURST", "3"))
+SLACK_MAX_RETRIES = int(os.getenv("SLACK_MAX_RETRIES", "5"))
+# 지역 보고서 하나가 블록 4개 - 메시지당 블록 50개 한도 안에서 묶는다
+SLACK_BUNDLE_SIZE = int(os.getenv("SLACK_BUNDLE_SIZE", "10"))
+MAX_BLOCKS_PER_MESSAGE = 50
+
+http = HttpSessionPool()
+
+
+def report_blocks(weather_analysis):
+    return [
+        {
+            "type": "header",
+            "text": {
+                "type": "plain_text",
+                "text": f"🌤️ {weather_analysis['location']} 날씨 분석 보고서"
+            }
+        },
+        {
+            "type": "section",
+            "fields": [
+                {
+                    "type": "mrkdwn",
+                    "text": f"*🌡️ 평균 온도*\n{weather_analysis['temperature']['avg']}°C"
+                },
                 {
-                    "type": "header",
-                    "text": {
-                        "type": "plain_text",
-                        "text": f"🌤️ {weather_analysis['location']} 날씨 분석 보고서"
-                    }
+                    "type": "mrkdwn",
+                    "text": f"*💧 평균 습도*\n{weather_analysis['humidity']['avg']}%"
                 },
                 {
-                    "type": "section",
-                    "fields": [
-                        {
-                            "type": "mrkdwn",
-                            "text": f"*🌡️ 평균 온도*\n{weather_analysis['temperature']['avg']}°C"
-                        },
-                        {
-                            "type": "mrkdwn", 
-                            "text": f"*💧 평균 습도*\n{weather_analysis['humidity']['avg']}%"
-                        },
-                        {
-                            "type": "mrkdwn",
-                            "text": f"*📈 온도 트렌드*\n{weather_analysis['temperature']['trend']}"
-                        },
-                        {
-                            "type": "mrkdwn",
-                            "text": f"*⏰ 분석 시간*\n{weather_analysis['analysis_time'][:16]}"
-                        }
-                    ]
+                    "type": "mrkdwn",
+                    "text": f"*📈 온도 트렌드*\n{weather_analysis['temperature']['trend']}"
                 },
                 {
-                    "type": "section",
-                    "text": {
-                        "type": "mrkdwn",
-                        "text": f"📊 *요약*: {weather_analysis['summary']}"
-                    }
+                    "type": "mrkdwn",
+                    "text": f"*⏰ 분석 시간*\n{weather_analysis['analysis_time'][:16]}"
                 }
             ]
-            
-            response = await self.client.chat_postMessage(
-                channel=channel,
-                blocks=blocks,
+        },
+        {
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": f"📊 *요약*: {weather_analysis['summary']}"
+            }
+        }
+    ]
+
+
+def bundle_blocks(analyses):
+    # 여러 지역 보고서를 구분선으로 이어 한 메시지로
+    blocks = []
+    for i, weather_analysis in enumerate(analyses):
+        if i:
+            blocks.append({"type": "divider"})
+        blocks.extend(report_blocks(weather_analysis))
+    return blocks[:MAX_BLOCKS_PER_MESSAGE]
+
+
+class SlackDispatcher:
+    """토큰별로 공유하는 Slack 전송기 - 채널별 토큰 버킷, 429 Retry-After 준수, 지수 백오프 재시도"""
+
+    def __init__(self, token, pool=None, rate=None, burst=None, max_retries=None, base_url=None):
+        self.token = token
+        self.pool = pool or http
+        self.rate = rate or SLACK_RATE_PER_CHANNEL
+        self.burst = burst or SLACK_BURST
+        self.max_retries = SLACK_MAX_RETRIES if max_retries is None else max_retries
+        self.base_url = base_url
+
+        self._client = None
+        self._session = None
+        self._buckets = {}
+        self.sent = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.failed = 0
+
+    def client(self):
+        # 풀의 세션이 바뀔 때만 클라이언트를 다시 만든다 (요청마다 세션 생성 방지)
+        session = self.pool.session()
+        if self._client is None or self._session is not session:
+            from slack_sdk.web.async_client import AsyncWebClient
+            self._client = AsyncWebClient(
+                token=self.token,
+                base_url=self.base_url or SLACK_API_URL,
+                session=session
+            )
+            self._session = session
+        return self._client
+
+    def bucket(self, channel):
+        bucket = self._buckets.get(channel)
+        if bucket is None:
+            bucket = self._buckets[channel] = TokenBucket(self.rate, self.burst)
+        return bucket
+
+    async def post(self, channel, **payload):
+        # slack_sdk/aiohttp는 실제로 보낼 때 가져온다 (서버 시작 시간 단축)
+        import aiohttp
+        from slack_sdk.errors import SlackApiError
+
+        bucket = self.bucket(channel)
+        error = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self.retries += 1
+            await bucket.acquire()
+            try:
+                response = await self.client().chat_postMessage(channel=channel, **payload)
+                self.sent += 1
+                return {"success": True, "ts": response["ts"]}
+            except SlackApiError as e:
+                error = e
+                status = e.response.status_code
+                if status == 429:
+                    # 같은 채널의 대기 중인 요청까지 Retry-After 동안 멈춘다
+                    self.rate_limited += 1
+                    bucket.pause(retry_after_seconds(e.response.headers))
+                    continue
+                if status < 500:
+                    # channel_not_found 등 재시도해도 소용없는 오류
+                    break
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = e
+            await asyncio.sleep(backoff_delay(attempt))
+
+        self.failed += 1
+        return {"success": False, "error": str(error)}
+
+    def stats(self):
+        return {
+            "sent": self.sent,
+            "retries": self.retries,
+            "rate_limited": self.rate_limited,
+            "failed": self.failed,
+            "channels": len(self._buckets)
+        }
+
+
+_dispatchers = {}
+
+
+def get_dispatcher(token, pool=None):
+    # 같은 토큰·풀은 같은 전송기(클라이언트와 채널별 버킷)를 재사용 - 다른 풀을 넘기면 그 풀의 전송기
+    key = (token, pool or http)
+    dispatcher = _dispatchers.get(key)
+    if dispatcher is None:
+        dispatcher = _dispatchers[key] = SlackDispatcher(token, key[1])
+    return dispatcher
+
+
+class WeatherSlackBot:
+    def __init__(self, token, dispatcher=None):
+        self.dispatcher = dispatcher or get_dispatcher(token)
+
+    async def send_weather_report(self, channel, weather_analysis):
+        return await self.dispatcher.post(
+            channel,
+            blocks=report_blocks(weather_analysis),
+            text=weather_analysis["summary"],
+            username="날씨봇",
+            icon_emoji=":sunny:"
+        )
+
+    async def send_weather_reports(self, channel, analyses, bundle_size=None):
+        """여러 지역 보고서를 bundle_size개씩 묶어 전송 - 지역 순서대로 결과 반환"""
+        bundle_size = max(1, min(bundle_size or SLACK_BUNDLE_SIZE, (MAX_BLOCKS_PER_MESSAGE + 1) // 4))
+        bundles = [analyses[i:i + bundle_size] for i in range(0, len(analyses), bundle_size)]
+        sent = await asyncio.gather(*(
+            self.dispatcher.post(
+                channel,
+                blocks=bundle_blocks(bundle),
+                text=f"🌤️ {', '.join(a['location'] for a in bundle)} 날씨 분석 보고서",
                 username="날씨봇",
                 icon_emoji=":sunny:"
             )
-            
-            return {"success": True, "ts": response["ts"]}
-            
-        except SlackApiError as e:
-            return {"success": False, "error": str(e)}
+            for bundle in bundles
+        ))
+        return [result for bundle, result in zip(bundles, sent) for _ in bundle]
 
 async def send_to_slack_formatted(token, channel, analysis_data):
     bot = WeatherSlackBot(token)
     result = await bot.send_weather_report(channel, analysis_data)
-    return result
\ No newline at end of file
+    return result
+
+async def send_reports_formatted(token, channel, analyses, bundle_size=None):
+    bot = WeatherSlackBot(token)
+    return await bot.send_weather_reports(channel, analyses, bundle_size)
@@ -1,46 +1,27 @@
 #!/usr/bin/env python3
-import json
-from datetime import datetime
-from slack_bot import send_to_slack_formatted
+from forecast_provider import provider_from_env
+from http_pool import HttpSessionPool
+from weather_analysis import analyze_forecasts
 import asyncio
 
 class StandaloneWeatherApp:
-    def get_sample_weather(self, location):
-        return {
-            "location": location,
-            "timestamp": datetime.now().isoformat(),
-            "forecasts": [
-                {"datetime": "2024-01-01 12:00", "temp": 18.5, "humidity": 65, "description": "맑음"},
-                {"datetime": "2024-01-01 15:00", "temp": 20.2, "humidity": 60, "description": "구름조금"},
-                {"datetime": "2024-01-01 18:00", "temp": 16.8, "humidity": 70, "description": "흐림"}
-            ]
-        }
+    def __init__(self):
+        self.http = HttpSessionPool()
+        # 기본은 synthetic 백엔드 (WEATHER_PROVIDER_STANDALONE=owm|replay로 실제/기록 데이터)
+        self.forecast = provider_from_env(self.http, "standalone", default="synthetic")
+    
+    async def get_weather(self, location, days=1):
+        series = await self.forecast.load(location, days)
+        return series.to_dict()
     
     def analyze_weather(self, weather_data):
-        forecasts = weather_data.get("forecasts", [])
-        if forecasts:
-            temps = [f["temp"] for f in forecasts]
-            humidity = [f["humidity"] for f in forecasts]
-            
-            return {
-                "location": weather_data.get("location"),
-                "temperature": {
-                    "avg": round(sum(temps) / len(temps), 1),
-                    "min": min(temps),
-                    "max": max(temps)
-                },
-                "humidity": {
-                    "avg": round(sum(humidity) / len(humidity), 1)
-                },
-                "summary": f"{weather_data.get('location')} 지역 평균 기온 {round(sum(temps)/len(temps), 1)}°C"
-            }
-        return {"error": "분석할 데이터가 없습니다"}
+        return analyze_forecasts(weather_data)
     
     async def run_analysis(self, location):
         print(f"🌤️ {location} 날씨 분석 시작...")
         
-        # 1. 샘플 데이터 생성
-        weather_data = self.get_sample_weather(location)
+        # 1. 예보 데이터 수집
+        weather_data = await self.get_weather(location)
         print("✅ 날씨 데이터 수집 완료")
         
         # 2. 데이터 분석
@@ -54,7 +35,10 @@ class StandaloneWeatherApp:
 
 async def main():
     app = StandaloneWeatherApp()
-    result = await app.run_analysis("서울")
+    try:
+        result = await app.run_analysis("서울")
+    finally:
+        await app.http.close()
     
     print("🎉 분석 완료!")
     print(f"📊 결과: {result['analysis_data']['summary']}")
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+import asyncio
+import json
+import time
+from datetime import datetime
+from unittest.mock import patch
+
+import qchat_weather_server
+from answer_cache import AnswerCache
+from forecast_cache import ForecastCache
+from forecast_provider import FixtureFetcher, ForecastProvider
+from mock_services import sample_forecast_list
+
+
+def test_entries_invalidate_when_version_changes():
+    cache = AnswerCache(max_size=2)
+    cache.put(("rain", 1, "서울"), "v1", "우산을 챙기세요", cost=0.002)
+    assert cache.get(("rain", 1, "서울"), "v1") == "우산을 챙기세요"
+    assert cache.get(("rain", 1, "서울"), "v2") is None
+    assert cache.get(("rain", 1, "서울"), "v1") is None
+
+    cache.put(("wind", 0, "서울"), "v1", "a")
+    cache.put(("wind", 0, "부산"), "v1", "b")
+    cache.put(("wind", 0, "대구"), "v1", "c")
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["invalidations"], stats["evictions"]) == (1, 2, 1, 1)
+    assert stats["latency_saved_ms"] == 2.0 and stats["hit_rate"] == 0.333
+
+
+def test_quick_questions_hit_until_forecast_refreshes():
+    start = datetime.fromtimestamp(time.time() // 10800 * 10800)
+    fetcher = FixtureFetcher({"*": sample_forecast_list("서울", 40, start)})
+    provider = ForecastProvider(fetcher, ForecastCache(ttl=600, max_size=16, serve_stale=False))
+
+    def ask(question):
+        result = asyncio.run(qchat_weather_server.call_tool("analyze_weather_query", {"query": question, "location": "서울"}))
+        return json.loads(result[0].text)
+
+    # 테스트가 끝나면 서버의 예보 제공자와 답변 캐시를 원래대로 되돌린다
+    with patch.multiple(qchat_weather_server, forecast=provider, answers=AnswerCache()):
+        quick = ["오늘 날씨 어때?", "내일 비 와?", "우산 필요해?"]
+        first = [ask(q) for q in quick]
+        second = [ask(q) for q in quick]
+        assert [r["cached"] for r in first] == [False, False, False]
+        assert [r["cached"] for r in second] == [True, True, True]
+        assert [r["answer"] for r in first] == [r["answer"] for r in second]
+        # 같은 의도·날짜·지역이면 표현이 달라도 같은 답변
+        assert ask("서울 내일 비 오나요")["cached"]
+
+        # 예보가 새로 들어오면 다음 질문은 다시 계산
+        asyncio.run(provider.refresh("서울", qchat_weather_server.FORECAST_DAYS))
+        assert not ask("내일 비 와?")["cached"]
+        assert ask("내일 비 와?")["cached"]
+
+        stats = json.loads(asyncio.run(qchat_weather_server.call_tool("get_answer_cache_stats", {}))[0].text)
+        assert (stats["hits"], stats["misses"], stats["invalidations"]) == (5, 4, 1)
+        assert stats["latency_saved_ms"] > 0
+        assert stats["forecast"]["fetcher"] == "FixtureFetcher"
+        assert fetcher.calls == 2
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name}")
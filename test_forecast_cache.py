@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+import asyncio
+
+from forecast_cache import ForecastCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_fetch(calls):
+    async def fetch(days):
+        calls.append(days)
+        return {
+            "location": "서울",
+            "forecasts": [{"temp": i} for i in range(days * 8)]
+        }
+    return fetch
+
+
+def test_hit_miss_and_ttl():
+    clock = FakeClock()
+    cache = ForecastCache(ttl=60, max_size=8, serve_stale=False, clock=clock)
+    calls = []
+
+    async def run():
+        await cache.get("서울", 2, make_fetch(calls))
+        await cache.get(" 서울 ", 2, make_fetch(calls))
+        clock.now = 61
+        await cache.get("서울", 2, make_fetch(calls))
+
+    asyncio.run(run())
+    assert calls == [2, 2]
+    assert cache.hits == 1 and cache.misses == 2
+
+
+def test_larger_days_entry_answers_smaller_request():
+    cache = ForecastCache(ttl=60, max_size=8, serve_stale=False, clock=FakeClock())
+    calls = []
+
+    async def run():
+        await cache.get("부산", 3, make_fetch(calls))
+        return await cache.get("부산", 1, make_fetch(calls))
+
+    result = asyncio.run(run())
+    assert calls == [3]
+    assert len(result["forecasts"]) == 8
+
+
+def test_lru_eviction():
+    cache = ForecastCache(ttl=60, max_size=2, serve_stale=False, clock=FakeClock())
+    calls = []
+
+    async def run():
+        for location in ["서울", "부산", "서울", "대구", "부산"]:
+            await cache.get(location, 1, make_fetch(calls))
+
+    asyncio.run(run())
+    # 서울은 최근에 사용되어 남고 부산이 먼저 제거된다
+    assert cache.evictions == 2
+    assert len(calls) == 4
+
+
+def test_stale_entry_served_with_single_background_refresh():
+    clock = FakeClock()
+    cache = ForecastCache(ttl=60, max_size=8, serve_stale=True, clock=clock)
+    calls = []
+
+    async def run():
+        await cache.get("대구", 1, make_fetch(calls))
+        clock.now = 120
+        results = await asyncio.gather(*(cache.get("대구", 1, make_fetch(calls)) for _ in range(5)))
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        return results
+
+    results = asyncio.run(run())
+    assert all(len(r["forecasts"]) == 8 for r in results)
+    assert cache.stale_hits == 5
+    assert calls == [1, 1]
+    assert cache.refreshes == 1
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+import asyncio
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+import qchat_weather_server
+from forecast_cache import ForecastCache
+from forecast_provider import (FixtureFetcher, ForecastProvider, OpenWeatherFetcher, RecordingFetcher, SyntheticFetcher,
+                               fetcher_from_env)
+from forecast_series import ForecastSeries, load_series
+from forecast_store import ForecastStore
+from mock_services import sample_forecast_list
+
+
+def fixture_items(location="부산", count=40):
+    # 지금 직전 3시간 경계부터 시작하는 OpenWeatherMap 형식 예보
+    start = datetime.fromtimestamp(time.time() // 10800 * 10800)
+    return sample_forecast_list(location, count, start)
+
+
+@contextmanager
+def use_fixture(source):
+    # 테스트가 끝나면 서버의 예보 제공자를 원래대로 되돌린다
+    fetcher = FixtureFetcher(source)
+    with patch.object(qchat_weather_server, "forecast", ForecastProvider(fetcher, ForecastCache(ttl=600, max_size=16, serve_stale=False))):
+        yield fetcher
+
+
+def ask(tool, **arguments):
+    return json.loads(asyncio.run(qchat_weather_server.call_tool(tool, arguments))[0].text)
+
+
+def test_series_carries_rain_probability():
+    series = ForecastSeries.from_owm("서울", sample_forecast_list("서울", 16))
+    assert series.pop.tolist() == [item["pop"] for item in sample_forecast_list("서울", 16)]
+    assert load_series(json.loads(series.dumps_columnar())).pop == series.pop
+    assert series.head(8).pop == series.pop[:8]
+    # pop 열이 없는 이전 열 형식도 읽는다
+    payload = series.to_columnar()
+    del payload["columns"]["pop"]
+    assert ForecastSeries.from_columnar(payload).pop.tolist() == [0.0] * 16
+
+
+def test_fixture_file_and_warm_cache_skip_fetch():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "forecast.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"부산": {"list": fixture_items()}}, f, ensure_ascii=False)
+        with use_fixture(path) as fetcher:
+            answers = [ask("analyze_weather_query", query=q, location="부산")
+                       for q in ["날씨 어때?", "내일 비 와?", "바람 세?", "모레 온도는?"]]
+            assert all("error" not in a for a in answers)
+            # 한 지역의 예보 한 번으로 모든 질문에 답한다
+            assert fetcher.calls == 1
+            assert qchat_weather_server.forecast.stats()["hits"] == 3
+
+            missing = ask("analyze_weather_query", query="제주 날씨 어때?")
+            assert "404" in missing["error"]
+
+
+def test_answers_are_computed_from_forecast_data():
+    items = fixture_items()
+    with use_fixture({"*": {"list": items}}):
+        now = ask("analyze_weather_query", query="부산 온도 알려줘")
+        current = now["weather_data"]["current"]
+        assert current["temp"] == round(items[0]["main"]["temp"], 1)
+        assert f"{current['temp']}°C" in now["answer"]
+
+        rain = ask("analyze_weather_query", query="부산 내일 비 와?")
+        tomorrow = next(d for d in rain["weather_data"]["forecast"] if d["time"] == "내일")
+        kst_date = lambda ts: datetime.fromtimestamp(ts + 9 * 3600, timezone.utc).strftime("%Y-%m-%d")
+        assert tomorrow["pop"] == max(round(item["pop"] * 100) for item in items if kst_date(item["dt"]) == tomorrow["date"])
+        assert f"{tomorrow['pop']}%" in rain["answer"]
+
+        wind = ask("get_weather_answer", question="바람 많이 불어?", location="부산")
+        assert wind["intent"] == "wind" and f"{current['wind_speed']}m/s" in wind["answer"]
+
+        far = ask("analyze_weather_query", query="글피 날씨", location="부산")
+        assert "글피" in far["answer"]
+
+
+def test_fresh_fetches_are_appended_to_store_once():
+    fetcher = FixtureFetcher({"*": {"list": fixture_items()}})
+    store = ForecastStore(":memory:")
+    provider = ForecastProvider(fetcher, ForecastCache(ttl=600, max_size=16, serve_stale=False), store=store)
+
+    async def run():
+        await asyncio.gather(*(provider.load("부산", 2) for _ in range(5)))
+        await provider.refresh("부산", 2)
+        # 기록은 뒤에서 진행되므로 남은 기록을 마칠 때까지 기다린다
+        await provider.drain()
+
+    try:
+        asyncio.run(run())
+        # 병합된 요청은 한 번만 기록하고, 값이 같은 새 수집은 건너뛴다
+        assert fetcher.calls == 2
+        assert (store.rows_written, store.rows_skipped) == (16, 16)
+    finally:
+        store.close()
+
+
+def test_slow_or_failing_store_does_not_hold_up_fetch():
+    class BrokenStore:
+        async def append_async(self, series, units):
+            await asyncio.sleep(0.2)
+            raise OSError("disk full")
+
+        def close(self):
+            pass
+
+    provider = ForecastProvider(FixtureFetcher({"*": {"list": fixture_items()}}), store=BrokenStore())
+
+    async def run():
+        started = time.perf_counter()
+        series = await provider.load("부산", 2)
+        elapsed = time.perf_counter() - started
+        pending = len(provider._writes)
+        await provider.close()
+        return series, elapsed, pending, len(provider._writes)
+
+    series, elapsed, pending, left = asyncio.run(run())
+    assert len(series) == 16 and elapsed < 0.2
+    assert (pending, left) == (1, 0)
+
+
+def test_backend_selected_per_server():
+    keys = ("WEATHER_PROVIDER", "WEATHER_PROVIDER_QCHAT", "FORECAST_FIXTURE", "FORECAST_RECORD")
+    saved = {key: os.environ.pop(key, None) for key in keys}
+    try:
+        assert isinstance(fetcher_from_env(None, "weather"), OpenWeatherFetcher)
+        assert isinstance(fetcher_from_env(None, "simple", default="synthetic"), SyntheticFetcher)
+        os.environ["FORECAST_RECORD"] = "recorded.json"
+        assert isinstance(fetcher_from_env(None, "weather"), RecordingFetcher)
+        # 전체 설정보다 서버별 설정이 우선
+        os.environ["WEATHER_PROVIDER"] = "synthetic"
+        os.environ["WEATHER_PROVIDER_QCHAT"] = "owm"
+        assert isinstance(fetcher_from_env(None, "weather"), SyntheticFetcher)
+        assert isinstance(fetcher_from_env(None, "qchat"), RecordingFetcher)
+        os.environ["WEATHER_PROVIDER"] = "replay"
+        try:
+            fetcher_from_env(None, "weather")
+            raise AssertionError("FORECAST_FIXTURE 없이 replay를 고르면 ValueError")
+        except ValueError:
+            pass
+        os.environ["WEATHER_PROVIDER"] = "naver"
+        try:
+            fetcher_from_env(None, "weather")
+            raise AssertionError("알 수 없는 백엔드는 ValueError")
+        except ValueError:
+            pass
+    finally:
+        for key, value in saved.items():
+            os.environ.pop(key, None)
+            if value is not None:
+                os.environ[key] = value
+
+
+def test_recorded_responses_replay_identically():
+    source = SyntheticFetcher(datetime(2024, 1, 1))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "recorded.json")
+        recorder = RecordingFetcher(source, path)
+
+        async def record():
+            return [await recorder("서울", 3), await recorder("부산 ", 1), await recorder("서울", 1)]
+
+        seoul, busan, _ = asyncio.run(record())
+        replay = FixtureFetcher(path)
+
+    async def play():
+        return await replay("서울", 3), await replay("서울", 1), await replay("부산", 1)
+
+    seoul_again, seoul_short, busan_again = asyncio.run(play())
+    # 짧은 요청이 더 긴 기록을 덮어쓰지 않고, 재생하면 앞부분을 잘라 쓴다
+    assert seoul_again.to_owm() == seoul.to_owm()
+    assert seoul_short.to_owm() == seoul.head(8).to_owm()
+    assert busan_again.to_owm() == busan.to_owm()
+    assert source.calls == 3 and replay.calls == 3
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+import json
+
+from forecast_cache import ForecastCache
+from forecast_series import ForecastSeries, load_series
+from mock_services import sample_forecast_list
+from weather_analysis import analyze_forecasts
+
+
+def make_series(count=24):
+    return ForecastSeries.from_owm("서울", sample_forecast_list("서울", count), "2024-01-01T00:00:00")
+
+
+def test_dict_round_trip_matches_legacy_shape():
+    series = make_series()
+    weather_data = series.to_dict()
+    assert weather_data["forecasts"][0] == {
+        "datetime": "2024-01-01 00:00:00",
+        "temp": series.temp[0],
+        "humidity": series.humidity[0],
+        "description": series.descriptions[series.code[0]],
+        "wind_speed": series.wind_speed[0]
+    }
+    assert ForecastSeries.from_dict(weather_data).to_dict() == weather_data
+
+
+def test_columnar_wire_format_is_compact_and_lossless():
+    series = make_series(40)
+    compact = series.dumps_columnar()
+    legacy = json.dumps(series.to_dict(), ensure_ascii=False, indent=2)
+    assert len(compact) < len(legacy) / 3
+    restored = load_series(json.loads(compact))
+    assert restored.to_dict() == series.to_dict()
+    # 설명 문자열은 코드 표에 한 번씩만 저장
+    assert len(restored.descriptions) == len(set(restored.descriptions))
+
+
+def test_analysis_is_identical_for_dict_and_series():
+    series = make_series()
+    from_series = analyze_forecasts(series)
+    from_dict = analyze_forecasts(series.to_dict())
+    from_series.pop("analysis_time")
+    from_dict.pop("analysis_time")
+    assert from_series == from_dict
+
+
+def test_cache_slices_series_without_copying_descriptions():
+    cache = ForecastCache(ttl=60, max_size=4, serve_stale=False)
+    series = make_series(24)
+    cache.put("서울", 3, series)
+    entry, fresh = cache.lookup("서울", 1)
+    sliced = cache._slice(entry.value, 1)
+    assert fresh and len(sliced) == 8
+    assert sliced.descriptions is series.descriptions
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+import asyncio
+import json
+from unittest.mock import patch
+
+import weather_mcp_server
+from forecast_cache import ForecastCache
+from forecast_provider import ForecastProvider, OpenWeatherFetcher
+from forecast_series import ForecastSeries
+from forecast_store import ForecastStore
+from mock_services import create_openweather_app, sample_forecast_list, start_mock_server
+
+
+def make_series(location="서울", count=16):
+    return ForecastSeries.from_owm(location, sample_forecast_list(location, count))
+
+
+def test_append_skips_unchanged_points_and_keeps_vintages():
+    store = ForecastStore(":memory:")
+    series = make_series()
+    assert store.append(series, fetched_at=1000) == 16
+    assert store.append(series, fetched_at=2000) == 0
+
+    # 첫 예보 시점만 값이 바뀐 새 수집
+    changed = make_series()
+    changed.temp[0] = 99.0
+    assert store.append(changed, fetched_at=3000) == 1
+
+    latest = store.series(" 서울 ", "2024-01-01", "2024-01-01 00:00:00")
+    assert list(latest.temp) == [99.0]
+    as_of = store.series("서울", "2024-01-01", "2024-01-01 00:00:00", as_of=2500)
+    assert list(as_of.temp) == [series.temp[0]]
+    assert len(store.series("서울")) == 16
+    assert store.stats()["rows"] == 17
+
+
+def test_append_async_writes_on_store_thread_and_reads_see_it():
+    store = ForecastStore(":memory:")
+    series = make_series()
+
+    async def run():
+        written = await asyncio.gather(
+            store.append_async(series, fetched_at=1000),
+            store.append_async(series, fetched_at=2000)
+        )
+        return written, len(store.series("서울"))
+
+    try:
+        written, count = asyncio.run(run())
+        # 기록 스레드가 순서대로 처리하므로 두 번째 수집은 바뀐 값이 없다
+        assert written == [16, 0] and count == 16
+        assert store.stats()["rows"] == 16
+    finally:
+        store.close()
+    # 다른 저장소의 메모리 DB와 섞이지 않는다
+    assert ForecastStore(":memory:").stats()["rows"] == 0
+
+
+def test_downsample_aggregates_by_bucket():
+    store = ForecastStore(":memory:")
+    series = make_series(count=16)
+    store.append(series, fetched_at=1000)
+    points = store.downsample("서울", "1d")
+    assert [p["time"] for p in points] == ["2024-01-01 00:00:00", "2024-01-02 00:00:00"]
+    assert [p["samples"] for p in points] == [8, 8]
+    assert points[0]["temp_max"] == max(series.temp[:8])
+    assert points[1]["temp_avg"] == round(sum(series.temp[8:]) / 8, 1)
+    assert len(store.downsample("서울", "6h", start="2024-01-02")) == 4
+
+
+def test_history_tool_reads_fetched_forecasts_without_network():
+    mock_app = create_openweather_app()
+
+    async def run():
+        runner, base_url = await start_mock_server(mock_app)
+        # 테스트가 끝나면 서버의 예보 제공자를 원래대로 되돌린다
+        with patch.object(weather_mcp_server, "forecast", ForecastProvider(
+            OpenWeatherFetcher(weather_mcp_server.http, f"{base_url}/data/2.5/forecast"),
+            ForecastCache(ttl=600, max_size=64, serve_stale=False),
+            store=ForecastStore(":memory:")
+        )):
+            try:
+                await weather_mcp_server.get_weather_data({"location": "부산", "days": 2})
+                await weather_mcp_server.forecast.drain()
+            finally:
+                await weather_mcp_server.http.close()
+                await runner.cleanup()
+
+            # 대역 서버를 내린 뒤에도 이력 조회와 분석이 된다
+            daily = json.loads((await weather_mcp_server.query_weather_history({"location": "부산"}))[0].text)
+            raw = json.loads((await weather_mcp_server.query_weather_history({
+                "location": "부산", "bucket": "raw", "start": "2024-01-02"
+            }))[0].text)
+            analysis = json.loads((await weather_mcp_server.analyze_weather_trend({
+                "dataset_handle": raw["dataset_handle"]
+            }))[0].text)
+            return daily, raw, analysis
+
+    daily, raw, analysis = asyncio.run(run())
+    assert [p["samples"] for p in daily["points"]] == [8, 8]
+    assert raw["format"] == "columnar" and len(raw["columns"]["dt"]) == 8
+    assert analysis["location"] == "부산" and analysis["daily"][0]["date"] == "2024-01-02"
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name}")
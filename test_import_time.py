@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+import os
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# 진입점별 (프레임워크 모듈, 시작할 때 가져오면 안 되는 무거운 모듈)
+ENTRY_POINTS = {
+    "simple_weather_server": ("mcp", ["aiohttp", "numpy"]),
+    "qchat_weather_server": ("mcp", ["aiohttp", "numpy"]),
+    "weather_mcp_server": ("mcp", ["aiohttp", "numpy", "slack_sdk"]),
+    "notion_weather_server": ("mcp", ["aiohttp", "numpy"]),
+    "web_dashboard": ("streamlit", ["pandas", "plotly.express", "numpy", "mcp"])
+}
+# 프레임워크(mcp / streamlit)를 뺀 자체 import 시간 상한 - 프레임워크 import 시간 대비 비율
+# 기계 속도와 무관하게 비교하기 위해 비율로 둔다 (IMPORT_TIME_BUDGET으로 조정)
+BUDGET = float(os.getenv("IMPORT_TIME_BUDGET") or 0.4)
+
+
+def import_profile(module):
+    """python -X importtime 결과를 {모듈: 누적 μs}로 (처음 가져온 시점 기준)"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=HERE, capture_output=True, text=True, check=True
+    )
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, total, name = line.split(":", 1)[1].split("|")
+        cumulative.setdefault(name.strip(), int(total))
+    return cumulative
+
+
+def test_entry_points_defer_heavy_imports():
+    for module, (_, heavy) in ENTRY_POINTS.items():
+        loaded = import_profile(module)
+        assert module in loaded
+        eager = [name for name in heavy if name in loaded]
+        assert not eager, f"{module} 시작 시 {eager}를 가져옴 - 쓰는 함수 안에서 import"
+
+
+def test_startup_stays_within_budget():
+    for module, (framework, _) in ENTRY_POINTS.items():
+        # 잡음을 줄이기 위해 두 번 재서 작은 쪽
+        own, base = min(
+            (profile[module] - profile[framework], profile[framework])
+            for profile in (import_profile(module) for _ in range(2))
+        )
+        assert own <= base * BUDGET, f"{module}: 자체 import {own / 1000:.0f}ms > {framework} {base / 1000:.0f}ms × {BUDGET}"
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+import asyncio
+import json
+import os
+import sys
+
+from mcp import StdioServerParameters
+from mcp_pool import MCPClientPool
+
+SERVER_PARAMS = StdioServerParameters(
+    command=sys.executable,
+    args=["simple_weather_server.py"],
+    cwd=os.path.dirname(os.path.abspath(__file__))
+)
+
+
+def test_concurrent_calls_share_warm_sessions_and_survive_crash():
+    pool = MCPClientPool(SERVER_PARAMS, size=2)
+
+    async def run():
+        try:
+            results = await asyncio.gather(*(
+                pool.call_tool("get_sample_weather", {"location": f"지역{i}"}) for i in range(10)
+            ))
+            assert [json.loads(r.content[0].text)["location"] for r in results] == [f"지역{i}" for i in range(10)]
+            assert pool.stats()["alive"] == 2
+
+            # 서버 프로세스가 죽어도 다음 호출은 재시작된 프로세스로 처리
+            async with pool.session() as session:
+                await session.call_tool("get_sample_weather", {"location": "서울"})
+            for slot in list(pool._slots):
+                slot.session._write_stream.close()
+            result = await pool.call_tool("get_sample_weather", {"location": "부산"})
+            assert json.loads(result.content[0].text)["location"] == "부산"
+            assert pool.restarts >= 1
+        finally:
+            await pool.close()
+
+    asyncio.run(run())
+
+
+def test_one_process_multiplexes_concurrent_calls():
+    # 브라우저 세션이 많아도 프로세스 하나에 여러 요청을 동시에 보낸다
+    pool = MCPClientPool(SERVER_PARAMS, size=1, session_concurrency=4)
+
+    async def run():
+        try:
+            results = await asyncio.gather(*(
+                pool.call_tool("get_sample_weather", {"location": f"지역{i}"}) for i in range(12)
+            ))
+            return [json.loads(r.content[0].text)["location"] for r in results], pool.stats()
+        finally:
+            await pool.close()
+
+    locations, stats = asyncio.run(run())
+    assert locations == [f"지역{i}" for i in range(12)]
+    assert stats["alive"] == 1 and stats["restarts"] == 0
+    assert 1 < stats["max_in_flight"] <= 4
+    assert stats["in_flight"] == 0 and stats["idle"] == 4
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name}")
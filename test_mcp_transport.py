@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from bench_transport import free_port, server_env, wait_healthy
+from mcp_pool import MCPClientPool
+from mock_services import sample_forecast_list
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_http_server_shares_state_between_clients():
+    port = free_port()
+    with tempfile.TemporaryDirectory() as tmp:
+        fixture = os.path.join(tmp, "forecast.json")
+        with open(fixture, "w", encoding="utf-8") as f:
+            json.dump({"*": sample_forecast_list("서울", 40)}, f)
+        server = subprocess.Popen(
+            [sys.executable, "qchat_weather_server.py", "--transport", "http", "--port", str(port), "--max-concurrency", "2"],
+            cwd=HERE, env=server_env(fixture), stdout=subprocess.DEVNULL
+        )
+
+        async def run():
+            await wait_healthy(f"http://127.0.0.1:{port}/health")
+            url = f"http://127.0.0.1:{port}/mcp"
+            # 서로 다른 클라이언트(대시보드, 챗봇 등)가 같은 서버 프로세스에 연결
+            first, second = MCPClientPool(url, size=1), MCPClientPool(url, size=2, session_concurrency=4)
+            try:
+                a = await first.call_tool("analyze_weather_query", {"query": "내일 비 와?", "location": "부산"})
+                answers = await asyncio.gather(*(
+                    second.call_tool("analyze_weather_query", {"query": "부산 내일 비 오나요"}) for _ in range(8)
+                ))
+                stats = await second.call_tool("get_answer_cache_stats", {})
+                return (json.loads(a.content[0].text), [json.loads(r.content[0].text) for r in answers],
+                        json.loads(stats.content[0].text), await wait_healthy(f"http://127.0.0.1:{port}/health"))
+            finally:
+                await first.close()
+                await second.close()
+
+        try:
+            first, others, stats, health = asyncio.run(run())
+        finally:
+            server.terminate()
+            server.wait()
+
+    assert not first["cached"]
+    # 다른 클라이언트의 질문도 같은 답변 캐시·예보 캐시에서 응답
+    assert all(r["cached"] and r["answer"] == first["answer"] for r in others)
+    assert stats["forecast"]["misses"] == 1
+    assert health["transport"] == "http" and health["max_in_flight"] <= 2
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+import asyncio
+import json
+from unittest.mock import patch
+
+import weather_mcp_server
+from forecast_cache import ForecastCache
+from forecast_provider import ForecastProvider, OpenWeatherFetcher
+from forecast_store import ForecastStore
+from metrics import NULL_TIMER, Metrics, metrics
+from mock_services import create_openweather_app, start_mock_server
+
+
+def test_registry_records_and_renders_prometheus_text():
+    registry = Metrics(enabled=True)
+    for ms in (0.5, 3, 3, 40, 20000):
+        registry.observe("tool_latency_ms", ms, tool="get_weather_data")
+    registry.inc("upstream_responses", host="api.example.com", status=200)
+    registry.inc("upstream_responses", host="api.example.com", status=200)
+    registry.add_gauge("tool_in_flight", 1, tool="get_weather_data")
+
+    snapshot = registry.snapshot()
+    histogram = snapshot["histograms"]['tool_latency_ms{tool="get_weather_data"}']
+    assert histogram["count"] == 5 and histogram["p50_ms"] == 5 and histogram["max_ms"] == 20000
+    assert histogram["buckets"] == {"1": 1, "5": 2, "50": 1, "+Inf": 1}
+    assert snapshot["counters"]['upstream_responses{host="api.example.com",status="200"}'] == 2
+
+    text = registry.prometheus()
+    assert 'mcp_upstream_responses_total{host="api.example.com",status="200"} 2' in text
+    assert 'mcp_tool_latency_seconds_bucket{tool="get_weather_data",le="0.005"} 3' in text
+    assert 'mcp_tool_latency_seconds_bucket{tool="get_weather_data",le="+Inf"} 5' in text
+    assert 'mcp_tool_latency_seconds_count{tool="get_weather_data"} 5' in text
+
+
+def test_disabled_registry_does_not_wrap_or_record():
+    registry = Metrics(enabled=False)
+
+    async def call_tool(name, arguments):
+        return []
+
+    assert registry.instrument(call_tool) is call_tool
+    assert registry.timer("phase_latency_ms", phase="parse") is NULL_TIMER
+    assert registry.trace_configs() == []
+    registry.inc("tool_calls", tool="x")
+    assert registry.snapshot()["counters"] == {} and registry.prometheus() == "\n"
+
+
+def test_weather_server_stats_break_down_tool_and_phases():
+    mock_app = create_openweather_app()
+    metrics.reset()
+
+    async def run():
+        runner, base_url = await start_mock_server(mock_app)
+        # 테스트가 끝나면 서버의 예보 제공자를 원래대로 되돌린다
+        with patch.object(weather_mcp_server, "forecast", ForecastProvider(
+            OpenWeatherFetcher(weather_mcp_server.http, f"{base_url}/data/2.5/forecast"),
+            ForecastCache(ttl=600, max_size=64, serve_stale=False),
+            store=ForecastStore(":memory:")
+        )):
+            try:
+                await weather_mcp_server.call_tool("get_weather_data", {"location": "서울", "days": 2})
+                await weather_mcp_server.call_tool("get_weather_data", {"location": "서울", "days": 2})
+                await weather_mcp_server.call_tool("analyze_weather_trend", {})
+                stats = await weather_mcp_server.call_tool("get_server_stats", {})
+                text = await weather_mcp_server.call_tool("get_server_stats", {"format": "prometheus"})
+                return json.loads(stats[0].text), text[0].text
+            finally:
+                await weather_mcp_server.http.close()
+                await runner.cleanup()
+
+    stats, text = asyncio.run(run())
+    counters, histograms = stats["counters"], stats["histograms"]
+    assert counters['tool_calls{status="ok",tool="get_weather_data"}'] == 2
+    assert counters['tool_calls{status="error",tool="analyze_weather_trend"}'] == 1
+    assert counters['upstream_responses{host="127.0.0.1",status="200"}'] == 1
+    assert histograms['tool_latency_ms{tool="get_weather_data"}']["count"] == 2
+    # 두 번째 요청은 캐시에서 - 외부 API/파싱 단계는 한 번만
+    assert histograms['phase_latency_ms{phase="upstream"}']["count"] == 1
+    assert histograms['phase_latency_ms{phase="parse"}']["count"] == 1
+    assert histograms['phase_latency_ms{phase="serialize"}']["count"] == 2
+    assert stats["gauges"]['tool_in_flight{tool="get_server_stats"}'] == 1
+    assert "# TYPE mcp_phase_latency_seconds histogram" in text
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name}")
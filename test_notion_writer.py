@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+import asyncio
+import json
+import os
+import tempfile
+from unittest.mock import patch
+
+import notion_weather_server
+import notion_writer
+from forecast_provider import FixtureFetcher, ForecastProvider
+from mock_services import PAGES, STATS, create_notion_app, sample_forecast_list, start_mock_server
+from notion_index import NotionPageIndex
+from notion_writer import NotionWriter
+
+
+def make_items(count, analysis_time="2024-01-01T09:00:00"):
+    return [
+        {
+            "location": f"지역{i}",
+            "weather_data": {
+                "location": f"지역{i}",
+                "analysis_time": analysis_time,
+                "temperature": {"avg": 10 + i},
+                "humidity": {"avg": 50},
+                "summary": f"지역{i} 요약"
+            }
+        }
+        for i in range(count)
+    ]
+
+
+async def with_notion(body, **app_options):
+    app = create_notion_app(**app_options)
+    runner, base_url = await start_mock_server(app)
+    pool = notion_writer.HttpSessionPool()
+    try:
+        return await body(app, lambda **kw: NotionWriter("secret_test", pool, base_url=base_url, **kw))
+    finally:
+        await pool.close()
+        await runner.cleanup()
+
+
+def test_batch_respects_rate_limit_and_retry_after():
+    async def body(app, make):
+        # 서버 한도보다 빠른 버킷으로 429를 유도
+        writer = make(rate=100, concurrency=4, max_retries=10)
+        return await writer.run_batch("db1", make_items(15)), writer.stats(), app[STATS]
+
+    results, stats, server = asyncio.run(with_notion(body, rate_limit=5, retry_after=0.2))
+    assert [r["status"] for r in results] == ["created"] * 15
+    assert [r["location"] for r in results] == [f"지역{i}" for i in range(15)]
+    assert server["created"] == 15
+    assert stats["rate_limited"] == server["rate_limited"] > 0
+
+
+def test_lost_responses_do_not_create_duplicate_pages():
+    async def body(app, make):
+        writer = make(rate=100, concurrency=2)
+        return await writer.run_batch("db1", make_items(6)), app[PAGES]
+
+    # 멱등키 열이 있는 데이터베이스로 설정
+    with patch.object(notion_writer, "NOTION_IDEMPOTENCY_PROPERTY", "멱등키"):
+        results, pages = asyncio.run(with_notion(body, lose_responses=2))
+    statuses = [r["status"] for r in results]
+    assert statuses.count("exists") == 2 and statuses.count("created") == 4
+    keys = [p["properties"]["멱등키"]["rich_text"][0]["text"]["content"] for p in pages.values()]
+    assert len(keys) == len(set(keys)) == 6
+
+
+def test_repeated_and_dry_run_batches_skip_writes():
+    async def body(app, make):
+        writer = make(rate=100)
+        items = make_items(3)
+        first = await writer.run_batch("db1", items + items[:1])
+        again = await writer.run_batch("db1", items)
+        calls = app[STATS]["calls"]
+        dry = await writer.run_batch("db1", make_items(3, "2024-01-02T09:00:00"), dry_run=True)
+        return first, again, dry, calls, app[STATS]["calls"]
+
+    first, again, dry, calls_before, calls_after = asyncio.run(with_notion(body))
+    assert [r["status"] for r in first] == ["created"] * 3 + ["duplicate"]
+    assert [r["status"] for r in again] == ["skipped"] * 3
+    assert again[0]["page_id"] == first[0]["page_id"]
+    assert [r["status"] for r in dry] == ["dry_run"] * 3
+    assert calls_before == calls_after == 3
+
+
+def test_batch_tool_reports_per_item_status():
+    mock_app = create_notion_app()
+
+    async def run():
+        runner, base_url = await start_mock_server(mock_app)
+        api_url, notion_writer.NOTION_API_URL = notion_writer.NOTION_API_URL, base_url
+        notion_writer._writers.clear()
+        os.environ["NOTION_TOKEN"] = "secret_test"
+        try:
+            items = make_items(2)
+            items.append({"location": "문자열", "weather_data": json.dumps(items[0]["weather_data"] | {"location": "문자열"})})
+            result = await notion_weather_server.create_weather_pages_batch({"database_id": "db1", "items": items})
+            return json.loads(result[0].text)
+        finally:
+            os.environ.pop("NOTION_TOKEN")
+            notion_writer.NOTION_API_URL = api_url
+            notion_writer._writers.clear()
+            await notion_weather_server.http.close()
+            await runner.cleanup()
+
+    summary = asyncio.run(run())
+    assert summary["counts"] == {"created": 3}
+    assert all(item["page_id"] for item in summary["items"])
+
+
+def test_save_tool_writes_analysis_of_loaded_forecast():
+    mock_app = create_notion_app()
+    items = sample_forecast_list("부산", 8)
+    provider = ForecastProvider(FixtureFetcher({"*": {"list": items}}))
+
+    async def run():
+        runner, base_url = await start_mock_server(mock_app)
+        os.environ["NOTION_TOKEN"] = "secret_test"
+        notion_writer._writers.clear()
+        try:
+            with patch.object(notion_writer, "NOTION_API_URL", base_url), patch.multiple(
+                notion_weather_server, forecast=provider, page_index=NotionPageIndex(":memory:")
+            ):
+                result = await notion_weather_server.get_weather_and_save({"location": "부산", "database_id": "db1"})
+            return json.loads(result[0].text)
+        finally:
+            os.environ.pop("NOTION_TOKEN")
+            notion_writer._writers.clear()
+            await notion_weather_server.http.close()
+            await runner.cleanup()
+
+    saved = asyncio.run(run())
+    assert saved["success"] and saved["status"] == "created"
+    page = mock_app[PAGES][saved["page_id"]]
+    # 고정된 더미 값이 아니라 불러온 예보로 분석한 값
+    expected = round(sum(item["main"]["temp"] for item in items) / len(items), 1)
+    assert page["properties"]["평균온도"]["number"] == expected
+    assert page["properties"]["지역"]["rich_text"][0]["text"]["content"] == "부산"
+
+
+def test_upsert_updates_one_page_per_location_and_date():
+    async def body(app, make):
+        writer = make(rate=100)
+        index = NotionPageIndex(":memory:")
+        morning, evening, tomorrow = (make_items(1, t)[0]["weather_data"] for t in (
+            "2024-01-01T09:00:00", "2024-01-01T21:00:00", "2024-01-02T09:00:00"
+        ))
+        evening["temperature"]["avg"] = 3.5
+        # 같은 날 동시에 두 번 들어와도 페이지는 하나
+        first = await asyncio.gather(
+            writer.upsert_page("db1", "지역0", morning, index),
+            writer.upsert_page("db1", "지역0", morning, index)
+        )
+        second = await writer.upsert_page("db1", "지역0", evening, index)
+        third = await writer.upsert_page("db1", "지역0", tomorrow, index)
+        # Notion에서 보관 처리된 페이지는 색인을 버리고 새로 만든다
+        app[PAGES][third["page_id"]]["archived"] = True
+        fourth = await writer.upsert_page("db1", "지역0", tomorrow, index)
+        return first, second, third, fourth, app[PAGES], app[STATS], index.count(), writer._upsert_locks
+
+    first, second, third, fourth, pages, server, indexed, locks = asyncio.run(with_notion(body))
+    assert sorted(r["status"] for r in first) == ["created", "updated"]
+    assert second["status"] == "updated" and second["page_id"] == first[0]["page_id"]
+    assert pages[second["page_id"]]["properties"]["평균온도"]["number"] == 3.5
+    # 기본 설정은 데이터베이스에 없을 수 있는 멱등키 열을 쓰지 않는다
+    assert "멱등키" not in pages[second["page_id"]]["properties"]
+    assert third["status"] == "created" and third["page_id"] != second["page_id"]
+    assert fourth["status"] == "created" and fourth["page_id"] != third["page_id"]
+    assert server["created"] == 3 and indexed == 2
+    # 끝난 upsert의 잠금은 남기지 않는다
+    assert locks == {}
+
+
+def test_reconcile_rebuilds_index_from_paginated_query():
+    async def body(app, make):
+        writer = make(rate=1000)
+        for i in range(130):
+            await writer.create_page(notion_writer.build_page_data(
+                "db1", f"지역{i % 65}", {}, f"2024-01-0{1 + i // 65}T09:00:00"
+            ))
+        # 같은 (지역, 날짜) 중복 페이지 - 나중에 수정된 쪽이 색인에 남아야 한다
+        duplicate = await writer.create_page(notion_writer.build_page_data("db1", "지역0", {}, "2024-01-01T18:00:00"))
+        index = NotionPageIndex(":memory:")
+        index.put("db1", "없는곳", "2024-01-01", "stale")
+        result = await writer.reconcile("db1", index)
+        return result, index, duplicate, app[STATS]["queries"]
+
+    result, index, duplicate, queries = asyncio.run(with_notion(body))
+    assert result == {"scanned": 131, "indexed": 130, "duplicates": 1, "skipped": 0}
+    assert queries == 2
+    assert index.get("db1", "없는곳", "2024-01-01") is None
+    assert index.get("db1", "지역0", "2024-01-01") == duplicate["page_id"]
+
+
+
+def test_get_writer_keeps_one_writer_per_token_and_pool():
+    pool = notion_writer.HttpSessionPool()
+    default = notion_writer.get_writer("secret_cache")
+    assert notion_writer.get_writer("secret_cache", notion_writer.http) is default
+    own = notion_writer.get_writer("secret_cache", pool)
+    assert own is not default and own.pool is pool
+    assert notion_writer.get_writer("secret_cache", pool) is own
+
+
+
+def test_server_stats_do_not_open_page_index():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "notion_index.db")
+        with patch.object(notion_weather_server, "page_index", NotionPageIndex(path)):
+            stats = json.loads(asyncio.run(notion_weather_server.get_server_stats({}))[0].text)
+        assert stats["indexed_pages"] is None
+        assert not os.path.exists(path)
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+import asyncio
+from unittest.mock import patch
+
+import weather_mcp_server
+from forecast_cache import ForecastCache
+from forecast_provider import ForecastProvider, SyntheticFetcher
+from prefetch import PrefetchScheduler
+from rate_limit import CallBudget
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_scheduler(budget_limit=100, fail=(), **options):
+    clock = FakeClock()
+    cache = ForecastCache(ttl=600, max_size=64, serve_stale=False, clock=clock)
+    budget = CallBudget(budget_limit, 60, clock=clock)
+    refreshed = []
+
+    async def refresh(location, days, units, lang):
+        budget.spend()
+        if location in fail:
+            raise RuntimeError("city not found")
+        refreshed.append(location)
+        cache.put(location, days, {"location": location, "forecasts": []}, units, lang)
+
+    options = dict({"top_k": 2, "refresh_at": 0.8, "jitter": 0.1, "reserve": 0.0, "seeds": []}, **options)
+    scheduler = PrefetchScheduler(cache, refresh, budget, clock=clock, **options)
+    return scheduler, cache, clock, refreshed
+
+
+def test_top_k_follows_decayed_request_frequency():
+    scheduler, _, clock, _ = make_scheduler(half_life=60)
+    for _ in range(5):
+        scheduler.record("부산")
+    clock.now += 300
+    for _ in range(2):
+        scheduler.record("서울")
+    scheduler.record("대구")
+    # 부산은 5회지만 반감기 5번이 지나 점수가 낮다
+    assert [slot.location for slot in scheduler.top()] == ["서울", "대구"]
+
+
+def test_refreshes_hot_entries_before_ttl_with_jitter():
+    scheduler, cache, clock, refreshed = make_scheduler()
+    scheduler.record("서울")
+    scheduler.record("부산")
+    asyncio.run(scheduler.tick())
+    # 캐시에 없던 지역은 바로 채운다
+    assert sorted(refreshed) == ["부산", "서울"]
+
+    leads = [slot.lead for slot in scheduler.top()]
+    assert all(0.7 <= lead <= 0.8 for lead in leads)
+    clock.now += 600 * 0.69
+    assert asyncio.run(scheduler.tick()) == 0
+    clock.now += 600 * 0.12
+    assert asyncio.run(scheduler.tick()) == 2
+    # TTL 만료 전에 갱신되어 항목이 계속 신선하다
+    assert cache.lookup("서울", 3)[1]
+
+
+def test_budget_reserve_and_failure_backoff():
+    scheduler, _, clock, refreshed = make_scheduler(budget_limit=10, reserve=0.5, top_k=10, fail=("없는곳",))
+    for i in range(8):
+        scheduler.record(f"지역{i}")
+    scheduler.budget.spend(3)
+    # 예산 10 중 5는 사용자 몫, 이미 3 사용 → 미리 갱신은 2건만
+    assert asyncio.run(scheduler.tick()) == 2
+    assert scheduler.skipped_budget == 6
+    assert scheduler.budget.used() == 5
+
+    scheduler, _, clock, refreshed = make_scheduler(fail=("없는곳",))
+    scheduler.record("없는곳")
+    asyncio.run(scheduler.tick())
+    assert scheduler.failures == 1
+    assert asyncio.run(scheduler.tick()) == 0
+    clock.now += 600
+    asyncio.run(scheduler.tick())
+    assert scheduler.failures == 2
+
+
+def test_server_lifespan_runs_one_scheduler_for_all_sessions():
+    async def run():
+        app = weather_mcp_server.app
+        async with weather_mcp_server.lifespan(app) as first:
+            async with weather_mcp_server.lifespan(app):
+                task = weather_mcp_server.prefetcher._task
+                running_inner = weather_mcp_server.prefetcher.stats()["running"]
+            running_outer = weather_mcp_server.prefetcher._task is task and not task.done()
+        return first, running_inner, running_outer, weather_mcp_server.prefetcher.stats()["running"]
+
+    # 미리 갱신은 기본으로 꺼져 있다
+    with patch.object(weather_mcp_server, "PREFETCH_ENABLED", True):
+        state, running_inner, running_outer, running_after = asyncio.run(run())
+    assert state["prefetch"] is weather_mcp_server.prefetcher
+    assert running_inner and running_outer and not running_after
+
+
+
+def test_server_scheduler_follows_swapped_provider():
+    provider = ForecastProvider(SyntheticFetcher(), ForecastCache(ttl=600, max_size=64, serve_stale=False))
+    with patch.object(weather_mcp_server, "forecast", provider):
+        assert weather_mcp_server.prefetcher.cache is provider.cache
+    assert weather_mcp_server.prefetcher.cache is weather_mcp_server.forecast.cache
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from mcp import StdioServerParameters
+
+from bench_transport import server_env
+from mcp_pool import MCPClientPool
+from mock_services import sample_forecast_list
+from prefork import PreforkError, PreforkParameters, prefork_client
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def start_zygote(tmp):
+    fixture = os.path.join(tmp, "forecast.json")
+    with open(fixture, "w", encoding="utf-8") as f:
+        json.dump({"*": sample_forecast_list("서울", 40)}, f)
+    socket_path = os.path.join(tmp, "prefork.sock")
+    env = server_env(fixture)
+    zygote = subprocess.Popen(
+        [sys.executable, "prefork.py", "serve", "--socket", socket_path, "--servers", "qchat_weather_server", "--spares", "2"],
+        cwd=HERE, env=env, stderr=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + 30
+    while not os.path.exists(socket_path):
+        assert zygote.poll() is None and time.monotonic() < deadline, "zygote가 시작되지 않음"
+        time.sleep(0.05)
+    return zygote, socket_path, env
+
+
+def test_workers_serve_independent_sessions():
+    with tempfile.TemporaryDirectory() as tmp:
+        zygote, socket_path, env = start_zygote(tmp)
+
+        async def run():
+            params = PreforkParameters("qchat_weather_server", socket_path)
+            # 대기 워커 수보다 많은 세션 - 빈자리는 zygote가 다시 채운다
+            pools = [MCPClientPool(params, size=2) for _ in range(2)]
+            relay = MCPClientPool(StdioServerParameters(
+                command=sys.executable, args=["prefork.py", "connect", "qchat_weather_server", "--socket", socket_path],
+                cwd=HERE, env=env
+            ), size=1)
+            try:
+                answers = await asyncio.gather(*(
+                    pool.call_tool("analyze_weather_query", {"query": "내일 비 와?", "location": "부산"})
+                    for pool in pools + [relay] for _ in range(3)
+                ))
+                stats = await asyncio.gather(*(pool.call_tool("get_server_stats", {}) for pool in pools))
+                return [json.loads(r.content[0].text) for r in answers], [pool.stats() for pool in pools + [relay]]
+            finally:
+                for pool in pools + [relay]:
+                    await pool.close()
+
+        try:
+            answers, stats = asyncio.run(run())
+        finally:
+            zygote.terminate()
+            zygote.wait(timeout=10)
+        assert zygote.returncode == 0
+        assert not os.path.exists(socket_path)
+
+    assert all(a["answer"] == answers[0]["answer"] for a in answers)
+    assert all(s["restarts"] == 0 and s["last_error"] is None for s in stats)
+
+
+def test_unknown_server_is_rejected():
+    with tempfile.TemporaryDirectory() as tmp:
+        zygote, socket_path, _ = start_zygote(tmp)
+
+        async def run():
+            async with prefork_client(PreforkParameters("weather_mcp_server", socket_path)):
+                pass
+
+        try:
+            asyncio.run(run())
+            raise AssertionError("PreforkError가 발생해야 함")
+        except PreforkError as e:
+            assert "weather_mcp_server" in str(e)
+        finally:
+            zygote.terminate()
+            zygote.wait(timeout=10)
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+import asyncio
+import json
+import os
+import pstats
+import tempfile
+
+import qchat_weather_server
+from profiler import ToolProfiler
+
+
+def busy_loop(seconds):
+    deadline = asyncio.get_event_loop().time() + seconds
+    total = 0
+    while asyncio.get_event_loop().time() < deadline:
+        total += 1
+    return total
+
+
+async def call_tool(name, arguments):
+    busy_loop(arguments.get("busy", 0.03))
+    await asyncio.sleep(arguments.get("sleep", 0.03))
+    return []
+
+
+def read_stacks(path):
+    with open(path, encoding="utf-8") as f:
+        return dict(line.rsplit(" ", 1) for line in f.read().splitlines())
+
+
+def test_next_calls_are_sampled_into_collapsed_stacks():
+    with tempfile.TemporaryDirectory() as tmp:
+        profiler = ToolProfiler(output_dir=tmp, interval_ms=1)
+        wrapped = profiler.instrument(call_tool)
+
+        async def run():
+            profiler.configure(calls=2, tools=["slow_tool"])
+            await wrapped("other_tool", {})
+            await asyncio.gather(*(wrapped("slow_tool", {}) for _ in range(3)))
+            await wrapped("slow_tool", {})
+
+        asyncio.run(run())
+        status = profiler.status()
+        stacks = read_stacks(status["output"])
+
+    # 동시에 3건이 들어와도 2건만 잡고 자동으로 꺼진다
+    assert not status["enabled"] and status["captured"] == 2 and status["remaining"] == 0
+    assert all(stack.startswith("slow_tool") for stack in stacks)
+    assert any("busy_loop (test_profiler.py" in stack for stack in stacks)
+    # 기다린 시간은 (await) 샘플로 남는다
+    assert int(stacks["slow_tool;(await)"]) > 0
+
+
+def test_only_slow_calls_are_kept_in_pstats():
+    with tempfile.TemporaryDirectory() as tmp:
+        profiler = ToolProfiler(output_dir=tmp)
+        wrapped = profiler.instrument(call_tool)
+
+        async def run():
+            profiler.configure(slow_ms=40, format="pstats")
+            await wrapped("tool", {"busy": 0, "sleep": 0})
+            await wrapped("tool", {"busy": 0.05, "sleep": 0})
+            return profiler.configure(enabled=False)
+
+        status = asyncio.run(run())
+        functions = {func[2] for func in pstats.Stats(status["output"]).stats}
+
+    assert status["captured"] == 1 and status["recent"][0]["elapsed_ms"] >= 40
+    assert "busy_loop" in functions
+
+
+def test_admin_tool_toggles_profiling_without_restart():
+    with tempfile.TemporaryDirectory() as tmp:
+        qchat_weather_server.profiler.output_dir = tmp
+
+        def call(name, arguments):
+            result = asyncio.run(qchat_weather_server.call_tool(name, arguments))
+            return json.loads(result[0].text)
+
+        assert not call("configure_profiler", {})["enabled"]
+        assert call("configure_profiler", {"calls": 1, "tools": ["get_answer_cache_stats"]})["enabled"]
+        call("get_answer_cache_stats", {})
+        status = call("get_server_stats", {})["profiler"]
+        assert not status["enabled"] and status["captured"] == 1
+        assert os.path.exists(status["output"])
+        assert call("configure_profiler", {"format": "svg"})["error"]
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name}")
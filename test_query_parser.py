@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+import asyncio
+import json
+from datetime import datetime
+from unittest.mock import patch
+
+from query_parser import QueryParser, parse_query, trie_pattern
+
+
+def test_extracts_intent_location_and_time_in_one_pass():
+    result = parse_query("부산 온도 알려줘", "서울")
+    assert (result["intent"], result["location"], result["location_found"]) == ("temperature", "부산", True)
+    assert (result["time_ref"], result["day_offset"]) == ("지금", 0)
+
+    result = parse_query("광주광역시는 내일모레 습도 어때")
+    assert (result["intent"], result["location"], result["time_ref"], result["day_offset"]) == ("humidity", "광주", "모레", 2)
+
+    result = parse_query("내일 제주도에 비 와?")
+    assert (result["intent"], result["location"], result["day_offset"]) == ("rain", "제주", 1)
+
+
+def test_longest_alias_and_word_boundaries():
+    # 긴 별칭이 짧은 별칭보다 우선하고, 다른 단어 속의 "비"는 무시한다
+    assert parse_query("서울특별시 날씨")["location"] == "서울"
+    assert parse_query("외출 준비해야 하는데")["intent"] == "outing"
+    assert parse_query("우산 준비할까")["intent"] == "rain"
+    # "비"로 시작하는 긴 키워드도 다른 단어 속에서는 무시 ("준비와"의 "비와")
+    assert parse_query("여행 준비와 짐 싸기")["intents"] == []
+    assert parse_query("내일 비와?")["intent"] == "rain"
+    assert parse_query("그냥 궁금해서요", "서울") == {
+        "intent": "general", "intents": [], "location": "서울", "location_found": False,
+        "time_ref": "지금", "day_offset": 0
+    }
+
+    parser = QueryParser(intents={"wind": ["바람"]}, regions={"서울": ["서울", "서울시"]}, time_refs={})
+    assert parser.pattern.pattern == trie_pattern(["바람", "서울", "서울시"])
+    assert parser.parse("서울시 바람")["intents"] == ["wind"]
+
+
+def test_qchat_routes_by_parsed_location_and_day():
+    import qchat_weather_server
+    from forecast_provider import FixtureFetcher, ForecastProvider
+    from mock_services import sample_forecast_list
+
+    provider = ForecastProvider(FixtureFetcher({"*": sample_forecast_list("부산", 40, datetime.now())}))
+    with patch.object(qchat_weather_server, "forecast", provider):
+        result = asyncio.run(qchat_weather_server.call_tool("analyze_weather_query", {"query": "부산 내일 온도는?"}))
+        data = json.loads(result[0].text)
+        assert (data["location"], data["intent"], data["time_ref"]) == ("부산", "temperature", "내일")
+        assert data["answer"].startswith("부산의 내일 기온은 최저")
+
+        result = asyncio.run(qchat_weather_server.call_tool("get_weather_answer", {"question": "우산 챙겨야 해?"}))
+        assert json.loads(result[0].text)["intent"] == "rain"
+
+        # 주말은 오늘 값으로 답하지 않고 지원하지 않는다고 알린다
+        result = asyncio.run(qchat_weather_server.call_tool("analyze_weather_query", {"query": "주말에 비 와?", "location": "부산"}))
+        data = json.loads(result[0].text)
+        assert data["time_ref"] == "주말" and "답할 수 없습니다" in data["answer"]
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+import asyncio
+import json
+from unittest.mock import patch
+
+import weather_mcp_server
+from forecast_cache import ForecastCache
+from forecast_provider import ForecastProvider, OpenWeatherFetcher
+from forecast_store import ForecastStore
+from mock_services import STATS, create_openweather_app, start_mock_server
+from single_flight import SingleFlight
+
+
+def test_cancelled_waiter_does_not_cancel_shared_call():
+    flights = SingleFlight()
+    calls = []
+
+    async def slow():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def run():
+        first = asyncio.ensure_future(flights.do("서울", slow))
+        second = asyncio.ensure_future(flights.do("서울", slow))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second, first.cancelled()
+
+    result, cancelled = asyncio.run(run())
+    assert result == "done" and cancelled
+    assert calls == [1]
+    assert flights.coalesced == 1
+
+
+def test_load_500_concurrent_callers_one_upstream_call_per_key():
+    locations = ["서울", "부산", "대구", "인천", "광주"]
+    mock_app = create_openweather_app(latency=0.05)
+
+    flights = SingleFlight()
+
+    async def run():
+        runner, base_url = await start_mock_server(mock_app)
+        # 테스트가 끝나면 서버의 예보 제공자를 원래대로 되돌린다
+        with patch.object(weather_mcp_server, "forecast", ForecastProvider(
+            OpenWeatherFetcher(weather_mcp_server.http, f"{base_url}/data/2.5/forecast"),
+            ForecastCache(ttl=600, max_size=64, serve_stale=False),
+            flights,
+            store=ForecastStore(":memory:")
+        )):
+            try:
+                return await asyncio.gather(*(
+                    weather_mcp_server.get_weather_data({"location": locations[i % len(locations)], "days": 2})
+                    for i in range(500)
+                ))
+            finally:
+                await weather_mcp_server.http.close()
+                await runner.cleanup()
+
+    results = asyncio.run(run())
+    assert all("error" not in json.loads(r[0].text) for r in results)
+    assert mock_app[STATS]["calls"] == len(locations)
+    assert flights.calls == len(locations)
+    print(f"   📊 호출자 500, 업스트림 호출 {mock_app[STATS]['calls']}, 병합 {flights.coalesced}")
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name}")
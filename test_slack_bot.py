@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+import asyncio
+
+import slack_bot
+from mock_services import MESSAGES, STATS, create_slack_app, start_mock_server
+from rate_limit import TokenBucket, retry_after_seconds
+from weather_analysis import analyze_many
+
+
+def make_analyses(count):
+    return analyze_many([
+        {"location": f"지역{i}", "forecasts": [
+            {"datetime": f"2024-01-01 {h:02d}:00:00", "temp": i + h / 3, "humidity": 50} for h in range(0, 24, 3)
+        ]}
+        for i in range(count)
+    ])
+
+
+async def with_slack(body, **app_options):
+    app = create_slack_app(**app_options)
+    runner, base_url = await start_mock_server(app)
+    pool = slack_bot.HttpSessionPool()
+    try:
+        return await body(app, lambda **kw: slack_bot.SlackDispatcher("xoxb-test", pool, base_url=base_url, **kw))
+    finally:
+        await pool.close()
+        await runner.cleanup()
+
+
+def test_token_bucket_spaces_requests_after_burst():
+    now = [0.0]
+    bucket = TokenBucket(rate=2, capacity=2, clock=lambda: now[0])
+    assert [bucket.reserve() for _ in range(4)] == [0.0, 0.0, 0.5, 1.0]
+    bucket.pause(3)
+    assert bucket.reserve() == 3.0
+    assert retry_after_seconds({"retry-after": "7"}) == 7.0
+    assert retry_after_seconds({}, default=1.5) == 1.5
+
+
+def test_dispatcher_honors_retry_after_and_delivers_everything():
+    async def body(app, make):
+        # 버킷을 서버 한도보다 빠르게 잡아 429를 유도
+        dispatcher = make(rate=100, burst=20, max_retries=10)
+        results = await asyncio.gather(*(dispatcher.post("#weather", text=f"m{i}") for i in range(12)))
+        return results, dispatcher.stats(), app[STATS]
+
+    results, stats, server = asyncio.run(with_slack(body, rate_limit=5, retry_after=0.3))
+    assert all(r["success"] for r in results)
+    assert server["posted"] == 12
+    assert stats["rate_limited"] == server["rate_limited"] > 0
+    assert stats["failed"] == 0
+
+
+def test_non_retryable_error_fails_fast():
+    async def body(app, make):
+        dispatcher = make(max_retries=3)
+        return await dispatcher.post("missing-channel", text="hi"), app[STATS]
+
+    result, server = asyncio.run(with_slack(body))
+    assert not result["success"] and "channel_not_found" in result["error"]
+    assert server["calls"] == 1
+
+
+def test_reports_are_bundled_into_block_kit_messages():
+    async def body(app, make):
+        bot = slack_bot.WeatherSlackBot("xoxb-test", make(rate=50, burst=5))
+        return await bot.send_weather_reports("#weather", make_analyses(25), bundle_size=10), app[MESSAGES]
+
+    results, messages = asyncio.run(with_slack(body))
+    assert len(results) == 25 and all(r["success"] for r in results)
+    assert len(messages) == 3
+    assert all(len(m["blocks"]) <= slack_bot.MAX_BLOCKS_PER_MESSAGE for m in messages)
+    headers = [b["text"]["text"] for m in messages for b in m["blocks"] if b["type"] == "header"]
+    assert len(headers) == 25
+
+
+def test_get_dispatcher_keeps_one_dispatcher_per_token_and_pool():
+    pool = slack_bot.HttpSessionPool()
+    default = slack_bot.get_dispatcher("xoxb-cache")
+    assert slack_bot.get_dispatcher("xoxb-cache") is default
+    assert slack_bot.get_dispatcher("xoxb-cache", slack_bot.http) is default
+    own = slack_bot.get_dispatcher("xoxb-cache", pool)
+    assert own is not default and own.pool is pool
+    assert slack_bot.get_dispatcher("xoxb-cache", pool) is own
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name}")
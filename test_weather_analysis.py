@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+from forecast_series import ForecastSeries
+from weather_analysis import analyze_forecasts, analyze_many
+
+
+def make_weather(location, temps, start_hour=12):
+    forecasts = []
+    for i, temp in enumerate(temps):
+        hour = start_hour + i * 3
+        forecasts.append({
+            "datetime": f"2024-01-{1 + hour // 24:02d} {hour % 24:02d}:00:00",
+            "temp": temp,
+            "humidity": 50 + i,
+            "description": "맑음"
+        })
+    return {"location": location, "forecasts": forecasts}
+
+
+def test_statistics_and_least_squares_trend():
+    # 마지막 값만 보면 하강이지만 전체 추세는 상승
+    analysis = analyze_forecasts(make_weather("서울", [10, 12, 14, 16, 18, 9.5]))
+    assert analysis["temperature"]["avg"] == 13.2
+    assert analysis["temperature"]["min"] == 9.5
+    assert analysis["temperature"]["max"] == 18
+    assert analysis["temperature"]["trend"] == "상승"
+    assert analysis["humidity"]["avg"] == 52.5
+    assert analysis["rolling_avg"] == [13.0, 15.0, 14.4]
+
+
+def test_daily_aggregates_follow_calendar_dates():
+    # 12시 시작: 첫날 12/15/18/21시 4개, 다음날 00~09시 4개
+    analysis = analyze_forecasts(make_weather("부산", [10, 14, 12, 8, 6, 4, 9, 13]))
+    assert [d["date"] for d in analysis["daily"]] == ["2024-01-01", "2024-01-02"]
+    assert analysis["daily"][0] == {"date": "2024-01-01", "avg": 11.0, "min": 8.0, "max": 14.0, "range": 6.0}
+    assert analysis["daily"][1]["range"] == 9.0
+
+
+def test_batch_matches_single_location_analysis():
+    weather_list = [make_weather(f"지역{i}", [i, i + 1, i - 2, i + 3]) for i in range(5)]
+    batch = analyze_many(weather_list)
+    for weather, report in zip(weather_list, batch):
+        single = analyze_forecasts(weather)
+        assert {k: v for k, v in report.items() if k != "analysis_time"} == \
+            {k: v for k, v in single.items() if k != "analysis_time"}
+
+
+def test_batch_with_shifted_time_axis_keeps_each_locations_dates():
+    # 길이는 같지만 하루 늦게 시작하는 지역 - 첫 지역의 날짜를 빌려 쓰면 안 된다
+    early = make_weather("서울", [10, 14, 12, 8, 6, 4, 9, 13])
+    late = make_weather("부산", [10, 14, 12, 8, 6, 4, 9, 13], start_hour=36)
+    reports = analyze_many([early, late])
+    assert [d["date"] for d in reports[0]["daily"]] == ["2024-01-01", "2024-01-02"]
+    assert [d["date"] for d in reports[1]["daily"]] == ["2024-01-02", "2024-01-03"]
+
+    series = [ForecastSeries.from_dict(early), ForecastSeries.from_dict(late)]
+    assert [d["date"] for d in analyze_many(series)[1]["daily"]] == ["2024-01-02", "2024-01-03"]
+
+
+def test_batch_accepts_mixed_dicts_and_series():
+    weather = make_weather("서울", [10, 14, 12, 8, 6, 4, 9, 13])
+    series = ForecastSeries.from_dict(make_weather("부산", [1, 2, 3, 4, 5, 6, 7, 8]))
+    reports = analyze_many([weather, series])
+    assert [r["location"] for r in reports] == ["서울", "부산"]
+    assert reports[0]["daily"] == analyze_forecasts(weather)["daily"]
+    assert reports[1]["temperature"] == analyze_forecasts(series)["temperature"]
+
+
+def test_missing_forecasts_reports_error():
+    assert analyze_forecasts({"location": "대구", "forecasts": []}) == {"error": "분석할 데이터가 없습니다"}
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+import asyncio
+import json
+from unittest.mock import patch
+
+import weather_mcp_server
+from forecast_cache import ForecastCache
+from forecast_provider import ForecastProvider, OpenWeatherFetcher
+from forecast_store import ForecastStore
+from mock_services import STATS, create_openweather_app, start_mock_server
+
+
+def test_batch_reports_partial_failures_and_caps_concurrency():
+    locations = [f"지역{i}" for i in range(30)] + ["없는곳", "느린곳"]
+    mock_app = create_openweather_app(latency=0.02, errors={"없는곳": 404}, delays={"느린곳": 2})
+
+    async def run():
+        runner, base_url = await start_mock_server(mock_app)
+        # 테스트가 끝나면 서버의 예보 제공자를 원래대로 되돌린다
+        with patch.object(weather_mcp_server, "forecast", ForecastProvider(
+            OpenWeatherFetcher(weather_mcp_server.http, f"{base_url}/data/2.5/forecast"),
+            ForecastCache(ttl=600, max_size=64, serve_stale=False),
+            store=ForecastStore(":memory:")
+        )):
+            try:
+                result = await weather_mcp_server.get_weather_data_batch({
+                    "locations": locations,
+                    "days": 1,
+                    "concurrency": 5,
+                    "timeout": 0.5
+                })
+                return json.loads(result[0].text)
+            finally:
+                await weather_mcp_server.http.close()
+                await runner.cleanup()
+
+    summary = asyncio.run(run())
+    assert summary["requested"] == 32
+    assert summary["succeeded"] == 30
+    assert {f["location"]: f["status"] for f in summary["failed"]} == {"없는곳": "error", "느린곳": "timeout"}
+    assert all(len(r["data"]["forecasts"]) == 8 for r in summary["results"])
+    assert mock_app[STATS]["max_in_flight"] <= 5
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name}")
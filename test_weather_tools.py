@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+import asyncio
+import json
+from unittest.mock import patch
+
+import weather_mcp_server
+from forecast_cache import ForecastCache
+from forecast_provider import ForecastProvider, OpenWeatherFetcher
+from forecast_store import ForecastStore
+from mock_services import STATS, create_openweather_app, start_mock_server
+
+
+def test_fused_analysis_and_dataset_handle_skip_json_round_trip():
+    mock_app = create_openweather_app()
+
+    async def run():
+        runner, base_url = await start_mock_server(mock_app)
+        # 테스트가 끝나면 서버의 예보 제공자를 원래대로 되돌린다
+        with patch.object(weather_mcp_server, "forecast", ForecastProvider(
+            OpenWeatherFetcher(weather_mcp_server.http, f"{base_url}/data/2.5/forecast"),
+            ForecastCache(ttl=600, max_size=64, serve_stale=False),
+            store=ForecastStore(":memory:")
+        )):
+            try:
+                fused = json.loads((await weather_mcp_server.get_weather_analysis({"location": "서울", "days": 2}))[0].text)
+                data = json.loads((await weather_mcp_server.get_weather_data({"location": "서울", "days": 2}))[0].text)
+                by_handle = json.loads((await weather_mcp_server.analyze_weather_trend({
+                    "dataset_handle": data["dataset_handle"]
+                }))[0].text)
+                by_json = json.loads((await weather_mcp_server.analyze_weather_trend({
+                    "weather_data": json.dumps(data)
+                }))[0].text)
+                expired = json.loads((await weather_mcp_server.analyze_weather_trend({
+                    "dataset_handle": "ds_unknown"
+                }))[0].text)
+                return fused, by_handle, by_json, expired
+            finally:
+                await weather_mcp_server.http.close()
+                await runner.cleanup()
+
+    fused, by_handle, by_json, expired = asyncio.run(run())
+    assert mock_app[STATS]["calls"] == 1
+    assert fused["temperature"] == by_handle["temperature"] == by_json["temperature"]
+    assert fused["dataset_handle"].startswith("ds_")
+    assert "error" in expired
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name}")
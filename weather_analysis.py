@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+from datetime import datetime
+
+import numpy as np
+
+from forecast_cache import STEPS_PER_DAY
+from forecast_series import ForecastSeries, load_series, parse_forecast_time
+
+# 하루 기준 기울기가 이 값보다 작으면 트렌드를 '유지'로 본다 (°C/일)
+TREND_THRESHOLD = 0.1
+
+
+def day_boundaries(dates, steps, steps_per_day=STEPS_PER_DAY):
+    # 일별 구간 시작 인덱스와 날짜 라벨 - 날짜 정보가 없으면 steps_per_day 단위로 자른다
+    if dates is not None and len(dates) == steps:
+        labels, starts = np.unique(np.asarray(dates), return_index=True)
+        order = np.argsort(starts)
+        return starts[order], [str(label) for label in labels[order]]
+    starts = np.arange(0, steps, steps_per_day)
+    return starts, [f"day{i + 1}" for i in range(len(starts))]
+
+
+def rolling_mean(values, window):
+    # 누적합으로 (L, T) 배열의 이동 평균을 한 번에 계산
+    window = max(1, min(window, values.shape[1]))
+    csum = np.cumsum(values, axis=1, dtype=np.float64)
+    csum = np.concatenate([np.zeros((values.shape[0], 1)), csum], axis=1)
+    return (csum[:, window:] - csum[:, :-window]) / window
+
+
+def analyze_arrays(temps, humidity, dates=None, window=4, steps_per_day=STEPS_PER_DAY):
+    """(지역 수, 시점 수) 배열을 받아 지역별 통계를 벡터 연산으로 계산"""
+    temps = np.atleast_2d(np.asarray(temps, dtype=np.float64))
+    humidity = np.atleast_2d(np.asarray(humidity, dtype=np.float64))
+    steps = temps.shape[1]
+
+    # 최소제곱 기울기: 중심화한 시간축과의 내적 / 분산
+    x = np.arange(steps, dtype=np.float64) - (steps - 1) / 2
+    denom = float(x @ x) or 1.0
+    slope = (temps @ x) / denom * steps_per_day
+
+    starts, day_labels = day_boundaries(dates, steps, steps_per_day)
+    counts = np.diff(np.append(starts, steps))
+    daily_max = np.maximum.reduceat(temps, starts, axis=1)
+    daily_min = np.minimum.reduceat(temps, starts, axis=1)
+
+    return {
+        "temp_mean": temps.mean(axis=1),
+        "temp_min": temps.min(axis=1),
+        "temp_max": temps.max(axis=1),
+        "temp_std": temps.std(axis=1),
+        "temp_slope": slope,
+        "humidity_mean": humidity.mean(axis=1),
+        "humidity_min": humidity.min(axis=1),
+        "humidity_max": humidity.max(axis=1),
+        "temp_rolling": rolling_mean(temps, window),
+        "day_labels": day_labels,
+        "daily_mean": np.add.reduceat(temps, starts, axis=1) / counts,
+        "daily_min": daily_min,
+        "daily_max": daily_max,
+        "diurnal_range": daily_max - daily_min
+    }
+
+
+def trend_label(slope):
+    if slope > TREND_THRESHOLD:
+        return "상승"
+    if slope < -TREND_THRESHOLD:
+        return "하강"
+    return "유지"
+
+
+def build_reports(locations, stats, analysis_time=None):
+    # analyze_arrays 결과로 지역별 분석 보고서(dict) 구성 - 반올림은 배열 단위로 한 번에
+    analysis_time = analysis_time or datetime.now().isoformat()
+    r1 = {key: np.round(stats[key], 1).tolist() for key in (
+        "temp_mean", "temp_min", "temp_max", "humidity_mean", "humidity_min", "humidity_max",
+        "temp_rolling", "daily_mean", "daily_min", "daily_max", "diurnal_range"
+    )}
+    std = np.round(stats["temp_std"], 2).tolist()
+    slope = np.round(stats["temp_slope"], 2).tolist()
+    labels = stats["day_labels"]
+
+    reports = []
+    for i, location in enumerate(locations):
+        temp_avg = r1["temp_mean"][i]
+        humidity_avg = r1["humidity_mean"][i]
+        reports.append({
+            "location": location,
+            "analysis_time": analysis_time,
+            "temperature": {
+                "avg": temp_avg,
+                "min": r1["temp_min"][i],
+                "max": r1["temp_max"][i],
+                "std": std[i],
+                "slope_per_day": slope[i],
+                "trend": trend_label(slope[i])
+            },
+            "humidity": {
+                "avg": humidity_avg,
+                "min": r1["humidity_min"][i],
+                "max": r1["humidity_max"][i]
+            },
+            "rolling_avg": r1["temp_rolling"][i],
+            "daily": [
+                {"date": label, "avg": avg, "min": low, "max": high, "range": spread}
+                for label, avg, low, high, spread in zip(
+                    labels, r1["daily_mean"][i], r1["daily_min"][i], r1["daily_max"][i], r1["diurnal_range"][i]
+                )
+            ],
+            "summary": f"{location} 지역의 평균 기온은 {temp_avg}°C이며, 습도는 {humidity_avg}%입니다."
+        })
+    return reports
+
+
+def series_columns(series_list):
+    # ForecastSeries는 이미 열 배열이므로 쌓기만 하면 된다
+    temps = np.stack([s.arrays()["temp"] for s in series_list])
+    humidity = np.stack([s.arrays()["humidity"] for s in series_list])
+    return temps, humidity, series_list[0].dates()
+
+
+def forecast_columns(weather_list, steps):
+    # 여러 지역의 forecasts를 (지역 수, 시점 수) 배열로 한 번에 변환
+    if any(isinstance(w, ForecastSeries) for w in weather_list):
+        # dict와 ForecastSeries가 섞여 있으면 모두 ForecastSeries로 바꿔 쌓는다
+        return series_columns([load_series(w) for w in weather_list])
+    count = len(weather_list) * steps
+    temps = np.fromiter((f["temp"] for w in weather_list for f in w["forecasts"]), dtype=np.float64, count=count)
+    humidity = np.fromiter((f["humidity"] for w in weather_list for f in w["forecasts"]), dtype=np.float64, count=count)
+    first = weather_list[0]["forecasts"]
+    dates = [f["datetime"][:10] for f in first] if all("datetime" in f for f in first) else None
+    return temps.reshape(-1, steps), humidity.reshape(-1, steps), dates
+
+
+def _steps(weather_data):
+    if isinstance(weather_data, ForecastSeries):
+        return len(weather_data)
+    return len(weather_data.get("forecasts", []))
+
+
+def _location(weather_data):
+    if isinstance(weather_data, ForecastSeries):
+        return weather_data.location
+    return weather_data.get("location")
+
+
+def _time_range(weather_data):
+    # (첫 시점, 마지막 시점) - 길이가 같아도 시작 시각이 다르면 날짜 축을 공유할 수 없다
+    if isinstance(weather_data, ForecastSeries):
+        return weather_data.dt[0], weather_data.dt[-1]
+    # dict의 datetime도 epoch 초로 바꿔 ForecastSeries와 비교할 수 있게 한다
+    times = [f.get("datetime") for f in (weather_data["forecasts"][0], weather_data["forecasts"][-1])]
+    return tuple(parse_forecast_time(t) if t else None for t in times)
+
+
+def analyze_forecasts(weather_data, window=4):
+    """dict 형식 날씨 데이터 또는 ForecastSeries 하나를 분석"""
+    steps = _steps(weather_data)
+    if not steps:
+        return {"error": "분석할 데이터가 없습니다"}
+    temps, humidity, dates = forecast_columns([weather_data], steps)
+    stats = analyze_arrays(temps, humidity, dates, window)
+    return build_reports([_location(weather_data)], stats)[0]
+
+
+def analyze_many(weather_list, window=4):
+    """같은 시간축을 가진 여러 지역을 한 번에 분석 - 길이나 시작/끝 시점이 다르면 지역별로 분석"""
+    lengths = {_steps(w) for w in weather_list}
+    if len(lengths) != 1 or 0 in lengths or len({_time_range(w) for w in weather_list}) != 1:
+        return [analyze_forecasts(w, window) for w in weather_list]
+
+    temps, humidity, dates = forecast_columns(weather_list, lengths.pop())
+    stats = analyze_arrays(temps, humidity, dates, window)
+    return build_reports([_location(w) for w in weather_list], stats)
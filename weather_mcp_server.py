@@ -1,13 +1,53 @@
 #!/usr/bin/env python3
 import asyncio
 import json
-import aiohttp
 import os
+from contextlib import asynccontextmanager
 from datetime import datetime
 from mcp.server import Server
 from mcp.types import Tool, TextContent
+from http_pool import HttpSessionPool
+from metrics import metrics
+from profiler import profiler
+from forecast_series import COLUMNAR_FORMAT, ForecastSeries
+from forecast_provider import ForecastProvider, fetcher_from_env
+from dataset_store import DatasetStore
+from forecast_store import BUCKETS, ForecastStore
+from prefetch import PrefetchScheduler
+from rate_limit import CallBudget
+from slack_bot import get_dispatcher
 
-app = Server("weather-analyzer")
+BATCH_CONCURRENCY = int(os.getenv("WEATHER_BATCH_CONCURRENCY", "10"))
+BATCH_TIMEOUT = float(os.getenv("WEATHER_BATCH_TIMEOUT", "10"))
+# 미리 갱신은 켠 경우에만 - 켜지 않으면 stdio로 뜨는 서버마다 시작하자마자 외부 API를 부르지 않는다
+PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "false").lower() in ("1", "true", "yes")
+
+http = HttpSessionPool(trace_configs=metrics.trace_configs)
+datasets = DatasetStore()
+# OpenWeatherMap 무료 요금제 한도 (기본 분당 60회) - 사용자 요청과 미리 갱신이 함께 쓴다
+upstream_budget = CallBudget(
+    int(os.getenv("UPSTREAM_BUDGET", "60")),
+    float(os.getenv("UPSTREAM_BUDGET_WINDOW", "60"))
+)
+# 예보 백엔드 (WEATHER_PROVIDER_WEATHER / WEATHER_PROVIDER) - replay/synthetic은 호출 한도를 쓰지 않는다
+# 캐시·요청 병합은 Q Chat 서버와 같은 제공자, 새로 받은 예보는 로컬 이력 저장소에 쌓는다 (WEATHER_STORE_PATH를 지정한 경우에만)
+forecast = ForecastProvider(fetcher_from_env(http, "weather", budget=upstream_budget), store=ForecastStore())
+
+@asynccontextmanager
+async def lifespan(server):
+    # 커넥션 풀과 함께 자주 묻는 지역 미리 갱신 스케줄러를 서버 수명 동안 실행
+    async with http.lifespan(server) as state:
+        if PREFETCH_ENABLED:
+            prefetcher.start()
+        try:
+            yield dict(state, prefetch=prefetcher)
+        finally:
+            if PREFETCH_ENABLED:
+                await prefetcher.stop()
+            # 뒤에서 진행 중인 예보 이력 기록을 마친다
+            await forecast.drain()
+
+app = Server("weather-analyzer", lifespan=lifespan)
 
 @app.list_tools()
 async def list_tools():
@@ -19,20 +59,71 @@ async def list_tools():
                 "type": "object",
                 "properties": {
                     "location": {"type": "string", "description": "지역명"},
-                    "days": {"type": "integer", "description": "예보 일수", "default": 3}
+                    "days": {"type": "integer", "description": "예보 일수", "default": 3},
+                    "units": {"type": "string", "description": "단위 (metric, imperial, standard)", "default": "metric"},
+                    "lang": {"type": "string", "description": "응답 언어", "default": "kr"},
+                    "format": {"type": "string", "enum": ["json", "columnar"], "description": "응답 형식 (columnar: 압축 열 배열)", "default": "json"}
                 },
                 "required": ["location"]
             }
         ),
+        Tool(
+            name="get_weather_data_batch",
+            description="여러 지역의 날씨 데이터를 동시에 수집 (완료 순서대로 진행 상황 알림)",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "locations": {"type": "array", "items": {"type": "string"}, "description": "지역명 목록"},
+                    "days": {"type": "integer", "description": "예보 일수", "default": 3},
+                    "units": {"type": "string", "description": "단위 (metric, imperial, standard)", "default": "metric"},
+                    "lang": {"type": "string", "description": "응답 언어", "default": "kr"},
+                    "concurrency": {"type": "integer", "description": "동시 요청 수 상한", "default": 10},
+                    "timeout": {"type": "number", "description": "지역별 제한 시간(초)", "default": 10},
+                    "format": {"type": "string", "enum": ["json", "columnar"], "description": "응답 형식 (columnar: 압축 열 배열)", "default": "json"}
+                },
+                "required": ["locations"]
+            }
+        ),
         Tool(
             name="analyze_weather_trend",
             description="날씨 데이터 트렌드 분석",
             inputSchema={
                 "type": "object", 
                 "properties": {
-                    "weather_data": {"type": "string", "description": "분석할 날씨 데이터"}
+                    "weather_data": {"type": "string", "description": "분석할 날씨 데이터 (기존 JSON 또는 columnar 형식)"},
+                    "dataset_handle": {"type": "string", "description": "get_weather_data가 돌려준 서버 측 데이터셋 핸들"}
+                }
+            }
+        ),
+        Tool(
+            name="get_weather_analysis",
+            description="날씨 데이터 수집과 트렌드 분석을 서버에서 한 번에 수행",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "location": {"type": "string", "description": "지역명"},
+                    "days": {"type": "integer", "description": "예보 일수", "default": 3},
+                    "units": {"type": "string", "description": "단위 (metric, imperial, standard)", "default": "metric"},
+                    "lang": {"type": "string", "description": "응답 언어", "default": "kr"},
+                    "include_data": {"type": "boolean", "description": "원본 예보를 columnar 형식으로 함께 반환", "default": False}
                 },
-                "required": ["weather_data"]
+                "required": ["location"]
+            }
+        ),
+        Tool(
+            name="query_weather_history",
+            description="로컬에 쌓인 예보 이력을 기간으로 조회 (네트워크 사용 없음, 구간별 다운샘플링)",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "location": {"type": "string", "description": "지역명"},
+                    "start": {"type": "string", "description": "시작 시각 (UTC, YYYY-MM-DD 또는 YYYY-MM-DD HH:MM:SS)"},
+                    "end": {"type": "string", "description": "끝 시각 (UTC, 포함)"},
+                    "bucket": {"type": "string", "enum": list(BUCKETS), "description": "다운샘플링 구간 (raw: 원본 예보)", "default": "1d"},
+                    "units": {"type": "string", "description": "단위 (metric, imperial, standard)", "default": "metric"},
+                    "as_of": {"type": "string", "description": "이 시각까지 알려진 예보 기준으로 조회 (기본: 최신)"}
+                },
+                "required": ["location"]
             }
         ),
         Tool(
@@ -47,104 +138,231 @@ async def list_tools():
                 },
                 "required": ["token", "channel", "message"]
             }
+        ),
+        Tool(
+            name="get_prefetch_stats",
+            description="미리 갱신 스케줄(상위 지역, 다음 갱신까지 남은 시간)과 외부 API 호출 예산 사용량 조회",
+            inputSchema={
+                "type": "object",
+                "properties": {}
+            }
+        ),
+        Tool(
+            name="get_cache_stats",
+            description="예보 캐시 적중/미스/제거 및 요청 병합 통계 조회",
+            inputSchema={
+                "type": "object",
+                "properties": {}
+            }
+        ),
+        Tool(
+            name="get_server_stats",
+            description="도구·단계별 지연 히스토그램, 외부 API 상태 코드, 처리 중 요청 수 조회",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "format": {"type": "string", "enum": ["json", "prometheus"], "description": "응답 형식", "default": "json"}
+                }
+            }
+        ),
+        Tool(
+            name="configure_profiler",
+            description="재시작 없이 도구 호출 프로파일링 켜기/끄기 (다음 N건 또는 느린 호출을 접힌 스택/pstats 파일로 저장)",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "enabled": {"type": "boolean", "description": "false면 중지하고 지금까지 잡은 결과 저장", "default": True},
+                    "calls": {"type": "integer", "description": "잡을 호출 수 (slow_ms가 없으면 기본 10)"},
+                    "slow_ms": {"type": "number", "description": "이 시간(ms)보다 느린 호출만 저장"},
+                    "tools": {"type": "array", "items": {"type": "string"}, "description": "이 도구들만 프로파일 (기본: 전체)"},
+                    "format": {"type": "string", "enum": ["collapsed", "pstats"], "description": "collapsed: 플레임그래프용 접힌 스택 (샘플링), pstats: cProfile", "default": "collapsed"}
+                }
+            }
         )
     ]
 
 @app.call_tool()
+@metrics.instrument
+@profiler.instrument
 async def call_tool(name: str, arguments: dict):
     if name == "get_weather_data":
         return await get_weather_data(arguments)
+    elif name == "get_weather_data_batch":
+        return await get_weather_data_batch(arguments)
     elif name == "analyze_weather_trend":
         return await analyze_weather_trend(arguments)
+    elif name == "get_weather_analysis":
+        return await get_weather_analysis(arguments)
+    elif name == "query_weather_history":
+        return await query_weather_history(arguments)
     elif name == "send_to_slack":
         return await send_to_slack(arguments)
+    elif name == "get_cache_stats":
+        return await get_cache_stats(arguments)
+    elif name == "get_prefetch_stats":
+        return await get_prefetch_stats(arguments)
+    elif name == "get_server_stats":
+        return await get_server_stats(arguments)
+    elif name == "configure_profiler":
+        return await configure_profiler(arguments)
+
+async def load_forecast(location, days=3, units="metric", lang="kr"):
+    series = await forecast.load(location, days, units, lang)
+    # 성공한 요청만 빈도에 반영 (없는 지역을 계속 미리 갱신하지 않도록)
+    prefetcher.record(location, days, units, lang)
+    return series
+
+async def refresh_forecast(location, days, units="metric", lang="kr"):
+    # 미리 갱신: 캐시를 거치지 않고 새로 받아 덮어쓴다
+    await forecast.refresh(location, days, units, lang)
+
+# 캐시는 제공자에서 그때그때 찾는다 (테스트 등에서 forecast를 바꿔 끼워도 같은 캐시를 본다)
+prefetcher = PrefetchScheduler(lambda: forecast.cache, refresh_forecast, upstream_budget)
 
 async def get_weather_data(args):
     location = args["location"]
     days = args.get("days", 3)
+    units = args.get("units", "metric")
+    lang = args.get("lang", "kr")
     
     try:
-        # OpenWeatherMap API 사용 (무료)
-        api_key = os.getenv("OPENWEATHER_API_KEY", "demo_key")
-        url = f"http://api.openweathermap.org/data/2.5/forecast"
+        with metrics.phase("load"):
+            series = await load_forecast(location, days, units, lang)
+        # 이후 분석 도구가 JSON을 다시 보내지 않도록 서버 측 핸들 발급
+        handle = datasets.put(series)
+        with metrics.phase("serialize"):
+            text = dump_series(series, args.get("format", "json"), handle)
         
-        params = {
-            "q": location,
-            "appid": api_key,
-            "units": "metric",
-            "lang": "kr",
-            "cnt": days * 8  # 3시간 간격
-        }
-        
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, params=params) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    
-                    # 데이터 정리
-                    weather_info = {
-                        "location": location,
-                        "timestamp": datetime.now().isoformat(),
-                        "forecasts": []
-                    }
-                    
-                    for item in data.get("list", []):
-                        weather_info["forecasts"].append({
-                            "datetime": item["dt_txt"],
-                            "temp": item["main"]["temp"],
-                            "humidity": item["main"]["humidity"],
-                            "description": item["weather"][0]["description"],
-                            "wind_speed": item["wind"]["speed"]
-                        })
-                    
-                    return [TextContent(
-                        type="text",
-                        text=json.dumps(weather_info, ensure_ascii=False, indent=2)
-                    )]
-                else:
-                    return [TextContent(
-                        type="text",
-                        text=json.dumps({"error": f"API 오류: {response.status}"}, ensure_ascii=False)
-                    )]
-                    
+        return [TextContent(type="text", text=text)]
+                
     except Exception as e:
         return [TextContent(
             type="text",
             text=json.dumps({"error": str(e)}, ensure_ascii=False)
         )]
 
-async def analyze_weather_trend(args):
-    weather_data = json.loads(args["weather_data"])
+def dump_series(series, fmt="json", handle=None):
+    # columnar: 들여쓰기 없는 열 배열 형식, json: 기존 list-of-dict 형식
+    if fmt == COLUMNAR_FORMAT:
+        payload = series.to_columnar()
+    else:
+        payload = series.to_dict()
+    if handle:
+        payload["dataset_handle"] = handle
+    if fmt == COLUMNAR_FORMAT:
+        return json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+    return json.dumps(payload, ensure_ascii=False, indent=2)
+
+async def report_progress(progress, total, message):
+    # 클라이언트가 progressToken을 보낸 경우에만 진행 상황 알림
+    try:
+        ctx = app.request_context
+    except LookupError:
+        return
+    token = ctx.meta.progressToken if ctx.meta else None
+    if token is not None:
+        await ctx.session.send_progress_notification(token, progress, total, message=message)
+
+async def get_weather_data_batch(args):
+    locations = list(dict.fromkeys(args["locations"]))
+    days = args.get("days", 3)
+    units = args.get("units", "metric")
+    lang = args.get("lang", "kr")
+    concurrency = max(1, args.get("concurrency", BATCH_CONCURRENCY))
+    timeout = args.get("timeout", BATCH_TIMEOUT)
+    columnar = args.get("format", "json") == COLUMNAR_FORMAT
+    
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def fetch_one(location):
+        async with semaphore:
+            try:
+                series = await asyncio.wait_for(load_forecast(location, days, units, lang), timeout)
+                data = series.to_columnar() if columnar else series.to_dict()
+                return {"location": location, "status": "ok", "data": data}
+            except asyncio.TimeoutError:
+                return {"location": location, "status": "timeout", "error": f"{timeout}초 내 응답 없음"}
+            except Exception as e:
+                return {"location": location, "status": "error", "error": str(e)}
     
+    started = datetime.now()
+    results = []
+    # 끝나는 순서대로 결과를 모으고 진행 상황을 알린다
+    for done in asyncio.as_completed([fetch_one(location) for location in locations]):
+        item = await done
+        results.append(item)
+        await report_progress(len(results), len(locations), f"{item['location']}: {item['status']}")
+    
+    failed = [{"location": r["location"], "status": r["status"], "error": r["error"]} for r in results if r["status"] != "ok"]
+    summary = {
+        "timestamp": started.isoformat(),
+        "requested": len(locations),
+        "succeeded": len(results) - len(failed),
+        "failed": failed,
+        "elapsed": round((datetime.now() - started).total_seconds(), 3),
+        "results": [r for r in results if r["status"] == "ok"]
+    }
+    
+    return [TextContent(
+        type="text",
+        text=json.dumps(summary, ensure_ascii=False, separators=(",", ":") if columnar else None)
+    )]
+
+def analyze_weather(weather_data):
+    # NumPy 분석 엔진은 분석 도구가 처음 실행될 때 가져온다 (서버 시작 시간 단축)
+    from weather_analysis import analyze_forecasts
+    return analyze_forecasts(weather_data)
+
+async def analyze_weather_trend(args):
     try:
-        forecasts = weather_data.get("forecasts", [])
-        
-        if not forecasts:
+        if args.get("dataset_handle"):
+            # 이미 서버에 있는 데이터셋은 JSON 왕복 없이 바로 분석
+            weather_data = datasets.get(args["dataset_handle"])
+            if weather_data is None:
+                return [TextContent(
+                    type="text",
+                    text=json.dumps({"error": "데이터셋 핸들이 없거나 만료되었습니다"}, ensure_ascii=False)
+                )]
+        elif args.get("weather_data"):
+            with metrics.phase("decode"):
+                weather_data = json.loads(args["weather_data"])
+                # 열 형식 입력은 dict로 풀지 않고 바로 배열 분석
+                if weather_data.get("format") == COLUMNAR_FORMAT:
+                    weather_data = ForecastSeries.from_columnar(weather_data)
+        else:
             return [TextContent(
                 type="text",
-                text=json.dumps({"error": "분석할 데이터가 없습니다"}, ensure_ascii=False)
+                text=json.dumps({"error": "weather_data 또는 dataset_handle이 필요합니다"}, ensure_ascii=False)
             )]
         
-        # 기본 통계 계산
-        temps = [f["temp"] for f in forecasts]
-        humidity = [f["humidity"] for f in forecasts]
+        with metrics.phase("analyze"):
+            analysis = analyze_weather(weather_data)
+        with metrics.phase("serialize"):
+            text = json.dumps(analysis, ensure_ascii=False, indent=2)
         
-        analysis = {
-            "location": weather_data.get("location"),
-            "analysis_time": datetime.now().isoformat(),
-            "temperature": {
-                "avg": round(sum(temps) / len(temps), 1),
-                "min": min(temps),
-                "max": max(temps),
-                "trend": "상승" if temps[-1] > temps[0] else "하강"
-            },
-            "humidity": {
-                "avg": round(sum(humidity) / len(humidity), 1),
-                "min": min(humidity),
-                "max": max(humidity)
-            },
-            "summary": f"{weather_data.get('location')} 지역의 평균 기온은 {round(sum(temps)/len(temps), 1)}°C이며, 습도는 {round(sum(humidity)/len(humidity), 1)}%입니다."
-        }
+        return [TextContent(type="text", text=text)]
+        
+    except Exception as e:
+        return [TextContent(
+            type="text",
+            text=json.dumps({"error": str(e)}, ensure_ascii=False)
+        )]
+
+async def get_weather_analysis(args):
+    location = args["location"]
+    days = args.get("days", 3)
+    units = args.get("units", "metric")
+    lang = args.get("lang", "kr")
+    
+    try:
+        # 수집 → 파싱 → 분석을 서버 안에서 한 번에 처리
+        with metrics.phase("load"):
+            series = await load_forecast(location, days, units, lang)
+        with metrics.phase("analyze"):
+            analysis = analyze_weather(series)
+        analysis["dataset_handle"] = datasets.put(series)
+        if args.get("include_data"):
+            analysis["weather_data"] = series.to_columnar()
         
         return [TextContent(
             type="text",
@@ -157,47 +375,118 @@ async def analyze_weather_trend(args):
             text=json.dumps({"error": str(e)}, ensure_ascii=False)
         )]
 
+async def query_weather_history(args):
+    location = args["location"]
+    bucket = args.get("bucket", "1d")
+    units = args.get("units", "metric")
+    
+    try:
+        if not forecast.store.enabled:
+            return [TextContent(
+                type="text",
+                text=json.dumps({"error": "예보 이력 저장소가 비활성화되어 있습니다 (WEATHER_STORE_PATH)"}, ensure_ascii=False)
+            )]
+        if bucket not in BUCKETS:
+            return [TextContent(
+                type="text",
+                text=json.dumps({"error": f"지원하지 않는 구간입니다: {bucket}"}, ensure_ascii=False)
+            )]
+        
+        query = (location, args.get("start"), args.get("end"), units, args.get("as_of"))
+        if bucket == "raw":
+            # 원본은 분석 도구가 바로 쓸 수 있도록 열 형식 + 데이터셋 핸들
+            series = forecast.store.series(*query)
+            return [TextContent(
+                type="text",
+                text=dump_series(series, COLUMNAR_FORMAT, datasets.put(series) if len(series) else None)
+            )]
+        
+        points = forecast.store.downsample(location, bucket, *query[1:])
+        return [TextContent(
+            type="text",
+            text=json.dumps({
+                "location": location,
+                "units": units,
+                "bucket": bucket,
+                "start": args.get("start"),
+                "end": args.get("end"),
+                "as_of": args.get("as_of"),
+                "points": points
+            }, ensure_ascii=False, indent=2)
+        )]
+        
+    except Exception as e:
+        return [TextContent(
+            type="text",
+            text=json.dumps({"error": str(e)}, ensure_ascii=False)
+        )]
+
 async def send_to_slack(args):
     token = args["token"]
     channel = args["channel"]
     message = args["message"]
     
     try:
-        url = "https://slack.com/api/chat.postMessage"
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json"
-        }
-        
-        payload = {
-            "channel": channel,
-            "text": message,
-            "username": "날씨봇",
-            "icon_emoji": ":sunny:"
-        }
+        # 토큰별로 재사용하는 전송기 - 채널별 속도 제한과 429 재시도를 처리
+        dispatcher = get_dispatcher(token, http)
+        result = await dispatcher.post(
+            channel,
+            text=message,
+            username="날씨봇",
+            icon_emoji=":sunny:"
+        )
         
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, headers=headers, json=payload) as response:
-                result = await response.json()
-                
-                return [TextContent(
-                    type="text",
-                    text=json.dumps({
-                        "success": result.get("ok", False),
-                        "message": "전송 완료" if result.get("ok") else result.get("error", "전송 실패")
-                    }, ensure_ascii=False, indent=2)
-                )]
-                
+        return [TextContent(
+            type="text",
+            text=json.dumps({
+                "success": result["success"],
+                "message": "전송 완료" if result["success"] else result["error"]
+            }, ensure_ascii=False, indent=2)
+        )]
+            
     except Exception as e:
         return [TextContent(
             type="text",
             text=json.dumps({"error": str(e)}, ensure_ascii=False)
         )]
 
-async def main():
-    from mcp.server.stdio import stdio_server
-    async with stdio_server(app) as (read_stream, write_stream):
-        await app.run(read_stream, write_stream)
+async def get_cache_stats(args):
+    return [TextContent(
+        type="text",
+        text=json.dumps(
+            dict(forecast.stats(), store=forecast.store.stats()),
+            ensure_ascii=False, indent=2
+        )
+    )]
+
+async def get_prefetch_stats(args):
+    return [TextContent(
+        type="text",
+        text=json.dumps(
+            dict(prefetcher.stats(), enabled=PREFETCH_ENABLED, cache_ttl=forecast.cache.ttl),
+            ensure_ascii=False, indent=2
+        )
+    )]
+
+async def get_server_stats(args):
+    if args.get("format") == "prometheus":
+        return [TextContent(type="text", text=metrics.prometheus())]
+    return [TextContent(
+        type="text",
+        text=json.dumps(
+            dict(metrics.snapshot(), profiler=profiler.status(), cache=forecast.cache.stats(), upstream_budget=upstream_budget.stats()),
+            ensure_ascii=False, indent=2
+        )
+    )]
+
+async def configure_profiler(args):
+    try:
+        status = profiler.configure(**args) if args else profiler.status()
+        return [TextContent(type="text", text=json.dumps(status, ensure_ascii=False, indent=2))]
+    except (TypeError, ValueError) as e:
+        return [TextContent(type="text", text=json.dumps({"error": str(e)}, ensure_ascii=False))]
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    # --transport http|sse로 여러 클라이언트가 공유하는 상시 서버로 실행
+    from mcp_transport import run_server
+    run_server(app, "날씨 분석 MCP 서버", 8001)
\ No newline at end of file
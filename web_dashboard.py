@@ -1,13 +1,16 @@
 #!/usr/bin/env python3
 import streamlit as st
-import json
-import plotly.express as px
-import plotly.graph_objects as go
-import pandas as pd
-from datetime import datetime
-import asyncio
-from mcp import ClientSession, StdioServerParameters
-from mcp.client.stdio import stdio_client
+import os
+import time
+from background_loop import BackgroundLoop
+from forecast_store import ForecastStore
+# pandas/plotly/NumPy는 차트·분석이 처음 필요할 때 가져온다 (첫 화면 표시 시간 단축)
+
+# 재실행 소요 시간 측정 시작점
+rerun_started = time.perf_counter()
+timings = {}
+
+CACHE_TTL = int(os.getenv("DASHBOARD_CACHE_TTL", "600"))
 
 st.set_page_config(
     page_title="🌤️ 날씨 분석 대시보드",
@@ -55,51 +58,39 @@ with st.sidebar:
     slack_token = st.text_input("🔑 Slack Bot Token", type="password")
     slack_channel = st.text_input("📢 채널명", placeholder="#weather")
 
+@st.cache_resource
+def get_forecast_provider():
+    # 기본은 synthetic 백엔드 (WEATHER_PROVIDER_DASHBOARD=owm|replay로 실제/기록 데이터)
+    from forecast_provider import provider_from_env
+    from http_pool import HttpSessionPool
+    return provider_from_env(HttpSessionPool(), "dashboard", default="synthetic")
+
 async def get_weather_analysis(location, days):
-    try:
-        # 샘플 데이터 생성
-        weather_data = {
-            "location": location,
-            "timestamp": datetime.now().isoformat(),
-            "forecasts": [
-                {"datetime": "2024-01-01 12:00", "temp": 18.5, "humidity": 65, "description": "맑음"},
-                {"datetime": "2024-01-01 15:00", "temp": 20.2, "humidity": 60, "description": "구름조금"},
-                {"datetime": "2024-01-01 18:00", "temp": 16.8, "humidity": 70, "description": "흐림"}
-            ]
-        }
-        
-        # 분석 데이터 생성
-        forecasts = weather_data.get("forecasts", [])
-        temps = [f["temp"] for f in forecasts]
-        humidity = [f["humidity"] for f in forecasts]
-        
-        analysis_data = {
-            "location": location,
-            "analysis_time": datetime.now().isoformat(),
-            "temperature": {
-                "avg": round(sum(temps) / len(temps), 1),
-                "min": min(temps),
-                "max": max(temps),
-                "trend": "상승"
-            },
-            "humidity": {
-                "avg": round(sum(humidity) / len(humidity), 1),
-                "min": min(humidity),
-                "max": max(humidity)
-            },
-            "summary": f"{location} 지역의 평균 기온은 {round(sum(temps)/len(temps), 1)}°C이며, 습도는 {round(sum(humidity)/len(humidity), 1)}%입니다."
-        }
-        
-        return weather_data, analysis_data
-        
-    except Exception as e:
-        st.error(f"데이터 처리 오류: {str(e)}")
-        return None, None
+    # 다른 앱과 같은 예보 경로 (캐시 + 요청 병합)
+    series = await get_forecast_provider().load(location, days)
+    weather_data = series.to_dict()
+    
+    # 분석 데이터 생성
+    from weather_analysis import analyze_forecasts
+    analysis_data = analyze_forecasts(weather_data)
+    
+    return weather_data, analysis_data
+
+@st.cache_resource
+def get_background_loop():
+    # 클릭마다 asyncio.run으로 새 루프를 만들지 않고 서버 전체에서 하나의 루프 공유
+    return BackgroundLoop("dashboard")
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def load_weather_analysis(location, days):
+    return get_background_loop().run(get_weather_analysis(location, days))
 
 def create_visualizations(weather_data):
     if not weather_data or "forecasts" not in weather_data:
         return None, None
     
+    import pandas as pd
+    import plotly.express as px
     df = pd.DataFrame(weather_data["forecasts"])
     df['datetime'] = pd.to_datetime(df['datetime'])
     
@@ -127,15 +118,45 @@ def create_visualizations(weather_data):
     
     return temp_fig, humidity_fig
 
+@st.cache_resource(ttl=CACHE_TTL, show_spinner=False)
+def build_figures(location, days):
+    # 같은 (지역, 일수)의 차트는 재실행 간 그대로 재사용
+    weather_data, _ = load_weather_analysis(location, days)
+    return create_visualizations(weather_data)
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def build_table(location, days):
+    import pandas as pd
+    weather_data, _ = load_weather_analysis(location, days)
+    return pd.DataFrame(weather_data["forecasts"])
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def load_history(location, bucket="1d"):
+    # weather_mcp_server가 쌓아둔 예보 이력을 직접 읽는다 (네트워크 사용 없음)
+    # SQLite 연결은 스레드 간 공유할 수 없으므로 호출마다 열고 닫는다
+    import pandas as pd
+    store = ForecastStore()
+    try:
+        return pd.DataFrame(store.downsample(location, bucket))
+    finally:
+        store.close()
+
 # 메인 컨텐츠
 col1, col2 = st.columns([2, 1])
 
 with col1:
     if st.button("🚀 날씨 분석 시작", use_container_width=True):
         with st.spinner("데이터 수집 및 분석 중..."):
-            weather_data, analysis_data = asyncio.run(get_weather_analysis(location, days))
+            try:
+                started = time.perf_counter()
+                weather_data, analysis_data = load_weather_analysis(location, days)
+                timings["데이터"] = time.perf_counter() - started
+            except Exception as e:
+                st.error(f"데이터 처리 오류: {str(e)}")
+                weather_data, analysis_data = None, None
             
             if weather_data and analysis_data:
+                st.session_state.query = (location, days)
                 st.session_state.weather_data = weather_data
                 st.session_state.analysis_data = analysis_data
                 st.success("✅ 분석 완료!")
@@ -185,7 +206,9 @@ if 'weather_data' in st.session_state and 'analysis_data' in st.session_state:
         st.metric("📅 예보 기간", f"{len(weather_data['forecasts'])}시간")
     
     # 차트
-    temp_fig, humidity_fig = create_visualizations(weather_data)
+    started = time.perf_counter()
+    temp_fig, humidity_fig = build_figures(*st.session_state.query)
+    timings["차트"] = time.perf_counter() - started
     
     if temp_fig and humidity_fig:
         col1, col2 = st.columns(2)
@@ -196,9 +219,37 @@ if 'weather_data' in st.session_state and 'analysis_data' in st.session_state:
     
     # 상세 데이터
     with st.expander("📋 상세 데이터 보기"):
-        df = pd.DataFrame(weather_data["forecasts"])
+        df = build_table(*st.session_state.query)
         st.dataframe(df, use_container_width=True)
 
+# 저장된 예보 이력
+history_path = os.getenv("WEATHER_STORE_PATH", "")
+if history_path and os.path.exists(history_path):
+    with st.expander(f"📚 {location} 예보 이력 (일별)"):
+        history = load_history(location)
+        if history.empty:
+            st.info("저장된 이력이 없습니다")
+        else:
+            import plotly.express as px
+            history_fig = px.line(
+                history, x='time', y=['temp_min', 'temp_avg', 'temp_max'],
+                labels={'value': '온도 (°C)', 'time': '날짜'}
+            )
+            st.plotly_chart(history_fig, use_container_width=True)
+
 # 푸터
 st.markdown("---")
-st.markdown("🌤️ **날씨 분석 대시보드** | Powered by MCP & Streamlit")
\ No newline at end of file
+st.markdown("🌤️ **날씨 분석 대시보드** | Powered by MCP & Streamlit")
+
+# 재실행 소요 시간 기록 (최근 50회)
+rerun_times = st.session_state.setdefault("rerun_times", [])
+rerun_times.append((time.perf_counter() - rerun_started) * 1000)
+del rerun_times[:-50]
+
+with st.sidebar:
+    with st.expander("⏱️ 렌더링 성능"):
+        ordered = sorted(rerun_times)
+        st.write(f"마지막 재실행: {rerun_times[-1]:.1f}ms")
+        st.write(f"중앙값: {ordered[len(ordered) // 2]:.1f}ms (최근 {len(rerun_times)}회)")
+        for phase, seconds in timings.items():
+            st.write(f"{phase}: {seconds * 1000:.1f}ms")
\ No newline at end of file